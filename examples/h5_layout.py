@@ -0,0 +1,161 @@
+'''
+Benchmark for the HDF5 layout of pooled sweeps, see Saver.STORAGE. Synthetic
+simulation results, i.e. travelling curvature waves with small perturbations
+which mimic discretisation errors, are written to a result store and pooled
+with different chunking, compression and dtype settings. For every layout,
+the pooling time, the file size and the read time of the common access
+patterns of analyse_sweeps are reported:
+
+    point: time series of one curvature component at single body points,
+        see compute_undulation_frequency
+    slab: all outputs of a single simulation
+    scalar: scalar time series of all simulations, e.g. energy rates
+
+Compression ratios depend on the data. Results for synthetic data are only
+a rough guide for real sweeps.
+
+Usage: python h5_layout.py [--n_sim 64 --N 100 --n 500 --N_worker 4]
+'''
+# Built-in
+from argparse import ArgumentParser
+from pathlib import Path
+import tempfile
+import time
+
+# Third-party
+import numpy as np
+import h5py
+
+# Local imports
+from minimal_worm import FrameSequence
+from minimal_worm.experiments import PackStore, Saver
+from minimal_worm.experiments.undulation import UndulationExperiment
+from parameter_scan import ParameterGrid
+
+# Settings which differ from Saver.STORAGE
+LAYOUTS = {
+    'contiguous': {'chunks': None},
+    'default': {},
+    'lzf': {'compression': 'lzf', 'shuffle': True},
+    'gzip': {'compression': 'gzip', 'shuffle': True},
+    'f32': {'dtype': 'float32'},
+    'gzip+f32': {'compression': 'gzip', 'shuffle': True, 'dtype': 'float32'},
+}
+
+FS_KEYS = ['t', 'r', 'k', 'sig', 'D_F_dot']
+
+def synthetic_output(rng, param, n, N):
+    '''
+    Frame sequence with travelling waves along the body
+    '''
+    t = param.dt * np.arange(1, n + 1)
+    s = np.linspace(0, 1, N)
+
+    phase = 2 * np.pi * (s[None, :] / param.lam - t[:, None])
+
+    FS = FrameSequence([])
+    FS.t = t
+    FS.s = s
+
+    FS.k = np.zeros((n, 3, N))
+    FS.k[:, 0, :] = param.A * np.sin(phase)
+    FS.k += 1e-6 * rng.standard_normal(FS.k.shape)
+
+    FS.sig = 1e-3 * rng.standard_normal((n, 3, N))
+
+    FS.r = np.zeros((n, 3, N))
+    FS.r[:, 0, :] = 0.05 * np.sin(phase)
+    FS.r[:, 2, :] = s[None, :] - 0.1 * t[:, None]
+    FS.r += 1e-6 * rng.standard_normal(FS.r.shape)
+
+    FS.D_F_dot = - 1.0 - 0.1 * np.sin(4 * np.pi * t) + 1e-6 * rng.standard_normal(n)
+
+    return FS
+
+def read_times(h5_filepath):
+    '''
+    Wall times of the access patterns
+    '''
+    times = {}
+
+    with h5py.File(h5_filepath, 'r') as h5:
+
+        k = h5['FS']['k']
+        N = k.shape[-1]
+        s_idx_arr = np.arange(int(0.1 * N), int(0.9 * N) + 1)
+
+        start = time.perf_counter()
+        for i in range(k.shape[0]):
+            for idx in s_idx_arr:
+                k[i, :, 0, idx]
+        times['point'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(k.shape[0]):
+            for key in FS_KEYS:
+                h5['FS'][key][i]
+        times['slab'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        h5['FS']['D_F_dot'][:]
+        times['scalar'] = time.perf_counter() - start
+
+    return times
+
+def report(args):
+
+    param = UndulationExperiment.parameter_parser().parse_args([])
+    param.T = args.n * param.dt
+
+    lam_param = {'v_min': 0.5, 'v_max': 2.0, 'N': args.n_sim,
+        'step': None, 'round': 4, 'log': False}
+
+    PG = ParameterGrid(vars(param), {'lam': lam_param})
+
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        sim_dir = Path(tmp_dir) / 'simulations'
+        store = PackStore(sim_dir)
+
+        for h, p in zip(PG.hash_arr, PG.param_arr):
+            param.lam = p['lam']
+            FS = synthetic_output(rng, param, args.n, args.N)
+            store.append(h, FS, FrameSequence([]), None, p, 0, 0.0)
+
+        print(f'{args.n_sim} simulations, {args.n} time steps, {args.N} mesh points\n')
+        print(f'{"layout":>16}{"pool [s]":>10}{"size [MB]":>11}'
+            f'{"point [s]":>11}{"slab [s]":>10}{"scalar [s]":>12}')
+
+        for name, storage in LAYOUTS.items():
+
+            h5_filepath = Path(tmp_dir) / f'{name}.h5'
+
+            start = time.perf_counter()
+            h5 = Saver.save_data(h5_filepath, PG, sim_dir, FS_KEYS, None,
+                N_worker = args.N_worker, storage = storage)
+            h5.close()
+            pool_time = time.perf_counter() - start
+
+            size = h5_filepath.stat().st_size / 2**20
+            times = read_times(h5_filepath)
+
+            print(f'{name:>16}{pool_time:>10.2f}{size:>11.1f}'
+                f'{times["point"]:>11.3f}{times["slab"]:>10.3f}{times["scalar"]:>12.4f}')
+
+    return
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser()
+    parser.add_argument('--n_sim', type = int, default = 64,
+        help = 'Number of simulations')
+    parser.add_argument('--N', type = int, default = 100,
+        help = 'Number of mesh points')
+    parser.add_argument('--n', type = int, default = 500,
+        help = 'Number of time steps')
+    parser.add_argument('--N_worker', type = int, default = 4,
+        help = 'Number of processes which read simulation results')
+
+    report(parser.parse_args())
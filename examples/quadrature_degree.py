@@ -0,0 +1,85 @@
+'''
+Benchmark and accuracy report for the quadrature degree policy of the Worm
+class. For every form family, i.e. weak form, projected outputs and assembled
+functionals, the quadrature degree is varied while the other families use the
+degree estimated by UFL. Swimming speed and power balance are compared against
+the reference simulation with estimated degrees.
+
+Usage: python quadrature_degree.py [--N 250 --dt 0.001 --T 3 ...]
+'''
+# Built-in
+from sys import argv
+import time
+
+# Third-party
+import numpy as np
+
+# Local imports
+from minimal_worm import Worm, ModelParameter
+from minimal_worm.experiments.undulation import UndulationExperiment
+from minimal_worm.experiments import PostProcessor
+
+# Tested quadrature degrees
+DEGREES = [1, 2, 3, 4, 6]
+# Relative tolerance for swimming speed and power balance
+RTOL = 1e-3
+
+def simulate(param, quad_degree):
+    '''
+    Returns wall time, swimming speed and relative power balance error
+    '''
+    MP = ModelParameter(param)
+    CS = UndulationExperiment.stw_control_sequence(param)
+
+    worm = Worm(param.N, param.dt, quiet = True, quad_degree = quad_degree)
+
+    start = time.perf_counter()
+    FS, _, e, _ = worm.solve(param.T, MP, CS,
+        FK = ['t', 'r', 'V_dot', 'D_I_dot', 'D_F_dot', 'W_dot'])
+    wall_time = time.perf_counter() - start
+
+    assert e is None, e
+
+    # Crop first period
+    Delta_t = 1.0
+    idx_arr = FS.t >= Delta_t
+
+    U, _, _ = PostProcessor.comp_mean_swimming_speed(FS.r, FS.t, Delta_t)
+
+    err = FS.V_dot - FS.D_I_dot - FS.D_F_dot - FS.W_dot
+    err = np.abs(err[idx_arr]).max() / np.abs(FS.W_dot[idx_arr]).max()
+
+    return wall_time, U, err
+
+def report(param):
+
+    t_ref, U_ref, err_ref = simulate(param, None)
+
+    print(f'Reference (UFL estimate): wall time={t_ref:.2f}s, U={U_ref:.6f}, '
+        f'power balance error={err_ref:.2e}')
+
+    for family in ['form', 'output', 'functional']:
+
+        print(f'\n{family}')
+        print(f'{"degree":>8}{"speed-up":>10}{"U rel err":>12}{"balance err":>14}')
+        cheapest = None
+
+        for d in DEGREES:
+            wall_time, U, err = simulate(param, {family: d})
+            U_err = np.abs(U - U_ref) / np.abs(U_ref)
+
+            print(f'{d:>8}{t_ref / wall_time:>10.2f}{U_err:>12.2e}{err:>14.2e}')
+
+            if cheapest is None and U_err < RTOL and err < max(RTOL, err_ref):
+                cheapest = d
+
+        print(f'Cheapest degree within tolerance: {cheapest}')
+
+    return
+
+if __name__ == '__main__':
+
+    parser = UndulationExperiment.parameter_parser()
+    param = parser.parse_args(argv[1:])
+
+    report(param)
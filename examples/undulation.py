@@ -11,7 +11,7 @@ import matplotlib.pyplot as plt
 
 # local imports
 from minimal_worm import Worm
-from minimal_worm import ModelParameter  
+from minimal_worm import ModelParameter, mesh_param
 from minimal_worm.experiments import simulate_experiment 
 from minimal_worm.experiments.undulation import UndulationExperiment
 from minimal_worm.experiments import PostProcessor
@@ -29,7 +29,8 @@ if __name__ == '__main__':
         print(cml_args)
 
     MP = ModelParameter(model_param)
-    worm = Worm(model_param.N, model_param.dt, fdo = model_param.fdo, quiet=False)
+    worm = Worm(model_param.N, model_param.dt, fdo = model_param.fdo, quiet=False, 
+        mesh_grading = mesh_param(model_param))
     CS = UndulationExperiment.stw_control_sequence(model_param)
         
     FS, CS, MP, e = simulate_experiment(worm, model_param, CS)
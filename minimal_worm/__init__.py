@@ -1,4 +1,5 @@
 from .worm import Worm
-from .model_parameters import ModelParameter, parameter_parser, physical_to_dimless_parameters, pic_param
+from .model_parameters import ModelParameter, parameter_parser, physical_to_dimless_parameters, dimless_parameters, pic_param, mesh_param, quad_param, solver_param, retry_param, report_param, metrics_param
+from .objectives import Objective
 from .frame import Frame, FrameSequence, FRAME_KEYS, POWER_KEYS
 
@@ -2,3 +2,7 @@ from .experiment import Experiment, simulate_experiment
 from .post_processor import PostProcessor
 from .sweeper import  Sweeper
 from .saver import Saver
+from .pack_store import PackStore
+from .manifest import Manifest
+from .cache import SimulationCache
+from .scheduler import CostModel, CostScheduler
@@ -36,6 +36,8 @@ def default_sweep_parameter():
         help = 'If true, FrameSequences are pickled to disk')     
     parser.add_argument('--overwrite', action=BooleanOptionalAction, default = False,
         help = 'If true, already existing simulation results are overwritten')
+    parser.add_argument('--shard', type = Sweeper.parse_shard, default = None,
+        help = 'Shard i/n, e.g. 0/4, if given, only the grid points of shard i out of n are run and results are neither pooled nor analysed')
     parser.add_argument('--debug', action=BooleanOptionalAction, default = False,
         help = 'If true, exception handling is turned off which is helpful for debugging')    
     parser.add_argument('--save_to_storage', action=BooleanOptionalAction, default = False,
@@ -268,7 +270,8 @@ def sweep_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -284,8 +287,8 @@ def sweep_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
     
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
     
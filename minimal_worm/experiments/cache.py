@@ -0,0 +1,283 @@
+# Built-in
+from typing import Callable, Dict, List, Optional
+from pathlib import Path
+from numbers import Number
+import inspect
+import hashlib
+import shutil
+import socket
+import os
+import time
+import json
+
+# Third-party
+import numpy as np
+
+# Local imports
+import minimal_worm
+from .pack_store import PackStore
+
+class SimulationCache():
+    '''
+    Content-addressed cache of simulation results shared across sweeps.
+
+    Results are keyed by a canonical hash of all parameters which affect
+    the result, the frame keys, the control sequence function and the
+    version of the solver code, i.e. the same simulation requested by
+    different ParameterGrids has the same key.
+
+    Every entry is a PackStore in objects/<key>. Access events are appended
+    to per-process catalog logs catalog_<host>_<pid>.log, i.e. worker
+    processes never write to the same file. Entries are evicted by the
+    process which runs the sweep if the size of the cache exceeds max_bytes,
+    either least recently used (lru) or least frequently used (lfu) first.
+    Pinned entries are never evicted.
+    '''
+
+    # Parameters which do not affect the result
+    EXCLUDE = ['profile', 'solver_cache']
+
+    def __init__(self,
+            cache_dir: Path,
+            max_bytes: Optional[int] = None,
+            policy: str = 'lru'):
+        '''
+        :param cache_dir: cache directory
+        :param max_bytes: size budget, if None, entries are never evicted
+        :param policy: eviction policy, 'lru' or 'lfu'
+        '''
+        assert policy in ['lru', 'lfu'], f"Eviction policy must be 'lru' or 'lfu', got '{policy}'"
+
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._catalog = None
+
+    @staticmethod
+    def _canonical(v):
+        '''
+        Converts parameter value into json serializable value which does
+        not depend on numeric types and round-off errors
+        '''
+        if isinstance(v, (bool, str)) or v is None:
+            return v
+        if isinstance(v, Number):
+            return float(f'{float(v):.12g}')
+        if isinstance(v, np.ndarray):
+            return [SimulationCache._canonical(x) for x in v.tolist()]
+        if isinstance(v, (list, tuple)):
+            return [SimulationCache._canonical(x) for x in v]
+        if isinstance(v, dict):
+            return {k: SimulationCache._canonical(x) for k, x in sorted(v.items())}
+
+        return repr(v)
+
+    @staticmethod
+    def code_version(create_CS: Optional[Callable] = None) -> str:
+        '''
+        Hash of the solver modules and the module which
+        defines the control sequence function
+        '''
+        filepaths = sorted(Path(minimal_worm.__file__).parent.glob('*.py'))
+
+        if create_CS is not None:
+            filepaths.append(Path(inspect.getfile(create_CS)))
+
+        sha = hashlib.sha256()
+
+        for filepath in filepaths:
+            sha.update(filepath.read_bytes())
+
+        return sha.hexdigest()
+
+    @staticmethod
+    def key(param: Dict,
+            FK: List[str],
+            create_CS: Optional[Callable] = None,
+            code_version: Optional[str] = None) -> str:
+        '''
+        Canonical hash of the simulation
+
+        :param param: model, control and numerical parameters
+        :param FK: frame keys
+        :param create_CS: control sequence function
+        :param code_version: see SimulationCache.code_version,
+            computed if None
+        '''
+        if code_version is None:
+            code_version = SimulationCache.code_version(create_CS)
+
+        content = {
+            'param': {k: SimulationCache._canonical(v) for k, v in sorted(param.items())
+                if k not in SimulationCache.EXCLUDE},
+            'FK': sorted(FK) if FK is not None else None,
+            'create_CS': None if create_CS is None
+                else f'{create_CS.__module__}.{create_CS.__qualname__}',
+            'code_version': code_version
+        }
+
+        return hashlib.sha256(json.dumps(content, sort_keys = True).encode()).hexdigest()
+
+    @property
+    def catalog(self) -> Dict[str, Dict]:
+        '''
+        Size, access statistics and pin of every entry, loaded lazily
+        '''
+        if self._catalog is None:
+            self._catalog = self._load_catalog()
+
+        return self._catalog
+
+    def refresh(self):
+        '''
+        Reloads the catalog, e.g. after other processes have logged events
+        '''
+        self._catalog = None
+
+    def _load_catalog(self) -> Dict[str, Dict]:
+
+        events = []
+
+        for log_path in self.cache_dir.glob('catalog_*.log'):
+            with open(log_path, 'r') as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Incomplete line if the process was killed while writing
+                        continue
+
+        catalog = {}
+
+        for e in sorted(events, key = lambda e: e['time']):
+            SimulationCache._apply(catalog, e)
+
+        return catalog
+
+    @staticmethod
+    def _apply(catalog: Dict[str, Dict], e: Dict):
+        '''
+        Updates catalog with event
+        '''
+        key = e['key']
+
+        if e['event'] == 'put':
+            catalog[key] = {'size': e['size'], 'created': e['time'],
+                'last_access': e['time'], 'n_access': 0, 'pinned': False}
+        elif key not in catalog:
+            return
+        elif e['event'] == 'hit':
+            catalog[key]['last_access'] = e['time']
+            catalog[key]['n_access'] += 1
+        elif e['event'] == 'pin':
+            catalog[key]['pinned'] = e['pinned']
+        elif e['event'] == 'evict':
+            del catalog[key]
+
+        return
+
+    def _log(self, event: str, key: str, **kwargs):
+        '''
+        Appends event to the catalog log of the calling process
+        '''
+        self.cache_dir.mkdir(parents = True, exist_ok = True)
+
+        e = {'event': event, 'key': key, 'time': time.time(), **kwargs}
+
+        log_path = self.cache_dir / f'catalog_{socket.gethostname()}_{os.getpid()}.log'
+
+        with open(log_path, 'a') as f:
+            f.write(json.dumps(e) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._catalog is not None:
+            SimulationCache._apply(self._catalog, e)
+
+        return
+
+    def _entry_dir(self, key: str) -> Path:
+
+        return self.cache_dir / 'objects' / key
+
+    def has(self, key: str) -> bool:
+
+        return key in self.catalog
+
+    def get(self, key: str) -> Dict:
+        '''
+        Loads cached simulation output, see PackStore.load
+        '''
+        output = PackStore(self._entry_dir(key)).load(key)
+        self._log('hit', key)
+
+        return output
+
+    def put(self, key: str, output: Dict):
+        '''
+        Caches simulation output
+
+        :param key: canonical hash
+        :param output: simulation output, see PackStore.load
+        '''
+        if self.has(key):
+            return
+
+        entry_dir = self._entry_dir(key)
+
+        # Remove incomplete entry of an interrupted put
+        if entry_dir.exists():
+            shutil.rmtree(entry_dir)
+
+        PackStore(entry_dir).append(key, output['FS'], output['CS'], output['MP'],
+            output['param'], output['exit_status'], output['sim_t'])
+
+        size = sum(f.stat().st_size for f in entry_dir.iterdir())
+
+        self._log('put', key, size = size)
+
+        return
+
+    def pin(self, key: str, pinned: bool = True):
+        '''
+        Pinned entries are never evicted
+        '''
+        if self.has(key):
+            self._log('pin', key, pinned = pinned)
+
+        return
+
+    def size(self) -> int:
+
+        return sum(e['size'] for e in self.catalog.values())
+
+    def evict(self) -> List[str]:
+        '''
+        Evicts unpinned entries until the cache fits into the size budget
+
+        :return: evicted keys
+        '''
+        if self.max_bytes is None:
+            return []
+
+        if self.policy == 'lru':
+            order = lambda k: self.catalog[k]['last_access']
+        else:
+            order = lambda k: (self.catalog[k]['n_access'], self.catalog[k]['last_access'])
+
+        keys = sorted([k for k, e in self.catalog.items() if not e['pinned']], key = order)
+
+        size = self.size()
+        evicted = []
+
+        for key in keys:
+            if size <= self.max_bytes:
+                break
+            size -= self.catalog[key]['size']
+            evicted.append(key)
+
+        for key in evicted:
+            self._log('evict', key)
+            shutil.rmtree(self._entry_dir(key), ignore_errors = True)
+
+        return evicted
@@ -18,7 +18,7 @@ from tqdm import tqdm
 # Local imports
 from minimal_worm import Worm
 from minimal_worm import FrameSequence
-from minimal_worm import ModelParameter, parameter_parser, physical_to_dimless_parameters, pic_param
+from minimal_worm import ModelParameter, parameter_parser, physical_to_dimless_parameters, pic_param, solver_param, retry_param, report_param, metrics_param
 from mp_progress_logger import FWException
             
 class Experiment(ABC):      
@@ -152,9 +152,19 @@ def simulate_experiment(worm: Worm,
     
     MP = ModelParameter(param)
     picard = pic_param(param)
+    retry = retry_param(param)
+    
+    # Frames are not needed if only metrics are saved
+    if param.metrics_only:
+        FK = []
+    
+    if solver is None:
+        solver = solver_param(param)
                         
     FS, CS, e, sim_t = worm.solve(param.T, MP, CS, F0, solver, picard=picard, FK=FK, pbar=pbar, 
-        logger=logger, dt_report=param.dt_report, N_report=param.N_report) 
+        logger=logger, dt_report=param.dt_report, N_report=param.N_report, 
+        profile=param.profile, retry=retry, t_report_start=param.t_report_start, 
+        report_policy=report_param(param), metrics=metrics_param(param)) 
                               
     return FS, CS, MP, e, sim_t 
 
@@ -0,0 +1,188 @@
+# Built-in
+from typing import Dict, List, Optional
+from pathlib import Path
+from sys import argv
+import os
+import socket
+import time
+import json
+
+# Third-party
+import numpy as np
+
+class Manifest():
+    '''
+    Completion manifest of a sweep.
+
+    Every worker process appends one json line per event to its own log
+    file manifest_<host>_<pid>.log in sim_dir, i.e. no file is written by
+    more than one process. Lines are written with a single call and flushed
+    to disk, the reader skips incomplete lines. A task is logged as running
+    when it starts and as done or failed after its results have been saved
+    to the result store, i.e. the manifest never refers to incomplete results.
+
+    Resume, status summaries and pooling only need the manifest. Result
+    payloads are not touched.
+    '''
+
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, sim_dir: Path):
+        '''
+        :param sim_dir: result directory
+        '''
+        self.sim_dir = Path(sim_dir)
+        self._records = None
+
+    @property
+    def records(self) -> Dict[str, Dict]:
+        '''
+        Most recent record for every hash, loaded lazily
+        '''
+        if self._records is None:
+            self._records = self._load()
+
+        return self._records
+
+    def refresh(self):
+        '''
+        Reloads the manifest, e.g. after other workers have logged events
+        '''
+        self._records = None
+
+    def _load(self) -> Dict[str, Dict]:
+
+        records = {}
+
+        for log_path in sorted(self.sim_dir.glob('manifest_*.log')):
+            with open(log_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Incomplete line if the worker was killed while writing
+                        continue
+                    h = record['hash']
+                    if h not in records or records[h]['time'] <= record['time']:
+                        records[h] = record
+
+        return records
+
+    def _log(self, record: Dict):
+        '''
+        Appends record to the log file of the calling process
+        '''
+        self.sim_dir.mkdir(parents = True, exist_ok = True)
+
+        record['host'] = socket.gethostname()
+        record['pid'] = os.getpid()
+        record['time'] = time.time()
+
+        log_path = self.sim_dir / f'manifest_{record["host"]}_{record["pid"]}.log'
+
+        with open(log_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._records is not None:
+            self._records[record['hash']] = record
+
+        return
+
+    def start(self, h: str, T: float):
+        '''
+        Logs start of the task
+
+        :param h: parameter hash
+        :param T: simulation time
+        '''
+        self._log({'hash': h, 'status': Manifest.RUNNING, 'T': T,
+            'started': time.time()})
+
+    def finish(self,
+            h: str,
+            exit_status: int,
+            sim_t: Optional[float],
+            T: float,
+            t_end: Optional[float]):
+        '''
+        Logs end of the task after its results have been saved
+
+        :param h: parameter hash
+        :param exit_status: if 0, then the simulation finished succesfully, if 1, error occured
+        :param sim_t: wall-clock time of the simulation
+        :param T: simulation time
+        :param t_end: last reported simulation time
+        '''
+        started = self.records.get(h, {}).get('started')
+
+        self._log({
+            'hash': h,
+            'status': Manifest.FAILED if exit_status else Manifest.DONE,
+            'exit_status': int(exit_status),
+            'sim_t': sim_t,
+            'T': T,
+            't_end': t_end,
+            'started': started
+        })
+
+    def status(self, h: str) -> Optional[str]:
+        '''
+        Status of the task, None if it has never been started
+        '''
+        if h not in self.records:
+            return None
+
+        return self.records[h]['status']
+
+    def is_finished(self, h: str) -> bool:
+        '''
+        Checks if the results of the task have been saved
+        '''
+        return self.status(h) in [Manifest.DONE, Manifest.FAILED]
+
+    def summary(self, hash_arr: Optional[List[str]] = None) -> Dict:
+        '''
+        Number of tasks per status and wall-clock times of finished tasks
+
+        :param hash_arr: hashes of the sweep, if None, all logged tasks
+        '''
+        if hash_arr is None:
+            hash_arr = list(self.records.keys())
+
+        status_arr = [self.status(h) for h in hash_arr]
+
+        summary = {s: status_arr.count(s)
+            for s in [Manifest.DONE, Manifest.FAILED, Manifest.RUNNING]}
+        summary['missing'] = status_arr.count(None)
+
+        sim_t_arr = np.array([self.records[h]['sim_t'] for h, s in zip(hash_arr, status_arr)
+            if s in [Manifest.DONE, Manifest.FAILED] and self.records[h]['sim_t'] is not None])
+
+        if len(sim_t_arr) > 0:
+            summary['sim_t_mean'] = sim_t_arr.mean()
+            summary['sim_t_max'] = sim_t_arr.max()
+            summary['sim_t_total'] = sim_t_arr.sum()
+
+        return summary
+
+    def print_summary(self, hash_arr: Optional[List[str]] = None):
+
+        summary = self.summary(hash_arr)
+
+        print(f'done: {summary[Manifest.DONE]}, failed: {summary[Manifest.FAILED]}, '
+            f'running: {summary[Manifest.RUNNING]}, missing: {summary["missing"]}')
+
+        if 'sim_t_mean' in summary:
+            print(f'Simulation time: mean {summary["sim_t_mean"]:.1f}s, '
+                f'max {summary["sim_t_max"]:.1f}s, total {summary["sim_t_total"]/3600:.2f}h')
+
+        return
+
+if __name__ == '__main__':
+
+    # Usage: python manifest.py <sim_dir>
+    Manifest(argv[1]).print_summary()
@@ -0,0 +1,352 @@
+# Built-in
+from typing import Dict, List, Optional
+from types import SimpleNamespace
+from pathlib import Path
+import os
+import socket
+import time
+import json
+import pickle
+
+# Third-party
+import numpy as np
+
+# Local imports
+from minimal_worm import FrameSequence
+
+class PackStore():
+    '''
+    Append-only store for simulation results of a sweep.
+
+    Every worker process appends the raw buffers of all arrays in the
+    FrameSequence and ControlSequence to its own pack file and one json
+    record per simulation to its own index file:
+
+        pack_<host>_<pid>.bin: array buffers followed by a pickled blob with the
+            parameter dictionary, model parameter and all non-array attributes
+        pack_<host>_<pid>.idx: hash, exit status, sim_t, last reported time, and
+            offset, shape and dtype of every array
+
+    Files are named by host and process, i.e. sweeps which are sharded across
+    nodes can share the same store.
+
+    Records are written after the buffers have been flushed, i.e. the index
+    never refers to incomplete data. If a hash has been written more than once,
+    e.g. with overwrite=True, then the most recent record is used.
+
+    Arrays are memory-mapped by the reader, i.e. only the bytes which are
+    accessed are read from disk. Sweeps which have been saved as one pickle
+    file <hash>.dat per simulation are read transparently.
+    '''
+
+    # Array buffers are aligned to cache lines
+    ALIGN = 64
+
+    def __init__(self, sim_dir: Path):
+        '''
+        :param sim_dir: result directory
+        '''
+        self.sim_dir = Path(sim_dir)
+        self._index = None
+
+    @staticmethod
+    def exists(sim_dir: Path) -> bool:
+        '''
+        Checks if sim_dir contains a pack store
+        '''
+        return any(Path(sim_dir).glob('pack_*.idx'))
+
+    @property
+    def index(self) -> Dict[str, Dict]:
+        '''
+        Merged index of all workers, loaded lazily
+        '''
+        if self._index is None:
+            self._index = self._load_index()
+
+        return self._index
+
+    def refresh(self):
+        '''
+        Reloads the index, e.g. after other workers have appended results
+        '''
+        self._index = None
+
+    def _load_index(self) -> Dict[str, Dict]:
+
+        index = {}
+
+        for idx_path in sorted(self.sim_dir.glob('pack_*.idx')):
+            with open(idx_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Incomplete record if the worker was killed while writing
+                        continue
+                    h = record['hash']
+                    if h not in index or index[h]['time'] <= record['time']:
+                        index[h] = record
+
+        return index
+
+    def _legacy_filepath(self, h: str) -> Path:
+
+        return self.sim_dir / (h + '.dat')
+
+    def _load_legacy(self, h: str) -> Dict:
+
+        with open(self._legacy_filepath(h), 'rb') as f:
+            return pickle.load(f)
+
+    def has(self, h: str) -> bool:
+        '''
+        Checks if results for given hash have been saved
+        '''
+        return h in self.index or self._legacy_filepath(h).exists()
+
+    def exit_status(self, h: str) -> int:
+        '''
+        Exit status of the simulation, 0 if it finished successfully
+        '''
+        if h in self.index:
+            return self.index[h]['exit_status']
+
+        return self._load_legacy(h)['exit_status']
+
+    def sim_t(self, h: str) -> Optional[float]:
+        '''
+        Wall-clock time of the simulation
+        '''
+        if h in self.index:
+            return self.index[h]['sim_t']
+
+        return self._load_legacy(h)['sim_t']
+
+    def t_end(self, h: str) -> Optional[float]:
+        '''
+        Last reported simulation time, None if no frames were reported
+        '''
+        if h in self.index:
+            return self.index[h]['t_end']
+
+        FS = self._load_legacy(h)['FS']
+
+        return PackStore.last_reported_time(FS)
+
+    def array(self, h: str, key: str) -> np.ndarray:
+        '''
+        Memory-maps a single array, e.g. key = 'FS/r' or 'CS/k0'
+        '''
+        record = self.index[h]
+        offset, shape, dtype = record['arrays'][key]
+        shape = tuple(shape)
+
+        # Zero-sized buffers can not be mapped
+        if np.prod(shape) == 0:
+            return np.empty(shape, dtype = dtype)
+
+        return np.memmap(self.sim_dir / record['pack'], dtype = dtype, mode = 'r',
+            offset = offset, shape = (int(np.prod(shape)), )).reshape(shape)
+
+    def meta(self, h: str) -> Dict:
+        '''
+        Unpickles the parameter dictionary, model parameter and
+        non-array attributes, e.g. FS.metrics or FS.profile
+        '''
+        record = self.index[h]
+        offset, size = record['meta']
+
+        # Aliases save their own parameter dictionary, see alias
+        with open(self.sim_dir / record.get('meta_pack', record['pack']), 'rb') as f:
+            f.seek(offset)
+            return pickle.loads(f.read(size))
+
+    def load(self,
+            h: str,
+            FS_keys: Optional[List[str]] = None,
+            CS_keys: Optional[List[str]] = None) -> Dict:
+        '''
+        Loads simulation output as dictionary with keys param, MP,
+        exit_status, sim_t, FS and CS. Arrays are memory-mapped.
+
+        :param h: parameter hash
+        :param FS_keys: frame keys, if None, all frame arrays are mapped
+        :param CS_keys: control keys, if None, all control arrays are mapped
+        '''
+        if h not in self.index:
+            return self._load_legacy(h)
+
+        record = self.index[h]
+        meta = self.meta(h)
+
+        output = {}
+        output['param'] = meta['param']
+        output['MP'] = meta['MP']
+        output['exit_status'] = record['exit_status']
+        output['sim_t'] = record['sim_t']
+        output['FS'] = FrameSequence([])
+        output['CS'] = SimpleNamespace()
+
+        for key, v in meta['attrs'].items():
+            PackStore._set_nested(output, key, v)
+
+        for key in record['arrays'].keys():
+            prefix, name = key.split('/')[0], key.split('/')[1]
+            keys = FS_keys if prefix == 'FS' else CS_keys
+            # Scalar arrays like FS.s are always loaded
+            if keys is not None and name not in keys and name not in ['t', 's']:
+                continue
+            PackStore._set_nested(output, key, self.array(h, key))
+
+        return output
+
+    @staticmethod
+    def _set_nested(output: Dict, key: str, v):
+        '''
+        Sets attribute for key, e.g. FS/reduced/t sets FS.reduced.t
+        '''
+        names = key.split('/')
+        obj = output[names[0]]
+
+        for name in names[1:-1]:
+            if not hasattr(obj, name):
+                setattr(obj, name, FrameSequence([]))
+            obj = getattr(obj, name)
+
+        setattr(obj, names[-1], v)
+
+    @staticmethod
+    def last_reported_time(FS) -> Optional[float]:
+        '''
+        Last reported simulation time of FS, None if no frames were reported
+        '''
+        if not hasattr(FS, 't') or len(FS.t) == 0:
+            return None
+
+        return float(FS.t[-1])
+
+    @staticmethod
+    def _pack_name() -> str:
+        '''
+        Pack file name of the calling process without suffix
+        '''
+        return f'pack_{socket.gethostname()}_{os.getpid()}'
+
+    def _write_bytes(self, f, b: bytes) -> int:
+        '''
+        Appends aligned buffer and returns its offset
+        '''
+        offset = f.tell()
+        pad = -offset % PackStore.ALIGN
+        f.write(b'\0' * pad)
+        f.write(b)
+
+        return offset + pad
+
+    def _write_attrs(self, f, prefix: str, obj, arrays: Dict, attrs: Dict):
+        '''
+        Appends arrays of obj to pack file and collects all other attributes
+        '''
+        for name, v in vars(obj).items():
+            key = f'{prefix}/{name}'
+            if isinstance(v, np.ndarray) and v.dtype != object:
+                v = np.ascontiguousarray(v)
+                arrays[key] = (self._write_bytes(f, v.tobytes()), v.shape, v.dtype.str)
+            elif isinstance(v, FrameSequence):
+                # Reduced frames
+                self._write_attrs(f, key, v, arrays, attrs)
+            else:
+                attrs[key] = v
+
+    def append(self,
+            h: str,
+            FS: FrameSequence,
+            CS: SimpleNamespace,
+            MP,
+            param: Dict,
+            exit_status: int = 1,
+            sim_t: Optional[float] = None):
+        '''
+        Appends simulation output to the pack file of the calling process
+
+        :param h: parameter hash
+        :param FS: frame sequence
+        :param CS: control sequence
+        :param MP: model parameter
+        :param param: parameter dictionary
+        :param exit_status: if 0, then the simulation finished succesfully, if 1, error occured
+        :param sim_t: wall-clock time of the simulation
+        '''
+        self.sim_dir.mkdir(parents = True, exist_ok = True)
+
+        pack = PackStore._pack_name() + '.bin'
+
+        arrays, attrs = {}, {}
+
+        with open(self.sim_dir / pack, 'ab') as f:
+            self._write_attrs(f, 'FS', FS, arrays, attrs)
+            self._write_attrs(f, 'CS', CS, arrays, attrs)
+
+            blob = pickle.dumps({'param': param, 'MP': MP, 'attrs': attrs})
+            meta = (self._write_bytes(f, blob), len(blob))
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        record = {
+            'hash': h,
+            'pack': pack,
+            'exit_status': int(exit_status),
+            'sim_t': sim_t,
+            't_end': PackStore.last_reported_time(FS),
+            'time': time.time(),
+            'arrays': arrays,
+            'meta': meta
+        }
+
+        # Single write call of one line per record
+        with open(self.sim_dir / (PackStore._pack_name() + '.idx'), 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+        if self._index is not None:
+            self._index[h] = record
+
+        return
+
+    def alias(self, h: str, h_src: str, param: Dict):
+        '''
+        Appends record for hash h which refers to the saved results
+        of h_src, i.e. no arrays are copied. Only the parameter 
+        dictionary of h is saved.
+
+        :param h: parameter hash
+        :param h_src: parameter hash of the saved results
+        :param param: parameter dictionary of h
+        '''
+        if h_src not in self.index:
+            # Results saved as pickle file are copied
+            data = self._load_legacy(h_src)
+            self.append(h, data['FS'], data['CS'], data['MP'], param,
+                data['exit_status'], data['sim_t'])
+            return
+
+        meta = {**self.meta(h_src), 'param': param}
+        pack = PackStore._pack_name() + '.bin'
+
+        with open(self.sim_dir / pack, 'ab') as f:
+            blob = pickle.dumps(meta)
+            offset = self._write_bytes(f, blob)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Arrays are read from the pack file of h_src
+        record = {**self.index[h_src], 'hash': h, 'alias': h_src, 'time': time.time(),
+            'meta_pack': pack, 'meta': (offset, len(blob))}
+
+        with open(self.sim_dir / (PackStore._pack_name() + '.idx'), 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+        self._index[h] = record
+
+        return
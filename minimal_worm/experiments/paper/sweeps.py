@@ -114,6 +114,8 @@ def default_sweep_parameter():
                         help='If true, analyse pooled raw data')
     parser.add_argument('--overwrite', action=BooleanOptionalAction, default=False,
                         help='If true, already existing simulation results are overwritten')
+    parser.add_argument('--shard', type=Sweeper.parse_shard, default=None,
+                        help='Shard i/n, e.g. 0/4, if given, only the grid points of shard i out of n are run and results are neither pooled nor analysed')
     parser.add_argument('--debug', action=BooleanOptionalAction, default=False,
                         help='If true, exception handling is turned off which is helpful for debugging')
     parser.add_argument('--save_to_storage', action=BooleanOptionalAction, default=False,
@@ -350,7 +352,8 @@ def sweep_lam0_c0(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -367,13 +370,13 @@ def sweep_lam0_c0(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # ===============================================================================
     # Post analysis
     # ===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -479,7 +482,8 @@ def sweep_mu_lam0_c0(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -498,13 +502,13 @@ def sweep_mu_lam0_c0(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # ===============================================================================
     # Post analysis
     # ===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -601,7 +605,8 @@ def sweep_a_b(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -617,13 +622,13 @@ def sweep_a_b(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # ===============================================================================
     # Post analysis
     # ===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -730,7 +735,8 @@ def sweep_a_b_mu_loop(argv):
                 sim_dir,
                 sweep_param.overwrite,
                 sweep_param.debug,
-                'UExp')
+                'UExp',
+                shard = sweep_param.shard)
 
         PG_filepath = PG.save(log_dir)
         print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -746,13 +752,13 @@ def sweep_a_b_mu_loop(argv):
 
         h5_filepath = sweep_dir / filename
 
-        if sweep_param.pool:
-            Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+        if sweep_param.pool and sweep_param.shard is None:
+            Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
         # ===============================================================================
         # Post analysis
         # ===============================================================================
-        if sweep_param.analyse:
+        if sweep_param.analyse and sweep_param.shard is None:
             sweep_param.A = True
             sweep_param.lam = True
             sweep_param.psi = True
@@ -857,7 +863,8 @@ def sweep_mu_a_b(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -873,13 +880,13 @@ def sweep_mu_a_b(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # ===============================================================================
     # Post analysis
     # ===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -955,7 +962,8 @@ def sweep_mu_lam_A_exp(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -969,13 +977,13 @@ def sweep_mu_lam_A_exp(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # ===============================================================================
     # Post analysis
     # ===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
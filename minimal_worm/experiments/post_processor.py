@@ -4,7 +4,7 @@ Created on 10 Jan 2023
 @author: lukas
 '''
 # Built-in
-from typing import Tuple
+from typing import Optional, Tuple
 
 # Third-party
 import numpy as np
@@ -31,15 +31,33 @@ class PostProcessor(object):
         'V_dot': 'V' # Elastic potential rate
     }
     
+
+    @staticmethod
+    def comp_com(r: np.ndarray, s: Optional[np.ndarray] = None):
+        '''
+        Computes centre of mass coordinates, i.e. the body average of the 
+        centreline coordinates.
+        
+        :param r (... x N): centreline coordinates
+        :param s (N): body coordinates of the mesh points. If None, the mesh
+            is assumed to be uniform. For non-uniform meshes, the body average 
+            is computed using the trapezoidal rule
+        '''
+        if s is None or np.allclose(np.diff(s), s[1] - s[0]):
+            return r.mean(axis = -1)
+        
+        return trapz(r, x = s, axis = -1) / (s[-1] - s[0])
                     
     @staticmethod
-    def comp_com_velocity(r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0):
+    def comp_com_velocity(r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0, 
+            s: Optional[np.ndarray] = None):
         '''
         Computes centre of mass velocity as a function of time
     
         :param r (n x 3 x N): centreline coordinates
         :param t (n): time stamps 
         :param Delta_t: crop time points t < Delta_t
+        :param s (N): body coordinates of the mesh points 
         '''        
 
         idx_arr = t >= Delta_t
@@ -48,7 +66,7 @@ class PostProcessor(object):
         dt = t[1] - t[0]        
         
         # Com trajectory
-        r_com = np.mean(r, axis = 2)            
+        r_com = PostProcessor.comp_com(r, s)            
         
         # Absolute com velocity as a function of time        
         v_com_vec = np.gradient(r_com, dt, axis=0, edge_order=1)    
@@ -60,15 +78,16 @@ class PostProcessor(object):
         return r_com, v_com_vec, v_com, V, t
 
     @staticmethod
-    def comp_centreline_curvature(r: np.ndarray):
+    def comp_centreline_curvature(r: np.ndarray, s: Optional[np.ndarray] = None):
         '''
         Computes centre curvature to compare against generalized
         curvature vector
     
         :param r (n x 3 x N): centreline coordinates
+        :param s (N): body coordinates of the mesh points
         '''
-        #
-        ds = 1 / (r.shape[2]-1)
+        # Uniform spacing or mesh point coordinates 
+        ds = 1 / (r.shape[2]-1) if s is None else s
         # Tangent vector
         t = np.gradient(r, ds, axis = 2, edge_order = 2)
         # Curvature vector
@@ -159,7 +178,8 @@ class PostProcessor(object):
         return e_S, e_W
                 
     @staticmethod
-    def comp_mean_swimming_speed(r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0):
+    def comp_mean_swimming_speed(r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0, 
+            s: Optional[np.ndarray] = None):
         '''
         Computes average swimming speed projected onto the first principle axis
         of centre of mass movement. This gives more accurate approximation of the 
@@ -169,6 +189,7 @@ class PostProcessor(object):
         :param r (n x 3 x N): centreline coordinates
         :param t (n): time stamps 
         :param Delta_t: crop time points t < Delta_t        
+        :param s (N): body coordinates of the mesh points 
         '''        
         # crop initial transient
         idx_arr = t >= Delta_t
@@ -176,7 +197,7 @@ class PostProcessor(object):
         r = r[idx_arr,:]
         t = t[idx_arr]
                 
-        r_com = r.mean(axis = 2)
+        r_com = PostProcessor.comp_com(r, s)
         
         e_p, _ = PostProcessor.comp_propulsion_direction(r_com)
                                              
@@ -190,7 +211,8 @@ class PostProcessor(object):
         return U_avg, U, t 
 
     @staticmethod
-    def comp_max_swimming_speed(r: np.ndarray, u: np.ndarray, t: np.ndarray, Delta_t: float = 0.0):
+    def comp_max_swimming_speed(r: np.ndarray, u: np.ndarray, t: np.ndarray, Delta_t: float = 0.0, 
+            s: Optional[np.ndarray] = None):
         '''
         Computes maximum swimming speed projected onto the first and second principle axis
         of centre of mass movement. 
@@ -199,6 +221,7 @@ class PostProcessor(object):
         :param u (n x 3 x N): centreline coordinates        
         :param t (n): time stamps 
         :param Delta_t: crop time points t < Delta_t        
+        :param s (N): body coordinates of the mesh points 
         '''        
 
         # crop initial transient
@@ -207,7 +230,7 @@ class PostProcessor(object):
         r = r[idx_arr,:]
         t = t[idx_arr]
         
-        r_com = r.mean(axis = 2)        
+        r_com = PostProcessor.comp_com(r, s)        
         
         
         eS, eW = PostProcessor.comp_propulsion_direction(r_com)
@@ -224,7 +247,8 @@ class PostProcessor(object):
         return uS_max, uW_max, u_abs_max
 
     @staticmethod
-    def comp_wobbling_distance(r: np.ndarray, t: np.ndarray, Delta_T: float):
+    def comp_wobbling_distance(r: np.ndarray, t: np.ndarray, Delta_T: float, 
+            s: Optional[np.ndarray] = None):
         '''
         Computes the absolute distance that the centre of mass has travelled in the 
         wobbling direction.
@@ -234,7 +258,7 @@ class PostProcessor(object):
         idx_arr = t >= Delta_T
         r = r[idx_arr, :]
                         
-        r_com = r.mean(axis = -1)
+        r_com = PostProcessor.comp_com(r, s)
                 
         # Compute wobbling direction
         _, eW = PostProcessor.comp_propulsion_direction(r_com)
@@ -272,7 +296,8 @@ class PostProcessor(object):
         return U 
     
     @staticmethod
-    def comp_amplitude_wobbling_speed(r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0):
+    def comp_amplitude_wobbling_speed(r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0, 
+            s: Optional[np.ndarray] = None):
         '''
         Computes average amplitude of the wobbling speed. The wobbling speed is orthogonal 
         to the propulsion direction.
@@ -280,6 +305,7 @@ class PostProcessor(object):
         :param r (n x 3 x N): centreline coordinates
         :param t (n): time stamps 
         :param Delta_t: crop time points t < Delta_t        
+        :param s (N): body coordinates of the mesh points 
         '''        
         # crop initial transient
         idx_arr = t >= Delta_t
@@ -287,7 +313,7 @@ class PostProcessor(object):
         r = r[idx_arr,:]
         t = t[idx_arr]
 
-        r_com = r.mean(axis = 2)
+        r_com = PostProcessor.comp_com(r, s)
         _, eW = PostProcessor.comp_swimming_direction(r_com)
                                                                                                 
         v_com_vec = np.gradient(r_com, dt, axis=0, edge_order=1)    
@@ -423,7 +449,8 @@ class PostProcessor(object):
         return avg_psi, std_psi, max_psi, psi
 
     @staticmethod
-    def comp_propulsive_force(f_F: np.ndarray, r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0):
+    def comp_propulsive_force(f_F: np.ndarray, r: np.ndarray, t: np.ndarray, Delta_t: float = 0.0, 
+            s: Optional[np.ndarray] = None):
 
         # crop initial transient
         idx_arr = t >= Delta_t
@@ -432,14 +459,16 @@ class PostProcessor(object):
         f_F = f_F[idx_arr]
 
         N = r.shape[-1]
-        ds = 1/(N-1)
     
         # Swimming direction
-        r_com  = np.mean(r, axis = 2)        
+        r_com  = PostProcessor.comp_com(r, s)        
         e_p, _ = PostProcessor.comp_propulsion_direction(r_com)
 
+        if s is None:
+            s = np.linspace(0, 1, N)
+
         fp = np.sum(f_F * e_p[None, :, None], axis = 1)
-        Fp = np.trapz(fp, axis = 1, dx = ds)
+        Fp = np.trapz(fp, axis = 1, x = s)
 
         return Fp, fp, t
                     
@@ -4,22 +4,50 @@ Created on 15 Jun 2023
 @author: amoghasiddhi
 '''
 #Built-in
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+from types import SimpleNamespace
 from pathlib import Path
 from abc import ABC
+from multiprocessing import Pool
 
 # Third-partys
 import numpy as np
-import pickle
 import h5py 
+from tqdm import tqdm
 
 # Local 
 from parameter_scan import ParameterGrid
+from minimal_worm import FrameSequence
+from .pack_store import PackStore
+from .manifest import Manifest
+from .post_processor import PostProcessor
+
+# Result store of the pooling worker processes
+_store = None
 
 class Saver(ABC):
     '''
     Saves sweeps to HDF5
     '''
+    
+    # Default layout of the frame and control datasets, see
+    # examples/h5_layout.py for a comparison of file size and read times.
+    # Round-off errors in the low bits of float64 solutions compress 
+    # poorly, i.e. compression is off by default.
+    STORAGE = {
+        'chunks': 'auto',
+        'compression': None,
+        'compression_opts': 4,
+        'shuffle': False,
+        'dtype': 'float64'
+    }
+    
+    # Size of the default HDF5 chunk cache in bytes 
+    CHUNK_CACHE = 2**20
+    
+    # Metrics which are converted to physical units, see minimal_worm.metrics
+    SPEED_KEYS = ['U', 'U_simple', 'u_abs_max']
+    ENERGY_KEYS = ['D_F', 'D_I', 'W', 'V']
                                         
     @staticmethod    
     def save_data(
@@ -28,10 +56,24 @@ class Saver(ABC):
             sim_dir: Path, 
             FS_keys: List, 
             CS_keys: Tuple[List, None], 
-            overwrite = True):
+            overwrite = True,
+            N_worker: int = 1,
+            batch_size: int = 16,
+            storage: Dict = None):
         '''
         Saves simulation output over a given ParameterGrid
         into single HDF5 file.
+        
+        Results are read by N_worker processes in batches of 
+        consecutive simulations, the batches are written to 
+        the HDF5 file by the calling process.
+        
+        :param N_worker: number of processes which read results
+        :param batch_size: number of simulations per batch
+        :param storage: layout of the frame and control datasets, i.e. 
+            chunks ('auto', None for contiguous datasets, or chunk shape), 
+            compression (None, 'gzip' or 'lzf'), compression_opts, shuffle 
+            and dtype ('float64' or 'float32'), defaults to Saver.STORAGE
         '''
         
         assert not PG.has_key('T'), ('ParameterGrid sweeps over T, but simulations times ' 
@@ -43,25 +85,39 @@ class Saver(ABC):
                     'Set overwrite=True to overwrite existing file.')
                 return
 
-        if PG.base_parameter['dt_report'] is not None: 
-            dt = PG.base_parameter['dt_report']
-        else: 
-            dt = PG.base_parameter['dt']
-        
-        # Number of time steps 
-        n = int(round(PG.base_parameter['T'] / dt) )                
+        storage = {**Saver.STORAGE, **(storage or {})}
+
+        # Frames before t_report_start are not reported
+        t_report_start = PG.base_parameter.get('t_report_start')
                                                                                                                                                                   
-        sim_filepaths = [sim_dir / (h + '.dat') for h in PG.hash_arr]        
-
-        # Find first simulation which succeeded  
-        for sim_filepath in sim_filepaths:  
-            with open(sim_filepath, 'rb') as f:                      
-                data = pickle.load(f)
-                if data['exit_status'] == 0:
-                    break
+        store = PackStore(sim_dir)
+        manifest = Manifest(sim_dir)
+
+        # Find first simulation which succeeded, exit status is read 
+        # from the manifest or the index without loading any arrays  
+        h_success = None
+        
+        for h in PG.hash_arr:
+            if manifest.is_finished(h):
+                exit_status = manifest.records[h]['exit_status']
+            elif store.has(h):
+                exit_status = store.exit_status(h)
+            else:
+                # Tasks whose worker has been killed have no saved results
+                continue
+            if exit_status == 0:
+                h_success = h
+                break
+        
+        # Shapes of the datasets are taken from a successful simulation
+        assert h_success is not None, f'None of the {len(PG)} simulations in {sim_dir} succeeded'
             
+        data = store.load(h_success, FS_keys, CS_keys)
         FS = data['FS']
         CS = data['CS']
+        
+        # Frames of metrics-only simulations have no outputs
+        FS_keys = [key for key in FS_keys if hasattr(FS, key)]
                                               
         # Make backwards compatible after name change 
         if hasattr(CS,'k'):
@@ -75,79 +131,285 @@ class Saver(ABC):
         h5.attrs['shape'] = PG.shape        
         h5.attrs['size'] = len(PG)
         h5.attrs['T'] = PG.base_parameter['T']
+        if t_report_start is not None:
+            h5.attrs['t_report_start'] = t_report_start
         
         h5.create_dataset('exit_status', shape = len(PG), dtype = float)
         h5.create_dataset('sim_t', shape = len(PG), dtype = float)
-        h5.create_dataset('t', data = FS.t)
+        if hasattr(FS, 't'):
+            h5.create_dataset('t', data = FS.t)
+        # Body coordinates of the mesh points
+        if hasattr(FS, 's'):
+            h5.create_dataset('s', data = FS.s)
+        # Number of rejected time steps
+        if hasattr(FS, 'n_rejected'):
+            h5.create_dataset('n_rejected', shape = len(PG), dtype = float)
+
+        # If simulations have been profiled, then we save the 
+        # total time spent in every section of the solver hot-path
+        if hasattr(FS, 'profile'):
+            profile_grp = h5.create_group('profile')
+            for key in FS.profile['total'].keys():
+                profile_grp.create_dataset(key, shape = len(PG), dtype = float)
+
+        # Scalar metrics accumulated during the simulation
+        if hasattr(FS, 'metrics'):
+            metrics_grp = h5.create_group('metrics')
+            for key in FS.metrics.keys():
+                metrics_grp.create_dataset(key, shape = len(PG), dtype = float)
 
         # Allocate arrays for frame attributes                                
         FS_grp = h5.create_group('FS')
         
         for key in FS_keys:                        
-            shape = (len(PG), ) + getattr(FS, key).shape            
-            FS_grp.create_dataset(key, shape = shape, dtype = float)
+            shape = getattr(FS, key).shape            
+            Saver._create_dataset(FS_grp, key, len(PG), shape, storage)
 
         if CS_keys is not None:        
             CS_grp = h5.create_group('CS')
             for key in CS_keys:                                                                                        
-                shape = (len(PG), ) + getattr(CS, key).shape
-                CS_grp.create_dataset(key, shape = shape, dtype = float)
+                shape = getattr(CS, key).shape
+                Saver._create_dataset(CS_grp, key, len(PG), shape, storage)
                                                 
-        # Load output from pickled simulation files        
-        Saver._populate_array(h5, sim_filepaths, n, FS_keys, CS_keys)
+        # Load output from result store        
+        Saver._populate_array(h5, sim_dir, PG.hash_arr, FS_keys, CS_keys, 
+            N_worker, batch_size)
+
+        # Grid points which share a simulation, see Sweeper.deduplicate, 
+        # have identical dimensionless metrics but different physical ones
+        if 'metrics' in h5 and all(k in PG.base_parameter for k in ['T_c', 'L0', 'mu']):
+            Saver._physical_metrics(h5, PG)
 
         return h5
     
+    @staticmethod
+    def _magnitude(v, unit: str) -> float:
+        
+        if hasattr(v, 'to'):
+            return v.to(unit).magnitude
+        
+        return float(v)
+    
+    @staticmethod
+    def _physical_metrics(h5: h5py.File, PG: ParameterGrid):
+        '''
+        Converts dimensionless speeds into meter per second and dimensionless 
+        energies into Joule with the physical parameters of every grid point
+        '''
+        f_arr = np.array([1.0 / Saver._magnitude(p['T_c'], 'second') for p in PG.param_arr])
+        L0_arr = np.array([Saver._magnitude(p['L0'], 'meter') for p in PG.param_arr])
+        mu_arr = np.array([Saver._magnitude(p['mu'], 'pascal*second') for p in PG.param_arr])
+        
+        physical_grp = h5.create_group('physical')
+        
+        for key, dset in h5['metrics'].items():
+            if key in Saver.SPEED_KEYS:
+                v = PostProcessor.U_star_to_U(dset[:], f_arr, L0_arr)
+            elif key in Saver.ENERGY_KEYS:
+                v = PostProcessor.E_star_to_E(dset[:], mu_arr, f_arr, L0_arr)
+            else:
+                continue
+            physical_grp.create_dataset(key, data = v)
+
+        return
+    
+    @staticmethod
+    def _chunk_shape(shape: Tuple, storage: Dict) -> Tuple:
+        '''
+        Chunk shape of a dataset with one row of given shape per simulation
+        
+        By default, chunks are aligned to rows and hold one component of 
+        a single simulation, e.g. (1, n, 1, N) for the curvature k with 
+        row shape (n, 3, N). Time series at individual body points, see
+        analyse_sweeps.compute_undulation_frequency, are read from a single 
+        chunk and per-simulation slabs from three. Chunks are split along 
+        the time axis to fit into the chunk cache.
+        '''
+        if storage['chunks'] != 'auto':
+            return storage['chunks']
+                
+        chunk = [1] + list(shape)
+        
+        # Vector-valued outputs with shape (n, 3, N)
+        if len(shape) == 3:
+            chunk[2] = 1
+        
+        if len(shape) > 0:
+            n_bytes = np.prod(chunk[2:], dtype = int) * np.dtype(storage['dtype']).itemsize         
+            chunk[1] = int(max(1, min(shape[0], Saver.CHUNK_CACHE // n_bytes)))
+                
+        return tuple(chunk)
+
+    @staticmethod
+    def _create_dataset(grp: h5py.Group, key: str, n_sim: int, shape: Tuple, storage: Dict):
+        '''
+        Allocates dataset for n_sim rows of given shape
+        '''
+        chunks = Saver._chunk_shape(shape, storage)
+        
+        assert chunks is not None or (storage['compression'] is None and not storage['shuffle']), (
+            'Compression and shuffle filter require chunked datasets')
+        
+        grp.create_dataset(key, shape = (n_sim, ) + shape, 
+            chunks = chunks, 
+            compression = storage['compression'], 
+            compression_opts = storage['compression_opts'] if storage['compression'] == 'gzip' else None, 
+            shuffle = storage['shuffle'], 
+            dtype = storage['dtype'])
+        
+        return
+    
     @staticmethod
     def _pad_array(n, arr):
         '''
         Pads missing time steps for failed simulations with nans
-        '''                
-        shape = (n,) + arr.shape[1:]                                                                                 
-        pad_arr = np.zeros(shape)[:] = np.nan                                
-        pad_arr[:arr.size(0)] = arr
+        '''
+        pad_arr = np.full(n, np.nan)
+
+        if arr is not None:
+            pad_arr[:arr.shape[0]] = arr
 
         return pad_arr
-        
+
+    @staticmethod
+    def _init_worker(sim_dir: Path):
+        '''
+        Loads index of the result store once per worker process
+        '''
+        global _store
+        _store = PackStore(sim_dir)
+
+    @staticmethod
+    def _read_rows(task: Tuple[int, List[str], Dict]) -> Tuple[int, Dict]:
+        '''
+        Reads batch of consecutive simulations from the result store
+
+        :param task: index of the first simulation, hashes and layout,
+            i.e. row shapes of the frame and control datasets and
+            keys of the metrics and profile datasets
+        :return: index of the first simulation and rows
+        '''
+        i0, hash_arr, layout = task
+
+        rows = {grp: {key: [] for key in layout[grp]}
+            for grp in ['FS', 'CS', 'metrics', 'profile']}
+        rows['exit_status'], rows['sim_t'], rows['n_rejected'] = [], [], []
+
+        for h in hash_arr:
+
+            if _store.has(h):
+                data = _store.load(h, list(layout['FS']), list(layout['CS']))
+            else:
+                # Tasks whose worker has been killed have no saved results
+                data = {'FS': FrameSequence([]), 'CS': SimpleNamespace(),
+                    'exit_status': 1, 'sim_t': None}
+
+            for key, shape in layout['FS'].items():
+                arr = getattr(data['FS'], key, None)
+                if data['exit_status'] == 1:
+                    arr = Saver._pad_array(shape, arr)
+                rows['FS'][key].append(np.asarray(arr, dtype = float))
+
+            for key, shape in layout['CS'].items():
+
+                # Make backwards compatible with
+                # data created before controls
+                # where renamed
+                if not hasattr(data['CS'], key):
+                    arr = getattr(data['CS'], key[:-1], None)
+                else:
+                    arr = getattr(data['CS'], key)
+                if data['exit_status'] == 1:
+                    arr = Saver._pad_array(shape, arr)
+                rows['CS'][key].append(np.asarray(arr, dtype = float))
+
+            rows['exit_status'].append(data['exit_status'])
+            rows['sim_t'].append(data['sim_t'] if data['sim_t'] is not None else np.nan)
+            rows['n_rejected'].append(getattr(data['FS'], 'n_rejected', np.nan))
+
+            metrics = getattr(data['FS'], 'metrics', {})
+            for key in layout['metrics']:
+                rows['metrics'][key].append(metrics.get(key, np.nan))
+
+            if hasattr(data['FS'], 'profile'):
+                profile = data['FS'].profile['total']
+            else:
+                profile = {}
+            for key in layout['profile']:
+                rows['profile'][key].append(profile.get(key, np.nan))
+
+        # Stack rows of the batch
+        for grp in ['FS', 'CS']:
+            rows[grp] = {key: np.array(v, dtype = layout['dtype'][grp][key]) 
+                for key, v in rows[grp].items()}
+        for grp in ['metrics', 'profile']:
+            rows[grp] = {key: np.array(v) for key, v in rows[grp].items()}
+        for key in ['exit_status', 'sim_t', 'n_rejected']:
+            rows[key] = np.array(rows[key], dtype = float)
+
+        return i0, rows
+
     @staticmethod
     def _populate_array(
             h5: h5py.File,
-            sim_filepaths: List[str],
-            n: float, 
-            FS_keys: List, 
-            CS_keys: Tuple[List, None]):                                    
-        '''        
-        Loads data from pickled FrameSequence and ControlSequence
-        specified by given keys. 
-        '''                                                 
-                                                                                
-        for i, filepath in enumerate(sim_filepaths): 
-
-            with open(filepath, 'rb') as f:                
-                data = pickle.load(f)
-                for key in FS_keys:                
-                    arr = getattr(data['FS'], key)
-                    if data['exit_status'] == 1:
-                        arr = Saver._pad_array(n, arr)
-                    h5['FS'][key][i, :] = arr
-                                                            
-                if CS_keys is not None:
-                    for key in CS_keys:
-                        
-                        # Make backwards compatible with
-                        # data created before controls 
-                        # where renamed
-                        if not hasattr(data['CS'], key):                        
-                            arr = getattr(data['CS'], key[:-1])
-                        else:
-                            arr = getattr(data['CS'], key)                                                 
-                        if data['exit_status'] == 1:                                        
-                            arr = Saver._pad_array(n, arr, )                    
-                        h5['CS'][key][i, :] = arr
-    
-                h5['exit_status'][i] = data['exit_status']
-                h5['sim_t'][i] = data['sim_t']
-                                                                
-        return 
-    
- 
\ No newline at end of file
+            sim_dir: Path,
+            hash_arr: List[str],
+            FS_keys: List,
+            CS_keys: Tuple[List, None],
+            N_worker: int = 1,
+            batch_size: int = 16):
+        '''
+        Loads data from stored FrameSequence and ControlSequence
+        specified by given keys. Only arrays for the given keys
+        are read from the pack files.
+
+        Batches are read in parallel if N_worker > 1 and written
+        to the HDF5 file in the order in which they are completed.
+        '''
+        # Rows shapes and keys of all datasets which are filled per simulation
+        layout = {}
+        layout['FS'] = {key: h5['FS'][key].shape[1:] for key in FS_keys}
+        layout['CS'] = {key: h5['CS'][key].shape[1:] for key in CS_keys} if CS_keys is not None else {}
+        # Rows are converted to the storage dtype before they are sent to the writer 
+        layout['dtype'] = {grp: {key: h5[grp][key].dtype.str for key in layout[grp]} 
+            for grp in ['FS', 'CS']}
+        layout['metrics'] = list(h5['metrics'].keys()) if 'metrics' in h5 else []
+        layout['profile'] = list(h5['profile'].keys()) if 'profile' in h5 else []
+
+        tasks = [(i0, hash_arr[i0:i0 + batch_size], layout)
+            for i0 in range(0, len(hash_arr), batch_size)]
+
+        pbar = tqdm(total = len(hash_arr), desc = 'Pooling')
+
+        if N_worker > 1:
+            pool = Pool(N_worker, initializer = Saver._init_worker, initargs = (sim_dir, ))
+            batches = pool.imap_unordered(Saver._read_rows, tasks)
+        else:
+            pool = None
+            Saver._init_worker(sim_dir)
+            batches = map(Saver._read_rows, tasks)
+
+        try:
+            for i0, rows in batches:
+
+                i1 = i0 + len(rows['exit_status'])
+
+                for grp in ['FS', 'CS', 'metrics', 'profile']:
+                    for key, arr in rows[grp].items():
+                        h5[grp][key][i0:i1] = arr
+
+                h5['exit_status'][i0:i1] = rows['exit_status']
+                h5['sim_t'][i0:i1] = rows['sim_t']
+
+                if 'n_rejected' in h5:
+                    h5['n_rejected'][i0:i1] = rows['n_rejected']
+
+                pbar.update(i1 - i0)
+        finally:
+            pbar.close()
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        return
+
@@ -0,0 +1,315 @@
+# Built-in
+from typing import Callable, Dict, List, Tuple
+from multiprocessing import Process, Queue
+from pathlib import Path
+from queue import Empty
+import resource
+import heapq
+import logging
+import time
+
+# Third-party
+import numpy as np
+
+# Local imports
+from minimal_worm import dimless_parameters
+
+class CostModel():
+    '''
+    Log-linear model of the wall-clock time of a simulation
+
+        log(sim_t) = w . phi(param)
+
+    with features phi = [1, log N, log(T/dt), pic_on, min(log a, 0), fe_degree - 1].
+    The prior weights assume that the time is proportional to the number of
+    mesh points and time steps, that Picard iteration is five times slower and
+    that the stiff small-a corner needs more solver iterations. The weights are
+    refined from observed simulation times by ridge regression towards the prior.
+    '''
+
+    # Prior weights, intercept is the time per mesh point and time step in seconds
+    w0 = np.array([np.log(2e-6), 1.0, 1.0, np.log(5.0), -0.2, 0.7])
+
+    def __init__(self, lam: float = 1.0):
+        '''
+        :param lam: regularisation towards the prior weights
+        '''
+        self.lam = lam
+        self.w = CostModel.w0.copy()
+        self.X, self.y = [], []
+
+    @staticmethod
+    def features(param: Dict) -> np.ndarray:
+
+        a = float(dimless_parameters(param)['a'])
+
+        return np.array([
+            1.0,
+            np.log(param['N']),
+            np.log(param['T'] / param['dt']),
+            float(param.get('pic_on', False)),
+            min(np.log(a), 0.0),
+            param.get('fe_degree', 1) - 1
+        ])
+
+    def predict(self, param: Dict) -> float:
+        '''
+        Expected wall-clock time in seconds
+        '''
+        return float(np.exp(CostModel.features(param) @ self.w))
+
+    def observe(self, param: Dict, sim_t: float):
+        '''
+        Refines the weights with an observed simulation time
+        '''
+        self.X.append(CostModel.features(param))
+        self.y.append(np.log(sim_t))
+
+        X, y = np.array(self.X), np.array(self.y)
+
+        A = X.T @ X + self.lam * np.eye(len(self.w))
+        self.w = np.linalg.solve(A, X.T @ y + self.lam * CostModel.w0)
+
+        return
+
+    @staticmethod
+    def makespan(cost_arr: List[float], N_worker: int) -> float:
+        '''
+        Makespan if tasks are dispatched in the given order to the
+        first idle worker
+        '''
+        finish_arr = [0.0] * N_worker
+
+        for cost in cost_arr:
+            heapq.heappush(finish_arr, heapq.heappop(finish_arr) + cost)
+
+        return max(finish_arr)
+
+# Logger of the scheduler worker processes
+_logger = None
+
+def _init_worker(log_dir: str):
+
+    global _logger
+    _logger = logging.getLogger('minimal_worm.scheduler')
+    _logger.setLevel(logging.INFO)
+
+    handler = logging.FileHandler(Path(log_dir) / 'scheduler.log')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(process)d %(message)s'))
+    _logger.addHandler(handler)
+
+def _run_task(func: Callable, _input: Tuple, task_number: int, args: Tuple, kwargs: Dict):
+    '''
+    Runs task and returns its wall-clock time and exception
+    '''
+    start = time.perf_counter()
+
+    try:
+        func(_input, None, _logger, task_number, *args, **kwargs)
+        e = None
+    except Exception as _e:
+        _logger.exception(f'Task {task_number} failed')
+        e = repr(_e)
+
+    return _input[1], time.perf_counter() - start, e
+
+def _memory() -> int:
+    '''
+    Peak resident memory of the calling process in bytes
+    '''
+    # Linux reports kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _worker(worker_id: int,
+        task_queue: Queue,
+        result_queue: Queue,
+        log_dir: str,
+        max_tasks: int = None,
+        max_memory: int = None):
+    '''
+    Runs tasks until it receives None or until it has to be recycled, i.e.
+    if it has run max_tasks tasks or if its memory exceeds max_memory bytes.
+    The worker process is long-lived, i.e. objects which are cached at
+    module level, e.g. Worm instances, are reused between tasks.
+    '''
+    _init_worker(log_dir)
+
+    n_task = 0
+
+    while True:
+
+        task = task_queue.get()
+
+        if task is None:
+            return
+
+        result = _run_task(*task)
+        n_task += 1
+
+        retire = ((max_tasks is not None and n_task >= max_tasks)
+            or (max_memory is not None and _memory() > max_memory))
+
+        result_queue.put((worker_id, result, retire))
+
+        if retire:
+            return
+
+class CostScheduler():
+    '''
+    Dispatches tasks longest-expected-first. Tasks are dispatched one at a
+    time to long-lived worker processes whenever a worker becomes idle, i.e.
+    workers never hold a backlog of tasks. After every finished task, the cost
+    model is refined with the observed time and the remaining tasks are reordered.
+
+    Workers are recycled after max_tasks tasks or if their memory exceeds
+    max_memory, which contains the memory growth of dolfin and PETSc.
+    Tasks of workers which crash are reported as failed and passed to
+    on_crash, e.g. to log them as failed in the manifest.
+    '''
+
+    def __init__(self,
+            N_worker: int,
+            cost_model: CostModel = None,
+            max_tasks: int = None,
+            max_memory: int = None,
+            on_crash: Callable[[str], None] = None):
+        '''
+        :param N_worker: number of processes
+        :param cost_model: cost model, prior if None
+        :param max_tasks: number of tasks after which a worker is recycled,
+            if None, workers are never recycled for the number of tasks
+        :param max_memory: memory in bytes above which a worker is recycled,
+            if None, workers are never recycled for their memory
+        :param on_crash: called with the hash of every task whose worker
+            has been killed, runs in the calling process
+        '''
+        self.N_worker = N_worker
+        self.cost_model = CostModel() if cost_model is None else cost_model
+        self.max_tasks = max_tasks
+        self.max_memory = max_memory
+        self.on_crash = on_crash
+
+    def _spawn(self, workers: Dict, worker_id: int, result_queue: Queue, log_dir: Path):
+
+        task_queue = Queue()
+        process = Process(target = _worker, args = (worker_id, task_queue, result_queue,
+            str(log_dir), self.max_tasks, self.max_memory), daemon = True)
+        process.start()
+
+        workers[worker_id] = (process, task_queue)
+
+    def run(self,
+            tasks: List[Tuple[Dict, str]],
+            func: Callable,
+            log_dir: Path,
+            *args,
+            **kwargs) -> Dict[str, Dict]:
+        '''
+        Runs func((param, hash), pbar, logger, task_number, *args, **kwargs)
+        for every task, see Sweeper.wrap_simulate_experiment
+
+        :param tasks: parameter dictionaries and hashes
+        :param func: task function
+        :param log_dir: log file directory
+        :return: predicted and observed time and exception of every task
+        '''
+        param_dict = {h: param for param, h in tasks}
+        task_number = {h: i for i, (_, h) in enumerate(tasks)}
+
+        predicted = {h: self.cost_model.predict(param) for param, h in tasks}
+        pending = sorted(param_dict.keys(), key = lambda h: predicted[h], reverse = True)
+
+        makespan_predicted = CostModel.makespan([predicted[h] for h in pending], self.N_worker)
+        print(f'Scheduling {len(tasks)} tasks on {self.N_worker} workers, '
+            f'predicted makespan {makespan_predicted:.1f}s')
+
+        report = {}
+        result_queue = Queue()
+        # Worker id -> process and task queue
+        workers = {}
+        # Worker id -> hash of the running task
+        running = {}
+        n_recycled = 0
+
+        start = time.perf_counter()
+
+        for worker_id in range(self.N_worker):
+            self._spawn(workers, worker_id, result_queue, log_dir)
+
+        try:
+            while pending or running:
+
+                for worker_id, (_, task_queue) in workers.items():
+                    if pending and worker_id not in running:
+                        h = pending.pop(0)
+                        task_queue.put((func, (param_dict[h], h), task_number[h], args, kwargs))
+                        running[worker_id] = h
+
+                try:
+                    worker_id, (h, sim_t, e), retire = result_queue.get(timeout = 1.0)
+                except Empty:
+                    # Workers which have been killed, e.g. by a segmentation
+                    # fault or the OOM killer, never return their result
+                    for worker_id in list(running.keys()):
+                        process = workers[worker_id][0]
+                        if process.is_alive() or process.exitcode == 0:
+                            continue
+                        h = running.pop(worker_id)
+                        report[h] = {'predicted': predicted[h], 'sim_t': np.nan,
+                            'exception': f'Worker exited with code {process.exitcode}'}
+                        if self.on_crash is not None:
+                            self.on_crash(h)
+                        self._spawn(workers, worker_id, result_queue, log_dir)
+                    continue
+
+                del running[worker_id]
+
+                if retire:
+                    workers[worker_id][0].join()
+                    self._spawn(workers, worker_id, result_queue, log_dir)
+                    n_recycled += 1
+
+                report[h] = {'predicted': predicted[h], 'sim_t': sim_t, 'exception': e}
+
+                # Failed simulations end early
+                if e is None:
+                    self.cost_model.observe(param_dict[h], sim_t)
+                    pending.sort(key = lambda h: self.cost_model.predict(param_dict[h]),
+                        reverse = True)
+
+                print(f'Finished {len(report)}/{len(tasks)} tasks', end = '\r')
+        finally:
+            for process, task_queue in workers.values():
+                task_queue.put(None)
+            for process, _ in workers.values():
+                process.join(timeout = 10.0)
+                if process.is_alive():
+                    process.terminate()
+
+        makespan = time.perf_counter() - start
+
+        CostScheduler.print_report(report, makespan_predicted, makespan)
+
+        if n_recycled > 0:
+            print(f'Recycled {n_recycled} workers')
+
+        return report
+
+    @staticmethod
+    def print_report(report: Dict[str, Dict], makespan_predicted: float, makespan: float):
+
+        ratio_arr = np.array([r['sim_t'] / r['predicted'] for r in report.values()
+            if r['exception'] is None])
+
+        print(f'\nMakespan: predicted {makespan_predicted:.1f}s, actual {makespan:.1f}s')
+
+        if len(ratio_arr) > 0:
+            print(f'Task time over prior prediction: median {np.median(ratio_arr):.2f}, '
+                f'min {ratio_arr.min():.2f}, max {ratio_arr.max():.2f}')
+
+        n_failed = sum(r['exception'] is not None for r in report.values())
+
+        if n_failed > 0:
+            print(f'{n_failed} tasks failed')
+
+        return
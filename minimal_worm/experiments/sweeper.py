@@ -4,30 +4,74 @@ Created on 15 Jun 2023
 @author: amoghasiddhi
 '''
 # Built-in
-from os.path import isfile, join
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Set, Tuple
+from collections import OrderedDict
 from pathlib import Path
 from argparse import Namespace
-import pickle
+import heapq
 
 # Third-party
 import numpy as np
 
 # Local imports
 from .saver import Saver
+from .pack_store import PackStore
+from .manifest import Manifest
+from .cache import SimulationCache
+from .scheduler import CostModel, CostScheduler
 from minimal_worm.experiments import simulate_experiment
-from minimal_worm import Worm, FrameSequence, ModelParameter
+from minimal_worm import Worm, FrameSequence, ModelParameter, mesh_param, quad_param, dimless_parameters
 from parameter_scan import ParameterGrid
 from mp_progress_logger import FWProgressLogger, FWException
 
+# Worm instances of the calling worker process, least recently used first
+_worms = OrderedDict()
+
 class Sweeper():
     '''
     Sweeps parameter space and runs simulations
     '''
+    
+    # Number of Worm instances kept by every worker process
+    WORM_CACHE_SIZE = 2
+    
+    @staticmethod
+    def get_worm(param: Namespace) -> Worm:
+        '''
+        Returns Worm for the discretisation defined by param. Mesh, function 
+        spaces and quadrature are only created if the worker process has not 
+        simulated the same discretisation before.   
+        
+        :param param (Namespace): Parameter
+        '''
+        mesh_grading, quad_degree = mesh_param(param), quad_param(param)
+        
+        key = (param.N, param.dt, param.fdo, param.fe_degree, 
+            None if mesh_grading is None else tuple(sorted(mesh_grading.items())), 
+            param.planar, param.lumped, tuple(sorted(quad_degree.items())), 
+            param.nodal_rotation, param.split_form)
+        
+        if key in _worms:
+            _worms.move_to_end(key)
+            return _worms[key]
+        
+        worm = Worm(param.N, param.dt, fdo = param.fdo, quiet=True, 
+            fe = {'type': 'Lagrange', 'degree': param.fe_degree}, 
+            mesh_grading = mesh_grading, planar = param.planar, 
+            lumped = param.lumped, quad_degree = quad_degree, 
+            nodal_rotation = param.nodal_rotation, split_form = param.split_form)
+        
+        _worms[key] = worm
+        
+        if len(_worms) > Sweeper.WORM_CACHE_SIZE:
+            _worms.popitem(last = False)
+        
+        return worm
         
     @staticmethod
     def save_output(
-        filepath: Path, 
+        sim_dir: Path,
+        param_hash: str,
         FS: FrameSequence, 
         CS: Namespace, 
         MP: ModelParameter, 
@@ -36,10 +80,10 @@ class Sweeper():
         sim_t = None):
         
         '''
-        Save simulation results
+        Save simulation results to the pack store in sim_dir
         
-        :param filepath (str):
-        :param filename (str):
+        :param sim_dir (str): Result directory
+        :param param_hash (str): Parameter hash
         :param FS (FrameSequenceNumpy):
         :param CS (ControlSequenceNumpy):
         :param MP (...):
@@ -47,18 +91,7 @@ class Sweeper():
         :param exit_status (int): if 0, then the simulation finished succesfully, if 1, error occured  
         '''
     
-        output = {}
-    
-        output['param'] = param
-        output['MP'] = MP
-        output['exit_status'] = exit_status
-        output['sim_t'] = sim_t
-        
-        output['FS'] = FS        
-        output['CS'] = CS
-                                 
-        with open(filepath, 'wb') as file:                                                                                
-            pickle.dump(output, file)
+        PackStore(sim_dir).append(param_hash, FS, CS, MP, param, exit_status, sim_t)
         
         return
     
@@ -71,7 +104,9 @@ class Sweeper():
                                  FK,
                                  sim_dir,  
                                  overwrite  = False, 
-                                 save_keys = None,                              
+                                 save_keys = None,
+                                 duplicates = None,
+                                 skip = None,                              
                                  ):
         '''
         Wrapes simulate_experiment function to make it compatible with parameter_scan module. 
@@ -85,22 +120,47 @@ class Sweeper():
         :param overwrite (bool): If true, exisiting files are overwritten
         :param save_keys (list): List of attributes which will be saved to the result file. 
             If None, then all attributes get saved.        
+        :param duplicates (dict): Maps hashes of duplicate tasks to the hash of the task 
+            which is simulated, see Sweeper.deduplicate  
+        :param skip (set): Hashes of tasks which are run by other shards, see Sweeper.shard
         '''
     
         param, param_hash = _input[0], _input[1]
+
+        if skip is not None and param_hash in skip:
+            logger.info(f'Task {task_number}: Run by another shard')
+            result = {}
+            result['pic'] = None
+            
+            return result
+
+        # Results of duplicates are fanned out after the sweep has finished
+        if duplicates is not None and param_hash in duplicates:
+            logger.info(f'Task {task_number}: Duplicate of {duplicates[param_hash]}')
+            result = {}
+            result['pic'] = None
+            
+            return result
         
-        filepath = join(sim_dir, (param_hash) + '.dat')
+        manifest = Manifest(sim_dir)
+        store = PackStore(sim_dir)
                 
-        if not overwrite:    
-            if isfile(filepath):
-                logger.info(f'Task {task_number}: File already exists')                                    
-                output = pickle.load(open(filepath, 'rb'))
-                FS = output['FS']
-                            
-                exit_status = output['exit_status'] 
+        if not overwrite:
+            # Sweeps which have been saved before the manifest was introduced
+            # are resumed from the result store            
+            if manifest.is_finished(param_hash):
+                record = manifest.records[param_hash]
+                exit_status, t_end = record['exit_status'], record['t_end']
+            elif len(manifest.records) == 0 and store.has(param_hash):
+                exit_status, t_end = store.exit_status(param_hash), store.t_end(param_hash) 
+            else:
+                exit_status = None
+                
+            if exit_status is not None:
+                logger.info(f'Task {task_number}: Result already exists')                                    
                             
                 if exit_status:
-                    raise FWException(None, param['T'], param['dt'], FS.times[-1])
+                    raise FWException(None, param['T'], param['dt'], t_end)
 
 
                 result = {}
@@ -108,11 +168,13 @@ class Sweeper():
                 
                 return result
              
-        worm = Worm(param['N'], param['dt'], fdo = param['fdo'], quiet=True)
+        manifest.start(param_hash, param['T'])
         
         # Experiment 
         param_ns = Namespace()
         param_ns.__dict__.update(param)
+
+        worm = Sweeper.get_worm(param_ns)
         
         CS = create_CS(param)
     
@@ -126,8 +188,11 @@ class Sweeper():
                     
         # Regardless if the simulation has finished or failed, simulation results
         # up to this point are saved to file         
-        Sweeper.save_output(filepath, FS, CS, MP, param, exit_status, sim_t)                        
-        logger.info(f'Task {task_number}: Saved file to {filepath}.')         
+        Sweeper.save_output(sim_dir, param_hash, FS, CS, MP, param, exit_status, sim_t)                        
+        logger.info(f'Task {task_number}: Saved result to {sim_dir}.')         
+
+        t_end = PackStore.last_reported_time(FS)
+        manifest.finish(param_hash, exit_status, sim_t, param['T'], t_end)
                     
         # If the simulation has failed then we reraise the exception
         # which has been passed upstream        
@@ -136,7 +201,7 @@ class Sweeper():
             raise FWException(None, 
                               param['T'], 
                               param['dt'], 
-                              FS.t[-1]) from e
+                              t_end) from e
             
         # If simulation has finished succesfully then we return the relevant results 
         # for the logger
@@ -156,7 +221,13 @@ class Sweeper():
             sim_dir: Path,
             overwrite = False,
             debug = False,
-            exper_spec = ''):
+            exper_spec = '',
+            cache: SimulationCache = None,
+            deduplicate = False,
+            schedule = 'grid',
+            max_tasks: int = None,
+            max_memory: int = None,
+            shard: Tuple[int, int] = None):
         
         '''
         Runs the experiment defined by the task function for all parameters in 
@@ -170,29 +241,414 @@ class Sweeper():
         :param overwrite (boolean): If true, existing files are overwritten
         :param exper_spec (str): experiment descriptor
         :param debug (boolean): Set to true, to debug 
+        :param cache (SimulationCache): If given, cached results are reused and 
+            new results are added to the cache
+        :param deduplicate (boolean): If true, grid points with identical dimensionless 
+            parameters are only simulated once. Duplicates share the simulation time, 
+            exit status and results of the grid point which is simulated
+        :param schedule (str): If 'grid', tasks are dispatched in grid order by the 
+            FWProgressLogger. If 'cost', tasks are dispatched longest-expected-first 
+            by the CostScheduler
+        :param max_tasks (int): If given, workers of the CostScheduler are recycled 
+            after max_tasks tasks 
+        :param max_memory (int): If given, workers of the CostScheduler are recycled
+            if their memory exceeds max_memory bytes
+        :param shard (tuple): If given, only the tasks of shard i out of n are run,
+            see Sweeper.shard. All shards must be run with the same deduplicate flag
         '''
-            
-        # Creater status logger for experiment
-        # The logger will log and display
-        # the progress and outcome of the simulations
-        PGL = FWProgressLogger(PG, 
-            str(log_dir), 
-            pbar_to_file = False,                        
-            pbar_path = './pbar/pbar.txt', 
-            exper_spec = exper_spec,
-            debug = debug)
+        assert schedule in ['grid', 'cost'], f"schedule must be 'grid' or 'cost', got '{schedule}'"
+        assert schedule == 'cost' or (max_tasks is None and max_memory is None), \
+            "Workers can only be recycled by the CostScheduler, use schedule = 'cost'" 
+        
+        duplicates = Sweeper.deduplicate(PG) if deduplicate else {}
+        
+        if len(duplicates) > 0:
+            print(f'{len(duplicates)} of {len(PG)} grid points share their ' 
+                'dimensionless parameters with another grid point')
+
+        skip = set()
+        
+        if shard is not None:
+            skip = set(PG.hash_arr) - Sweeper.shard(PG, shard, duplicates)
+            duplicates = {h: h_src for h, h_src in duplicates.items() if h not in skip}
+            print(f'Shard {shard[0]}/{shard[1]}: {len(PG) - len(skip)} of {len(PG)} grid points')
+
+        if cache is not None and not overwrite:
+            Sweeper.fetch_from_cache(PG, create_CS, FK, sim_dir, cache, skip)
+        
+        if not overwrite:
+            print('Status of the sweep before resuming:')
+            Sweeper.status(PG, sim_dir)
+                        
+        if schedule == 'cost':
+            Sweeper.run_scheduled(N_worker, PG, create_CS, FK, log_dir, sim_dir, 
+                overwrite, duplicates, max_tasks, max_memory, skip)
+        else:
+            # Creater status logger for experiment
+            # The logger will log and display
+            # the progress and outcome of the simulations
+            PGL = FWProgressLogger(PG, 
+                str(log_dir), 
+                pbar_to_file = False,                        
+                pbar_path = './pbar/pbar.txt', 
+                exper_spec = exper_spec,
+                debug = debug)
+        
+            # Start experiment pool
+            PGL.run_pool(N_worker, 
+                Sweeper.wrap_simulate_experiment, 
+                create_CS,
+                FK,
+                str(sim_dir),                 
+                overwrite = overwrite,
+                duplicates = duplicates,
+                skip = skip)
     
-        # Start experiment pool
-        PGL.run_pool(N_worker, 
+            PGL.close()
+        
+        Sweeper.fan_out(PG, sim_dir, duplicates, overwrite)
+        
+        if cache is not None:
+            Sweeper.update_cache(PG, create_CS, FK, sim_dir, cache, skip)
+        
+        return 
+                
+    @staticmethod
+    def run_scheduled(
+            N_worker: int, 
+            PG: ParameterGrid, 
+            create_CS: Callable,                    
+            FK: List[str],            
+            log_dir: Path,
+            sim_dir: Path,
+            overwrite = False,
+            duplicates: Dict[str, str] = {},
+            max_tasks: int = None,
+            max_memory: int = None,
+            skip: Set[str] = set()):
+        '''
+        Runs all unfinished tasks with the CostScheduler. The cost model 
+        is warm-started with the simulation times of finished tasks
+        
+        :param N_worker (int): Number of processes
+        :param PG (ParameterGrid): Parameter grid
+        :param create_CS (function): Creates control sequence from param
+        :param FK (list): Frame keys
+        :param log_dir (str): log file directory
+        :param sim_dir (str): output directory
+        :param overwrite (boolean): If true, existing results are overwritten
+        :param duplicates (dict): see Sweeper.deduplicate
+        :param max_tasks (int): Number of tasks after which workers are recycled
+        :param max_memory (int): Memory in bytes above which workers are recycled
+        :param skip (set): Hashes of tasks which are run by other shards
+        '''
+        manifest = Manifest(sim_dir)
+        cost_model = CostModel()
+        
+        tasks = []
+        
+        for param, h in zip(PG.param_arr, PG.hash_arr):
+            
+            if manifest.status(h) == Manifest.DONE and manifest.records[h]['sim_t'] is not None:
+                cost_model.observe(param, manifest.records[h]['sim_t'])
+            
+            if h in duplicates or h in skip:
+                continue            
+            if manifest.is_finished(h) and not overwrite:
+                continue
+            
+            tasks.append((param, h))
+        
+        param_dict = dict(zip(PG.hash_arr, PG.param_arr))
+        
+        def on_crash(h: str):
+            # Killed workers can not log the end of their task
+            manifest.refresh()
+            manifest.finish(h, 1, None, param_dict[h]['T'], None)
+        
+        CostScheduler(N_worker, cost_model, max_tasks, max_memory, on_crash).run(tasks, 
             Sweeper.wrap_simulate_experiment, 
-            create_CS,
-            FK,
-            str(sim_dir),                 
+            log_dir,
+            create_CS, 
+            FK, 
+            str(sim_dir),
             overwrite = overwrite)
+        
+        return
+    
+    @staticmethod
+    def deduplicate(PG: ParameterGrid) -> Dict[str, str]:
+        '''
+        Finds grid points with identical dimensionless model, control and 
+        numerical parameters, e.g. in sweeps over mu, E and eta. 
+        
+        :param PG (ParameterGrid): Parameter grid
+        :return duplicates (dict): Maps the hash of every duplicate grid point 
+            to the hash of the first grid point with identical parameters
+        '''
+        representatives = {}
+        duplicates = {}
+        
+        for param, h in zip(PG.param_arr, PG.hash_arr):
+            
+            key = SimulationCache.key(dimless_parameters(param), [], code_version = '')
+            
+            if key in representatives:
+                duplicates[h] = representatives[key]
+            else:
+                representatives[key] = h
+                
+        return duplicates
 
-        PGL.close()
+    @staticmethod
+    def parse_shard(shard: str) -> Tuple[int, int]:
+        '''
+        Parses shard specification 'i/n', e.g. '0/4' is the first of four shards 
+        '''
+        i, n = (int(x) for x in shard.split('/'))
         
-        return 
+        assert 0 <= i < n, f'Shard index must be in [0, {n}), got {i}'
+        
+        return i, n
+
+    @staticmethod
+    def shard(
+            PG: ParameterGrid, 
+            shard: Tuple[int, int],
+            duplicates: Dict[str, str] = {}) -> Set[str]:
+        '''
+        Partitions the grid into n shards with balanced expected cost. Grid points 
+        are assigned longest-expected-first to the shard with the smallest expected 
+        load, where the cost is predicted by the prior CostModel. The partition only 
+        depends on the grid, i.e. independent jobs on different nodes agree on it 
+        without communication. Duplicates belong to the shard of the grid point 
+        which is simulated.
+        
+        :param PG (ParameterGrid): Parameter grid
+        :param shard (tuple): Shard index i and number of shards n
+        :param duplicates (dict): see Sweeper.deduplicate
+        :return hashes (set): Hashes of the grid points of shard i
+        '''
+        i, n = shard
+        
+        cost_model = CostModel()
+        
+        cost = {h: cost_model.predict(param) for param, h in zip(PG.param_arr, PG.hash_arr)
+            if h not in duplicates}
+        
+        # Expected load and index of every shard
+        load_arr = [(0.0, j) for j in range(n)]
+        hashes = set()
+        
+        # Hashes break ties, i.e. the partition does not depend on the grid order 
+        for h in sorted(cost.keys(), key = lambda h: (-cost[h], h)):
+            load, j = heapq.heappop(load_arr)
+            if j == i:
+                hashes.add(h)
+            heapq.heappush(load_arr, (load + cost[h], j))
+        
+        hashes.update(h for h, h_src in duplicates.items() if h_src in hashes)
+        
+        return hashes
+        
+    @staticmethod
+    def fan_out(
+            PG: ParameterGrid, 
+            sim_dir: Path, 
+            duplicates: Dict[str, str],
+            overwrite = False):
+        '''
+        Saves results of simulated grid points for their duplicates. Results 
+        are dimensionless, i.e. they are converted to physical units with the 
+        physical parameters of every grid point, see Saver.save_data
+        
+        :param PG (ParameterGrid): Parameter grid
+        :param sim_dir (str): output directory
+        :param duplicates (dict): see Sweeper.deduplicate
+        :param overwrite (boolean): If true, existing results are overwritten
+        '''
+        manifest = Manifest(sim_dir)
+        store = PackStore(sim_dir)
+        
+        param_dict = dict(zip(PG.hash_arr, PG.param_arr))
+        
+        for h, h_src in duplicates.items():
+            
+            if not manifest.is_finished(h_src):
+                continue
+            if manifest.is_finished(h) and not overwrite:
+                continue
+            
+            store.alias(h, h_src, param_dict[h])
+            
+            record = manifest.records[h_src]                        
+            manifest.finish(h, record['exit_status'], record['sim_t'], param_dict[h]['T'], 
+                record['t_end'])
+            
+        return
+                
+    @staticmethod
+    def fetch_from_cache(
+            PG: ParameterGrid, 
+            create_CS: Callable,
+            FK: List[str],
+            sim_dir: Path,
+            cache: SimulationCache,
+            skip: Set[str] = set()):
+        '''
+        Copies cached results of all unfinished simulations into the 
+        result store, i.e. they are skipped when the sweep is run 
+        
+        :param PG (ParameterGrid): Parameter grid
+        :param create_CS (function): Creates control sequence from param
+        :param FK (list): Frame keys
+        :param sim_dir (str): output directory
+        :param cache (SimulationCache): Simulation cache
+        :param skip (set): Hashes of grid points which belong to other shards
+        '''
+        code_version = SimulationCache.code_version(create_CS)
+        
+        manifest = Manifest(sim_dir)
+        store = PackStore(sim_dir)
+        
+        n_hit = 0
+        
+        for param, h in zip(PG.param_arr, PG.hash_arr):
+            
+            if manifest.is_finished(h) or h in skip:
+                continue
+            
+            key = SimulationCache.key(dimless_parameters(param), FK, create_CS, code_version)
+            
+            if not cache.has(key):
+                continue
+                
+            output = cache.get(key)
+                                                
+            store.append(h, output['FS'], output['CS'], output['MP'], param, 
+                output['exit_status'], output['sim_t'])
+            manifest.finish(h, output['exit_status'], output['sim_t'], param['T'], 
+                PackStore.last_reported_time(output['FS']))
+            
+            n_hit += 1
+            
+        print(f'Reused {n_hit} of {len(PG) - len(skip)} simulations from cache {cache.cache_dir}')
+        
+        return
+    
+    @staticmethod
+    def update_cache(
+            PG: ParameterGrid, 
+            create_CS: Callable,
+            FK: List[str],
+            sim_dir: Path,
+            cache: SimulationCache,
+            skip: Set[str] = set()):
+        '''
+        Adds results of all successful simulations to the cache 
+        and evicts entries which exceed its size budget
+        
+        :param PG (ParameterGrid): Parameter grid
+        :param create_CS (function): Creates control sequence from param
+        :param FK (list): Frame keys
+        :param sim_dir (str): output directory
+        :param cache (SimulationCache): Simulation cache
+        :param skip (set): Hashes of grid points which belong to other shards
+        '''
+        code_version = SimulationCache.code_version(create_CS)
+
+        manifest = Manifest(sim_dir)
+        store = PackStore(sim_dir)
+        
+        for param, h in zip(PG.param_arr, PG.hash_arr):
+        
+            if manifest.status(h) != Manifest.DONE or h in skip:
+                continue
+            
+            key = SimulationCache.key(dimless_parameters(param), FK, create_CS, code_version)
+            
+            if not cache.has(key):
+                cache.put(key, store.load(h))
+            
+        evicted = cache.evict()
+        
+        if len(evicted) > 0:
+            print(f'Evicted {len(evicted)} simulations from cache {cache.cache_dir}')
+                        
+        return
+        
+    @staticmethod
+    def status(PG: ParameterGrid, sim_dir: Path):
+        '''
+        Prints number of finished, failed, running and missing simulations 
+        from the completion manifest
+        
+        :param PG (ParameterGrid): Parameter grid
+        :param sim_dir (str): output directory
+        '''
+        Manifest(sim_dir).print_summary(PG.hash_arr)
+        
+        return
+
+    @staticmethod
+    def missing(PG: ParameterGrid, sim_dir: Path) -> List[str]:
+        '''
+        Hashes of grid points without saved results 
+        
+        :param PG (ParameterGrid): Parameter grid
+        :param sim_dir (str): output directory        
+        '''
+        manifest = Manifest(sim_dir)
+        
+        # Sweeps which have been saved before the manifest was introduced
+        if len(manifest.records) == 0:
+            store = PackStore(sim_dir)
+            return [h for h in PG.hash_arr if not store.has(h)]
+        
+        return [h for h in PG.hash_arr if not manifest.is_finished(h)]
+
+    @staticmethod
+    def merge_shards(
+            PG: ParameterGrid,                
+            h5_filepath: Path,
+            sim_dir: Path,
+            shard_dirs: List[Path] = [],
+            FS_keys = ['r', 'theta', 'sig','k'], 
+            CS_keys = None,
+            N_worker = 1,
+            storage = None):    
+        '''
+        Assembles the results of all shards into the pooled HDF5. Shards which 
+        have been run into separate result directories are linked into sim_dir 
+        first. Pack and manifest files are named by host and process, i.e. files 
+        of different shards do not collide. Shards which share sim_dir do not 
+        need to be linked.  
+        
+        :param PG (ParameterGrid): Parameter grid object
+        :param h5_filepath (str): HDF5 filepath  
+        :param sim_dir (str): Output directory 
+        :param shard_dirs (list): Output directories of the shards
+        :param FS_keys (list): List of frame variables which are saved to h5
+        :param CS_keys (list): List of vontrol variables which are saved to h5
+        :param N_worker (int): Number of processes which read simulation results
+        :param storage (dict): Chunking, compression and dtype, see Saver.STORAGE
+        '''
+        sim_dir = Path(sim_dir)
+        sim_dir.mkdir(parents = True, exist_ok = True)
+        
+        for shard_dir in shard_dirs:
+            for filepath in sorted(Path(shard_dir).iterdir()):
+                if not (filepath.name.startswith(('pack_', 'manifest_')) or filepath.suffix == '.dat'):
+                    continue
+                link = sim_dir / filepath.name
+                if link.exists():
+                    assert link.resolve() == filepath.resolve(), \
+                        f'{filepath} collides with {link}'
+                    continue
+                link.symlink_to(filepath.resolve())
+        
+        return Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FS_keys, CS_keys, 
+            N_worker, storage, merge = True)
                 
     @staticmethod
     def save_sweep_to_h5(
@@ -200,10 +656,14 @@ class Sweeper():
             h5_filepath: Path,
             sim_dir: Path,
             FS_keys = ['r', 'theta', 'sig','k'], 
-            CS_keys = None):    
+            CS_keys = None,
+            N_worker = 1,
+            storage = None,
+            merge = False):    
         
         '''
-        Pools experiment results and saves them to single HDF5
+        Pools experiment results and saves them to single HDF5. Results which 
+        are missing, e.g. of failed or unfinished simulations, are padded with nans.
         
         :param PG (ParameterGrid): Parameter grid object
         :param h5_filepath (str): HDF5 filepath  
@@ -211,15 +671,37 @@ class Sweeper():
         :param log_dir (str): Log file directory    
         :param FS_keys (list): List of frame variables which are saved to h5
         :param CS_keys (list): List of vontrol variables which are saved to h5
+        :param N_worker (int): Number of processes which read simulation results
+        :param storage (dict): Chunking, compression and dtype, see Saver.STORAGE
+        :param merge (bool): If true, results of all shards are merged, which 
+            requires that every shard has finished, see Sweeper.merge_shards
         '''    
         
+        missing = Sweeper.missing(PG, sim_dir)
+        
+        if len(missing) > 0:
+            print(f'Results of {len(missing)} of {len(PG)} simulations are missing:')
+            for h in missing:
+                print(h)
+        
+        # Sharded sweeps are only merged if all shards have finished
+        assert not merge or len(missing) == 0, \
+            f'Results of {len(missing)} simulations are missing in {sim_dir}'
+        
         # Save results to HDF5            
                                     
-        h5 = Saver.save_data(h5_filepath, PG, sim_dir, FS_keys, CS_keys)            
+        h5 = Saver.save_data(h5_filepath, PG, sim_dir, FS_keys, CS_keys, 
+            N_worker = N_worker, storage = storage)            
     
         exit_status = h5['exit_status'][:]
     
         print(f'Finished simulations: {np.sum(exit_status)/len(exit_status)*100}% failed')    
+
+        if 'profile' in h5:
+            print('Average time spent per simulation:')
+            for key, dset in h5['profile'].items():
+                print(f'{key}: {np.nanmean(dset[:]):.3f}')
+                
         print(f'Saved parameter scan simulations results to {h5_filepath}')
         
         return h5
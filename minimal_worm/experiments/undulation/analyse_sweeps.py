@@ -112,6 +112,16 @@ def analyse(
     
     return
 
+def body_coordinates(h5: h5py, N: int):
+    '''
+    Returns the body coordinates of the mesh points. Raw data files 
+    without mesh point coordinates have uniform meshes
+    '''
+    if 's' in h5:
+        return h5['s'][:]
+    
+    return np.linspace(0, 1, N)
+
 def compute_final_centroid_destination(h5: h5py):
     '''
     Computes the final centroid destination
@@ -119,7 +129,7 @@ def compute_final_centroid_destination(h5: h5py):
     '''
 
     r = h5['FS']['r'][:, -1, :, :]        
-    R = r.mean(axis = 2)
+    R = PostProcessor.comp_com(r, body_coordinates(h5, r.shape[-1]))
     
     return R.reshape(np.append(h5.attrs['shape'], 3))
 
@@ -162,7 +172,7 @@ def compute_undulation_frequency(h5: h5py, Delta_t = 1.0):
     dt = t_arr[1] - t_arr[0]     
     # mesh
     N = h5['FS']['k'].shape[-1]
-    s_arr = np.linspace(0, 1, N)
+    s_arr = body_coordinates(h5, N)
         
     # Crop first undulation cycle
     t_idx_arr = t_arr >= Delta_t
@@ -218,7 +228,7 @@ def compute_time_lag(h5: h5py, Delta_t = 1.0):
     dt = t_arr[1] - t_arr[0]     
     # mesh
     N = h5['FS']['k'].shape[-1]
-    s_arr = np.linspace(0, 1, N)
+    s_arr = body_coordinates(h5, N)
         
     # Crop first undulation cycle
     t_idx_arr = t_arr >= Delta_t
@@ -289,7 +299,7 @@ def compute_curvature_amplitude(h5: h5py):
         
     # mesh
     N = h5['FS']['k'].shape[-1]
-    s_arr = np.linspace(0, 1, N)
+    s_arr = body_coordinates(h5, N)
 
     # Only look at last period
     t_idx_arr = t >= (T - 1)        
@@ -316,7 +326,7 @@ def compute_curvature_amplitude(h5: h5py):
 
 def cluster_curvature_zero_crossings(k_all_mat, t_arr, s_arr):
     
-    ds = s_arr[1] - s_arr[0]
+    ds = np.diff(s_arr).min()
         
     lam_mat = np.zeros((k_all_mat.shape[0], len(s_arr)))
     lam_avg_arr = np.zeros(k_all_mat.shape[0])
@@ -454,7 +464,7 @@ def compute_undulation_wavelength(h5: h5py):
     
     # mesh
     N = h5['FS']['k'].shape[-1]
-    s_arr = np.linspace(0, 1, N)
+    s_arr = body_coordinates(h5, N)
     # Curvature
         
     k_mat = h5['FS']['k'][:, :, 0, :] 
@@ -488,10 +498,11 @@ def compute_swimming_speed(h5: h5py):
     T = h5.attrs['T']    
     U_arr = np.zeros(h5['FS']['r'].shape[0])    
     t = h5['t'][:]
+    s = body_coordinates(h5, h5['FS']['r'].shape[-1])
         
     for i, r in enumerate(h5['FS']['r']):
 
-        U_arr[i] = PostProcessor.comp_mean_swimming_speed(r, t, T-1)[0]
+        U_arr[i] = PostProcessor.comp_mean_swimming_speed(r, t, T-1, s)[0]
         
     return U_arr.reshape(h5.attrs['shape'])
 
@@ -506,10 +517,11 @@ def compute_maximum_speed(h5: h5py):
     u_abs_max_arr = np.zeros(h5['FS']['r'].shape[0])
     
     t = h5['t'][:]
+    s = body_coordinates(h5, h5['FS']['r'].shape[-1])
                 
     for i, (r, u) in enumerate(zip(h5['FS']['r'], h5['FS']['r_t'])):
 
-        uS_max, uW_max, u_abs = PostProcessor.comp_max_swimming_speed(r, u, t, T-1)
+        uS_max, uW_max, u_abs = PostProcessor.comp_max_swimming_speed(r, u, t, T-1, s)
         uS_max_arr[i] = uS_max
         uW_max_arr[i] = uW_max
         u_abs_max_arr[i] = u_abs
@@ -524,10 +536,11 @@ def compute_wobbling_distance(h5: h5py):
     t = h5['t'][:]
 
     SW_arr = np.zeros(h5['FS']['r'].shape[0])
+    s = body_coordinates(h5, h5['FS']['r'].shape[-1])
 
     for i, r in enumerate(h5['FS']['r']):
 
-        SW_arr[i] = PostProcessor.comp_wobbling_distance(r, t, T-1)
+        SW_arr[i] = PostProcessor.comp_wobbling_distance(r, t, T-1, s)
         
     return SW_arr.reshape(h5.attrs['shape'])
     
@@ -555,10 +568,11 @@ def compute_wobbling_speed(h5: h5py):
 
     Y_avg_arr = np.zeros(h5['FS']['r'].shape[0])    
     Y_max_arr = np.zeros(h5['FS']['r'].shape[0])    
+    s = body_coordinates(h5, h5['FS']['r'].shape[-1])
         
     for i, r in enumerate(h5['FS']['r']):
 
-        Y_avg, Y_max, _ = PostProcessor.comp_amplitude_wobbling_speed(r, t, T-1)
+        Y_avg, Y_max, _ = PostProcessor.comp_amplitude_wobbling_speed(r, t, T-1, s)
 
         Y_avg_arr[i] = Y_avg 
         Y_max_arr[i] = Y_max
@@ -595,15 +609,25 @@ def compute_propulsive_force(h5: h5py):
     t = h5['t'][:]
     
     fp_arr = np.zeros((h5['FS']['r'].shape[0]))
+    s = body_coordinates(h5, h5['FS']['r'].shape[-1])
                 
     for i, (f_F, r) in enumerate(zip(h5['FS']['f_F'], h5['FS']['r'])):
 
-        fp_avg = PostProcessor.comp_propulsive_force(f_F, r, t, T-1)[0]
+        fp_avg = PostProcessor.comp_propulsive_force(f_F, r, t, T-1, s)[0]
 
         fp_arr[i] = fp_avg
                         
     return fp_arr.reshape(h5.attrs["shape"])
                      
+def load_metrics(h5: h5py):
+    '''
+    Loads scalar metrics which have been accumulated during the 
+    simulations, see minimal_worm.metrics, reshaped to the grid shape
+    '''
+    
+    return {k: h5['metrics'][k][:].reshape(h5.attrs['shape']) 
+        for k in h5['metrics'].keys()}
+
 def compute_energies(h5: h5py): #Delta_t: float = 2.0):
     '''
     Computes energy cost  and mechanical work per undulation period 
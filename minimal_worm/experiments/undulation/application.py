@@ -207,7 +207,8 @@ def sweep_mu_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -222,13 +223,13 @@ def sweep_mu_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     #===============================================================================
     # Post analysis 
     #===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True        
@@ -353,7 +354,8 @@ def sweep_mu_fang_yen_test(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -367,13 +369,13 @@ def sweep_mu_fang_yen_test(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     #===============================================================================
     # Post analysis 
     #===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True        
@@ -467,7 +469,8 @@ def sweep_a_b_water_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -483,10 +486,10 @@ def sweep_a_b_water_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.f = True
         sweep_param.lag = True                
@@ -578,7 +581,8 @@ def sweep_a_b_peanut_butter_fang_yen(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -594,10 +598,10 @@ def sweep_a_b_peanut_butter_fang_yen(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.f = True
         sweep_param.lag = True
@@ -694,7 +698,8 @@ def sweep_c_lam_water_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -709,10 +714,10 @@ def sweep_c_lam_water_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.f = True
         sweep_param.lag = True                
@@ -847,7 +852,8 @@ def sweep_E_mu_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -862,13 +868,13 @@ def sweep_E_mu_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     #===============================================================================
     # Post analysis 
     #===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True        
@@ -992,7 +998,8 @@ def sweep_xi_mu_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1007,13 +1014,13 @@ def sweep_xi_mu_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     #===============================================================================
     # Post analysis 
     #===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True        
@@ -1146,7 +1153,8 @@ def sweep_E_xi_mu_fang_yen(argv):
                 sim_dir, 
                 sweep_param.overwrite, 
                 sweep_param.debug,
-                'UExp')
+                'UExp',
+                shard = sweep_param.shard)
     
         PG_filepath = PG.save(log_dir)
         print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1161,13 +1169,13 @@ def sweep_E_xi_mu_fang_yen(argv):
         
         h5_filepath = sweep_dir / filename
     
-        if sweep_param.pool:        
-            Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+        if sweep_param.pool and sweep_param.shard is None:        
+            Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
     
         #===============================================================================
         # Post analysis 
         #===============================================================================
-        if sweep_param.analyse:
+        if sweep_param.analyse and sweep_param.shard is None:
             sweep_param.A = True
             sweep_param.lam = True
             sweep_param.psi = True        
@@ -1300,7 +1308,8 @@ def sweep_mu_lam_c_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1319,13 +1328,13 @@ def sweep_mu_lam_c_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     #===============================================================================
     # Post analysis 
     #===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True        
@@ -1455,7 +1464,8 @@ def sweep_mu_lam_c_fang_yen_fit_E(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1474,13 +1484,13 @@ def sweep_mu_lam_c_fang_yen_fit_E(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     #===============================================================================
     # Post analysis 
     #===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True        
@@ -1609,7 +1619,8 @@ def sweep_K_mu_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1625,13 +1636,13 @@ def sweep_K_mu_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     #===============================================================================
     # Post analysis 
     #===============================================================================
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True        
@@ -42,6 +42,8 @@ def default_sweep_parameter():
                         help='If true, analyse pooled raw data')
     parser.add_argument('--overwrite', action=BooleanOptionalAction, default=False,
                         help='If true, already existing simulation results are overwritten')
+    parser.add_argument('--shard', type=Sweeper.parse_shard, default=None,
+                        help='Shard i/n, e.g. 0/4, if given, only the grid points of shard i out of n are run and results are neither pooled nor analysed')
     parser.add_argument('--debug', action=BooleanOptionalAction, default=False,
                         help='If true, exception handling is turned off which is helpful for debugging')
     parser.add_argument('--save_to_storage', action=BooleanOptionalAction, default=False,
@@ -310,7 +312,8 @@ def sweep_a_b(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -327,10 +330,10 @@ def sweep_a_b(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
 
 def sweep_mu_a_b(argv):
@@ -423,7 +426,8 @@ def sweep_mu_a_b(argv):
             sim_dir,
             sweep_param.overwrite,
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -440,10 +444,10 @@ def sweep_mu_a_b(argv):
 
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
     return
 
@@ -117,7 +117,8 @@ def sweep_A_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -133,10 +134,10 @@ def sweep_A_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.f = True
@@ -238,7 +239,8 @@ def sweep_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -254,10 +256,10 @@ def sweep_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.f = True
@@ -367,7 +369,8 @@ def sweep_f_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -383,10 +386,10 @@ def sweep_f_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -490,7 +493,8 @@ def sweep_f_A_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -506,10 +510,10 @@ def sweep_f_A_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -629,7 +633,8 @@ def sweep_mu_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -645,10 +650,10 @@ def sweep_mu_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -764,7 +769,8 @@ def sweep_E_mu_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -780,10 +786,10 @@ def sweep_E_mu_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
@@ -899,7 +905,8 @@ def sweep_mu_A_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -915,10 +922,10 @@ def sweep_mu_A_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True
         sweep_param.psi = True
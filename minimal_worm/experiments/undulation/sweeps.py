@@ -238,6 +238,8 @@ def default_sweep_parameter():
         help = 'If true, analyse pooled raw data')     
     parser.add_argument('--overwrite', action=BooleanOptionalAction, default = False,
         help = 'If true, already existing simulation results are overwritten')
+    parser.add_argument('--shard', type = Sweeper.parse_shard, default = None,
+        help = 'Shard i/n, e.g. 0/4, if given, only the grid points of shard i out of n are run and results are neither pooled nor analysed')
     parser.add_argument('--debug', action=BooleanOptionalAction, default = False,
         help = 'If true, exception handling is turned off which is helpful for debugging')    
     parser.add_argument('--save_to_storage', action=BooleanOptionalAction, default = False,
@@ -387,7 +389,8 @@ def sweep_a_b(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -403,10 +406,10 @@ def sweep_a_b(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -498,7 +501,8 @@ def sweep_A_lam_a_b(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -516,11 +520,11 @@ def sweep_A_lam_a_b(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # Anaylse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -608,7 +612,8 @@ def sweep_lam_a_b(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
 
     PG_filepath = PG.save(log_dir)
@@ -625,11 +630,11 @@ def sweep_lam_a_b(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # Anaylse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -718,7 +723,8 @@ def sweep_c_a_b(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -734,11 +740,11 @@ def sweep_c_a_b(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -829,7 +835,8 @@ def sweep_c_lam_a_b(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -846,11 +853,11 @@ def sweep_c_lam_a_b(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -939,7 +946,8 @@ def sweep_C_a_b(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -955,10 +963,10 @@ def sweep_C_a_b(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -1053,7 +1061,8 @@ def sweep_C_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1068,11 +1077,11 @@ def sweep_C_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # Analyse simulation result
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -1182,7 +1191,8 @@ def sweep_C_xi_mu_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1197,11 +1207,11 @@ def sweep_C_xi_mu_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
     # Analyse simulations results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
 
     return
@@ -1301,7 +1311,8 @@ def sweep_mu_c_lam_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1317,11 +1328,11 @@ def sweep_mu_c_lam_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -1429,7 +1440,8 @@ def sweep_xi_mu_c_lam_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1446,11 +1458,11 @@ def sweep_xi_mu_c_lam_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -1555,7 +1567,8 @@ def sweep_C_mu_c_lam_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1572,10 +1585,10 @@ def sweep_C_mu_c_lam_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
     
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -1690,7 +1703,8 @@ def sweep_C_xi_mu_c_lam_fang_yen(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1708,11 +1722,11 @@ def sweep_C_xi_mu_c_lam_fang_yen(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
                 
     return
@@ -1821,7 +1835,8 @@ def sweep_f_rikmenspoel(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1836,11 +1851,11 @@ def sweep_f_rikmenspoel(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
 
     return
@@ -1934,7 +1949,8 @@ def sweep_f_lam_rikmenspoel(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -1949,11 +1965,11 @@ def sweep_f_lam_rikmenspoel(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
 
 def sweep_xi_f_lam_rikmenspoel(argv):
@@ -2059,7 +2075,8 @@ def sweep_xi_f_lam_rikmenspoel(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -2075,11 +2092,11 @@ def sweep_xi_f_lam_rikmenspoel(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
 
 def sweep_f_c_lam_rikmenspoel(argv):
@@ -2176,7 +2193,8 @@ def sweep_f_c_lam_rikmenspoel(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
     
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -2192,11 +2210,11 @@ def sweep_f_c_lam_rikmenspoel(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
         
     # Analyse simulation results
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         analyse(h5_filepath, what_to_calculate=sweep_param)
 
     return
@@ -40,6 +40,8 @@ def default_sweep_parameter():
         help = 'If true, analyse pooled raw data')     
     parser.add_argument('--overwrite', action=BooleanOptionalAction, default = False,
         help = 'If true, already existing simulation results are overwritten')
+    parser.add_argument('--shard', type = Sweeper.parse_shard, default = None,
+        help = 'Shard i/n, e.g. 0/4, if given, only the grid points of shard i out of n are run and results are neither pooled nor analysed')
     parser.add_argument('--debug', action=BooleanOptionalAction, default = False,
         help = 'If true, exception handling is turned off which is helpful for debugging')    
     parser.add_argument('--save_to_storage', action=BooleanOptionalAction, default = False,
@@ -218,7 +220,8 @@ def sweep_N_dt_k(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -232,10 +235,10 @@ def sweep_N_dt_k(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.R = True
         analyse(h5_filepath, what_to_calculate=sweep_param)    
     return
@@ -317,7 +320,8 @@ def sweep_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -332,10 +336,10 @@ def sweep_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.R = True
         analyse(h5_filepath, what_to_calculate=sweep_param)    
     return
@@ -425,7 +429,8 @@ def sweep_a_b(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -441,10 +446,10 @@ def sweep_a_b(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.f = True
         sweep_param.lag = True                
@@ -551,7 +556,8 @@ def sweep_f_c_lam(argv):
             sim_dir, 
             sweep_param.overwrite, 
             sweep_param.debug,
-            'UExp')
+            'UExp',
+            shard = sweep_param.shard)
 
     PG_filepath = PG.save(log_dir)
     print(f'Finished sweep! Save ParameterGrid to {PG_filepath}')
@@ -567,10 +573,10 @@ def sweep_f_c_lam(argv):
     
     h5_filepath = sweep_dir / filename
 
-    if sweep_param.pool:        
-        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK)
+    if sweep_param.pool and sweep_param.shard is None:        
+        Sweeper.save_sweep_to_h5(PG, h5_filepath, sim_dir, FK, CK, sweep_param.worker)
 
-    if sweep_param.analyse:
+    if sweep_param.analyse and sweep_param.shard is None:
         sweep_param.A = True
         sweep_param.lam = True                        
         sweep_param.f = True
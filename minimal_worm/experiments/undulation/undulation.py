@@ -10,6 +10,12 @@ import numpy as np
 # from fenics import Expression, Constant
 from fenics import *
 
+try:
+    from fenics_adjoint import *
+except ModuleNotFoundError:
+    # This optional import is only needed if derivatives are being taken.
+    pass
+
 #Local
 from minimal_worm.experiments import Experiment
 from argparse import BooleanOptionalAction
@@ -41,6 +47,10 @@ class UndulationExperiment(Experiment):
         '''
         Sinusoidal travelling wave control sequence
         with fixed amplitude
+        
+        The amplitude A and the wavelength lam can be fenics Constants 
+        if they are used as controls to compute derivatives, see 
+        Worm.gradient
 
         :param worm (CosseratRod): worm object
         :param param (dict): param dictionary
@@ -52,13 +62,13 @@ class UndulationExperiment(Experiment):
            
         # Kinematic param
         lam = param.lam
-        q = 2*np.pi / lam
                 
         if not param.use_c:
             A = param.A            
         else:
+            assert not isinstance(lam, Constant), 'lam can not be a control if use_c is true' 
             c = param.c
-            A = c*q
+            A = c*2*np.pi / lam
 
         t = Constant(0.0)
                                     
@@ -68,8 +78,21 @@ class UndulationExperiment(Experiment):
         # Gradual muscle activation onset at head and tale
         sh, st = UndulationExperiment.spatial_gmo(param)        
                                                                         
-        k = Expression(("sm_on*sh*st*A*sin(q*x[0] - 2*pi*t)", "0", "0"), 
-            degree=1, t = t, A = A, q = q, sh = sh, st = st, sm_on = sm_on)   
+        k = Expression(("sm_on*sh*st*A*sin(2*pi/lam*x[0] - 2*pi*t)", "0", "0"), 
+            degree=1, t = t, A = A, lam = lam, sh = sh, st = st, sm_on = sm_on)   
+
+        # Derivatives of the preferred curvature with respect to controls         
+        controls = {k: v for k, v in zip(['A', 'lam'], [A, lam]) if isinstance(v, Constant)}
+        
+        if controls:
+            dk = {}
+            dk['A'] = Expression(("sm_on*sh*st*sin(2*pi/lam*x[0] - 2*pi*t)", "0", "0"), 
+                degree=1, t = t, lam = lam, sh = sh, st = st, sm_on = sm_on)       
+            dk['lam'] = Expression(("-sm_on*sh*st*A*cos(2*pi/lam*x[0] - 2*pi*t)*2*pi*x[0]/(lam*lam)", "0", "0"), 
+                degree=1, t = t, A = A, lam = lam, sh = sh, st = st, sm_on = sm_on)       
+            
+            k.dependencies = list(controls.values())
+            k.user_defined_derivatives = {v: dk[key] for key, v in controls.items()}
                   
         sig = Constant((0, 0, 0))    
     
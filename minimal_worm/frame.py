@@ -56,12 +56,23 @@ class FrameSequence():
         
     def __init__(self, frames):
                 
+        # Empty if no frames were reported 
+        if len(frames) == 0:
+            return
+                
         for k in FRAME_KEYS:                        
-            if hasattr(frames[0], k):                        
+            if all(hasattr(F, k) for F in frames):                        
                 setattr(self,  k, np.array([getattr(F, k) for F in frames]))             
       
     def __len__(self):
-        return self.r.shape[0]
+        
+        # Metrics-only simulations report no frames
+        if hasattr(self, 't'):
+            return self.t.shape[0]
+        if hasattr(self, 'r'):
+            return self.r.shape[0]
+        
+        return 0
     
     
                    
@@ -0,0 +1,230 @@
+# Built-in imports
+from argparse import Namespace
+from typing import Dict
+
+# Third-party imports
+import numpy as np
+from scipy.sparse import lil_matrix
+from scipy.sparse.linalg import spsolve
+
+# Local imports
+from minimal_worm.model_parameters import ModelParameter, physical_to_dimless_parameters
+
+class LinearResponse():
+    '''
+    Frequency-domain solver for the planar response of the worm to a
+    small amplitude sinusoidal travelling curvature wave
+
+        k0 = A * sh(s) * st(s) * sin(q*s - 2*pi*t)
+
+    see UndulationExperiment.stw_control_sequence. The equations of motion
+    are linearised around the straight configuration r = (0, 0, s). In the
+    yz-plane, the state is described by the lateral displacement y, the Euler
+    angle gamma, the normal force N and the internal torque M. All fields are
+    time periodic, i.e. f(s, t) = Re(f_hat(s) * exp(-i*omega*t)), which yields
+    a linear boundary value problem for the complex amplitudes
+
+        y' = gamma + N / S_c
+        gamma' = -(M + B * k0) / B_c
+        N' = C * y_t
+        M' = N - D * Y * gamma_t
+
+    with N = M = 0 at both ends and complex moduli S_c = S - i*omega*S_tilde,
+    B_c = B - i*omega*B_tilde. The swimming speed follows from the second-order
+    force balance along the body axis.
+
+    Results are reported in the same units as analyse_sweeps, i.e. speed in
+    units of L0/T_c, energies per undulation period.
+    '''
+
+    # Undulation frequency in units of 1/T_c
+    omega = 2 * np.pi
+
+    def __init__(self, N: int = 250):
+        '''
+        :param N: Number of centreline points
+        '''
+
+        self.N = N
+        self.s_arr = np.linspace(0, 1, N)
+
+    @staticmethod
+    def stw_curvature_amplitude(param: Namespace, s_arr: np.ndarray):
+        '''
+        Complex amplitude of the preferred curvature k0 of the
+        sinusoidal travelling wave control sequence
+
+        :param param: undulation parameter
+        :param s_arr (N): body coordinates
+        '''
+
+        q = 2 * np.pi / param.lam
+
+        if not param.use_c:
+            A = param.A
+        else:
+            A = param.c * q
+
+        # Gradual muscle activation onset at head and tale
+        if param.gsmo:
+            sh = 1.0 / (1 + np.exp(-(s_arr - param.s0_h) / param.Ds_h))
+            st = 1.0 / (1 + np.exp((s_arr - param.s0_t) / param.Ds_t))
+        else:
+            sh = st = np.ones_like(s_arr)
+
+        # sin(q*s - omega*t) = Re(-i * exp(i*q*s) * exp(-i*omega*t))
+        return -1j * A * sh * st * np.exp(1j * q * s_arr)
+
+    def solve(self, MP: ModelParameter, k0_hat: np.ndarray):
+        '''
+        Solves linearised boundary value problem using the trapezoidal rule
+
+        :param MP: model parameter
+        :param k0_hat (N): complex amplitude of preferred curvature
+        :return sol (dict): complex amplitudes of y, gamma, N, M and k
+        '''
+
+        assert MP.phi is None, 'Linear response is only implemented for uniform cross-sections'
+
+        N, s_arr, w = self.N, self.s_arr, LinearResponse.omega
+
+        # Shear and bending modulus in the plane of undulation
+        S, S_tilde = MP.S[1, 1], MP.S_tilde[1, 1]
+        B, B_tilde = MP.B[0, 0], MP.B_tilde[0, 0]
+
+        S_c = S - 1j * w * S_tilde
+        B_c = B - 1j * w * B_tilde
+
+        # X' = P * X + F with X = (y, gamma, N, M)
+        P = np.array([
+            [0, 1, 1.0 / S_c, 0],
+            [0, 0, 0, -1.0 / B_c],
+            [-1j * w * MP.C, 0, 0, 0],
+            [0, 1j * w * MP.D * MP.Y, 1, 0]
+        ])
+
+        F = np.zeros((N, 4), dtype = complex)
+        F[:, 1] = - B * k0_hat / B_c
+
+        # Trapezoidal rule X_i+1 - X_i = h/2 * (P*(X_i + X_i+1) + F_i + F_i+1)
+        L = lil_matrix((4 * N, 4 * N), dtype = complex)
+        b = np.zeros(4 * N, dtype = complex)
+
+        I = np.identity(4)
+
+        for i, h in enumerate(np.diff(s_arr)):
+
+            rows = slice(4 * i, 4 * i + 4)
+
+            L[rows, 4 * i: 4 * i + 4] = - I - 0.5 * h * P
+            L[rows, 4 * i + 4: 4 * i + 8] = I - 0.5 * h * P
+            b[rows] = 0.5 * h * (F[i, :] + F[i + 1, :])
+
+        # Force and torque free boundaries
+        L[4 * N - 4, 2] = 1.0
+        L[4 * N - 3, 3] = 1.0
+        L[4 * N - 2, 4 * N - 2] = 1.0
+        L[4 * N - 1, 4 * N - 1] = 1.0
+
+        X = spsolve(L.tocsr(), b).reshape(N, 4)
+
+        sol = {}
+        sol['s'] = s_arr
+        sol['y'], sol['gamma'], sol['N'], sol['M'] = X.T
+        # Curvature k1 = -gamma'
+        sol['k'] = (sol['M'] + B * k0_hat) / B_c
+        sol['k0'] = k0_hat
+        # Shear
+        sol['sig'] = sol['N'] / S_c
+
+        return sol
+
+    @staticmethod
+    def period_average(f_hat: np.ndarray, g_hat: np.ndarray):
+        '''
+        Time average of the product of two time periodic fields over one period
+        '''
+        return 0.5 * np.real(f_hat * np.conj(g_hat))
+
+    @staticmethod
+    def observables(MP: ModelParameter, sol: Dict, s0: float = 0.1, s1: float = 0.9):
+        '''
+        Computes swimming speed, curvature amplitude, time lag between
+        curvature and preferred curvature and energies per undulation period
+
+        :param MP: model parameter
+        :param sol: solution returned by solve
+        :param s0: start of the body centre used for curvature statistics
+        :param s1: end of the body centre used for curvature statistics
+        '''
+
+        w = LinearResponse.omega
+        avg = LinearResponse.period_average
+
+        s_arr = sol['s']
+        y_t, gamma_t = -1j * w * sol['y'], -1j * w * sol['gamma']
+        k_t, sig_t = -1j * w * sol['k'], -1j * w * sol['sig']
+
+        obs = {}
+
+        # Second-order force balance along the body axis
+        obs['U'] = np.abs((MP.C - 1) * np.trapz(avg(sol['gamma'], y_t), x = s_arr))
+
+        # Only consider body centre
+        s_idx_arr = np.logical_and(s0 <= s_arr, s_arr <= s1)
+        k_abs = np.abs(sol['k'][s_idx_arr])
+        obs['A_avg'], obs['A_std'] = k_abs.mean(), k_abs.std()
+
+        lag = np.angle(sol['k'][s_idx_arr] / sol['k0'][s_idx_arr]) / w
+        obs['lag_avg'], obs['lag_std'] = lag.mean(), lag.std()
+
+        # Energies per period
+        T = 2 * np.pi / w
+
+        obs['D_F'] = - T * np.trapz(MP.C * avg(y_t, y_t)
+            + MP.D * MP.Y * avg(gamma_t, gamma_t), x = s_arr)
+        obs['D_I'] = - T * np.trapz(MP.S_tilde[1, 1] * avg(sig_t, sig_t)
+            + MP.B_tilde[0, 0] * avg(k_t, k_t), x = s_arr)
+        # Elastic energy is periodic
+        obs['V'] = 0.0
+        obs['W'] = obs['V'] - obs['D_F'] - obs['D_I']
+
+        return obs
+
+    def simulate(self, param: Namespace):
+        '''
+        Computes observables for given undulation parameter
+
+        :param param: undulation parameter, see UndulationExperiment.parameter_parser
+        '''
+
+        physical_to_dimless_parameters(param)
+        MP = ModelParameter(param)
+
+        k0_hat = LinearResponse.stw_curvature_amplitude(param, self.s_arr)
+        sol = self.solve(MP, k0_hat)
+
+        return LinearResponse.observables(MP, sol)
+
+    def screen(self, PG):
+        '''
+        Evaluates the linear response for every parameter in the grid.
+
+        Can be used to pre-screen large parameter sweeps before running
+        nonlinear simulations.
+
+        :param PG (parameter_scan.ParameterGrid): parameter grid
+        :return obs (dict): observables reshaped to the grid shape
+        '''
+
+        obs_arr = []
+
+        for param in PG.param_arr:
+            param_ns = Namespace()
+            param_ns.__dict__.update(param)
+            obs_arr.append(self.simulate(param_ns))
+
+        obs = {k: np.array([o[k] for o in obs_arr]).reshape(PG.shape)
+            for k in obs_arr[0].keys()}
+
+        return obs
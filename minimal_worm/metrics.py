@@ -0,0 +1,257 @@
+# Built-in imports
+from typing import Dict, List, Optional
+from abc import ABC, abstractmethod
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from minimal_worm.frame import POWER_KEYS
+from minimal_worm.util import nodal_curvature
+
+class Metric(ABC):
+    '''
+    Streaming accumulator which is updated by Worm.update_solution after
+    every time step. Only time steps t >= t_start contribute, i.e. the
+    initial transient is discarded as in analyse_sweeps.
+    '''
+
+    def __init__(self, t_start: float = 0.0):
+        '''
+        :param t_start: start of the time window
+        '''
+        self.t_start = t_start
+
+    def reset(self, worm):
+        '''
+        Resets the accumulator at the start of a simulation
+        '''
+        pass
+
+    def in_window(self, worm) -> bool:
+
+        # Allow for round-off errors in the accumulated time
+        return worm._t >= self.t_start - 0.5 * worm.dt
+
+    @abstractmethod
+    def update(self, worm):
+        '''
+        :param worm (minimal_worm.Worm): worm after the current step has been solved
+        '''
+        pass
+
+    @abstractmethod
+    def result(self) -> Dict[str, float]:
+        pass
+
+    @staticmethod
+    def com(r: np.ndarray, s: np.ndarray) -> np.ndarray:
+        '''
+        Centre of mass, see PostProcessor.comp_com
+        '''
+        if np.allclose(np.diff(s), s[1] - s[0]):
+            return r.mean(axis = -1)
+
+        return np.trapz(r, x = s, axis = -1) / (s[-1] - s[0])
+
+    @staticmethod
+    def vertex_values(f, N: int) -> np.ndarray:
+        '''
+        Values of vector-valued function f at the mesh points
+        '''
+        return f.compute_vertex_values().reshape(3, N)
+
+class SwimmingSpeed(Metric):
+    '''
+    Records the centre of mass trajectory, i.e. three floats per time step,
+    and computes the mean swimming speed along the propulsion direction, see
+    PostProcessor.comp_mean_swimming_speed, and the speed from the start and
+    end point of the centre of mass.
+    '''
+
+    def reset(self, worm):
+
+        self.t_arr, self.r_com_arr = [], []
+
+    def update(self, worm):
+
+        if not self.in_window(worm):
+            return
+
+        r = Metric.vertex_values(worm._r, worm.N)
+
+        self.t_arr.append(worm._t)
+        self.r_com_arr.append(Metric.com(r, worm.s_arr))
+
+    def result(self):
+
+        if len(self.t_arr) < 3:
+            return {'U': np.nan, 'U_simple': np.nan}
+
+        from minimal_worm.experiments.post_processor import PostProcessor
+
+        t, r_com = np.array(self.t_arr), np.array(self.r_com_arr)
+
+        # Centre of mass trajectory is passed as a centreline with one point
+        U = PostProcessor.comp_mean_swimming_speed(r_com[:, :, None], t)[0]
+        U_simple = np.linalg.norm(r_com[-1] - r_com[0]) / (t[-1] - t[0])
+
+        return {'U': U, 'U_simple': U_simple}
+
+class MaxSpeed(Metric):
+    '''
+    Time average of the maximum absolute centreline velocity along the body.
+    The velocity is approximated by the same finite backwards difference
+    as in the weak form.
+    '''
+
+    def reset(self, worm):
+
+        self.c_arr, self.s_arr = worm._finite_difference_coefficients(1, worm.fdo)
+        self.dt = worm.dt
+
+        self.r_old_arr = [Metric.vertex_values(u.split(deepcopy = True)[0], worm.N)
+            for u in worm.u_old_arr]
+
+        self.u_max_sum, self.n = 0.0, 0
+
+    def update(self, worm):
+
+        r = Metric.vertex_values(worm._r, worm.N)
+
+        if self.in_window(worm):
+            r_t = sum(c * (r if s == 0 else self.r_old_arr[s])
+                for s, c in zip(self.s_arr, self.c_arr)) / self.dt
+
+            self.u_max_sum += np.linalg.norm(r_t, axis = 0).max()
+            self.n += 1
+
+        self.r_old_arr = self.r_old_arr[1:] + [r]
+
+    def result(self):
+
+        return {'u_abs_max': self.u_max_sum / self.n if self.n > 0 else np.nan}
+
+class PowerIntegral(Metric):
+    '''
+    Running trapezoidal integral of the powers over the time window,
+    i.e. energies dissipated, stored and done, see analyse_sweeps.compute_energies
+    '''
+
+    def __init__(self, t_start: float = 0.0, keys: Optional[List[str]] = None):
+        '''
+        :param t_start: start of the time window
+        :param keys: power keys, defaults to POWER_KEYS
+        '''
+        super().__init__(t_start)
+        self.keys = POWER_KEYS if keys is None else keys
+
+    def reset(self, worm):
+
+        self.E = {k: 0.0 for k in self.keys}
+        self.P_old = None
+        self.dt = worm.dt
+
+    def update(self, worm):
+
+        if not self.in_window(worm):
+            return
+
+        P = {k: worm._assemble_output(k) for k in self.keys}
+
+        if self.P_old is not None:
+            for k in self.keys:
+                self.E[k] += 0.5 * self.dt * (self.P_old[k] + P[k])
+
+        self.P_old = P
+
+    def result(self):
+
+        # Energy names, e.g. D_F_dot -> D_F
+        return {k[:-len('_dot')]: E for k, E in self.E.items()}
+
+class CurvatureAmplitude(Metric):
+    '''
+    Running maximum of the curvature over the time window, averaged over
+    the body centre, see analyse_sweeps.compute_curvature_amplitude. The
+    curvature is evaluated from nodal Euler angles.
+    '''
+
+    def __init__(self,
+            t_start: float = 0.0,
+            s0: float = 0.1,
+            s1: float = 0.9,
+            component: int = 0):
+        '''
+        :param t_start: start of the time window
+        :param s0: start of the body centre
+        :param s1: end of the body centre
+        :param component: curvature component
+        '''
+        super().__init__(t_start)
+        self.s0, self.s1 = s0, s1
+        self.component = component
+
+    def reset(self, worm):
+
+        self.s_idx_arr = np.logical_and(self.s0 <= worm.s_arr, worm.s_arr <= self.s1)
+        self.k_max = None
+
+    def update(self, worm):
+
+        if not self.in_window(worm):
+            return
+
+        theta = Metric.vertex_values(worm._theta, worm.N)
+        k = nodal_curvature(theta, worm.s_arr)[self.component, self.s_idx_arr]
+
+        self.k_max = k if self.k_max is None else np.maximum(self.k_max, k)
+
+    def result(self):
+
+        if self.k_max is None:
+            return {'A_avg': np.nan, 'A_std': np.nan}
+
+        return {'A_avg': self.k_max.mean(), 'A_std': self.k_max.std()}
+
+class TimeAverage(Metric):
+    '''
+    Time average of a scalar output, e.g. k_norm or sig_norm
+    '''
+
+    def __init__(self, key: str, t_start: float = 0.0):
+        '''
+        :param key: output key
+        :param t_start: start of the time window
+        '''
+        super().__init__(t_start)
+        self.key = key
+
+    def reset(self, worm):
+
+        self.sum, self.n = 0.0, 0
+
+    def update(self, worm):
+
+        if not self.in_window(worm):
+            return
+
+        self.sum += worm._assemble_output(self.key)
+        self.n += 1
+
+    def result(self):
+
+        return {f'{self.key}_avg': self.sum / self.n if self.n > 0 else np.nan}
+
+def default_metrics(t_start: float) -> List[Metric]:
+    '''
+    Scalars computed by analyse_sweeps
+    '''
+    return [
+        SwimmingSpeed(t_start),
+        MaxSpeed(t_start),
+        PowerIntegral(t_start),
+        CurvatureAmplitude(t_start),
+        TimeAverage('k_norm', t_start),
+        TimeAverage('sig_norm', t_start)
+    ]
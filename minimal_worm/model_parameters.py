@@ -10,17 +10,22 @@ from pathlib import Path
 
 # Third-party 
 from fenics import *
+from ufl.core.expr import Expr
 import numpy as np
 import pint
 import cv2
 # Local import 
 from minimal_worm.util import f2n
+from minimal_worm.reporting import Stroboscopic
+from minimal_worm.metrics import default_metrics
 
 # Default unit registry
 ureg = pint.UnitRegistry() 
 
 DIMLESS_PARAM_KEYS = ['g', 'C', 'Y', 'D', 'p', 'q', 'a', 'b']
 
+PHYSICAL_PARAM_KEYS = ['T_c', 'L0', 'R', 'mu', 'E', 'G', 'eta', 'nu']
+
 def parameter_parser():
 
     param = ArgumentParser(description = 'dimless-model-parameter')
@@ -105,6 +110,25 @@ def parameter_parser():
         default = None, help = 'Save simulation results for N_report centreline points')
     param.add_argument('--dt_report', type = lambda v: None if v.lower()=='none' else float(v), 
         default = None, help = 'Save simulation results only every dt_report time step')
+    param.add_argument('--t_report_start', type = lambda v: None if v.lower()=='none' else float(v), 
+        default = None, help = 'Save simulation results only for times t >= t_report_start')
+    param.add_argument('--report_phases', type = lambda v: None if v.lower()=='none' else int(v), 
+        default = None, help = 'If not None, save simulation results only at report_phases equally spaced phases per control period')
+    param.add_argument('--report_period', type = float, default = 1.0, 
+        help = 'Control period used for stroboscopic reporting')
+    param.add_argument('--metrics', action = BooleanOptionalAction, default = False, 
+        help = 'If true, accumulate scalar metrics, e.g. swimming speed and energies, during the simulation')
+    param.add_argument('--metrics_only', action = BooleanOptionalAction, default = False, 
+        help = 'If true, only save accumulated metrics and no frames')
+    param.add_argument('--metrics_t_start', type = lambda v: None if v.lower()=='none' else float(v), 
+        default = None, help = 'Start of the time window of the metrics, if None it is set to T-1')
+    param.add_argument('--mesh_grading', type = lambda v: None if v.lower()=='none' else v, 
+        default = None, choices = [None, 'tanh', 'geometric'], 
+        help = 'If not None, mesh points are clustered at the head and tale')
+    param.add_argument('--mesh_beta', type = float, default = 2.0, 
+        help = 'Stretching parameter of the tanh mesh grading')
+    param.add_argument('--mesh_ratio', type = float, default = 1.02, 
+        help = 'Element size growth factor of the geometric mesh grading')
 
     # Pircard iteration
     param.add_argument('--pic_on', action = BooleanOptionalAction, default = False, 
@@ -115,13 +139,52 @@ def parameter_parser():
         help = 'Learning rate ')
     param.add_argument('--pic_tol', type = float, default = 1e-2, 
         help = 'Learning rate ')
+    
+    # Time step rejection
+    param.add_argument('--retry_budget', type = int, default = 0, 
+        help = 'Maximum number of rejected time steps per simulation, failed time steps are retried with reduced dt')
+    param.add_argument('--dt_max_halvings', type = int, default = 4, 
+        help = 'Maximum number of times the time step is halved for a single rejected step')
 
     # Solver parameter
     param.add_argument('--fdo', type = int, default = 2, 
         help = 'Order of finite backwards difference')
+    param.add_argument('--fe_degree', type = int, default = 1, 
+        help = 'Degree of the Lagrange finite elements')
+    param.add_argument('--planar', action = BooleanOptionalAction, default = False, 
+        help = 'If true, solve the reduced planar model for y, z and gamma')
+    param.add_argument('--lumped', action = BooleanOptionalAction, default = False, 
+        help = 'If true, assemble drag and torque coupling terms with vertex quadrature')
+    param.add_argument('--nodal_rotation', action = BooleanOptionalAction, default = False, 
+        help = 'If true, evaluate rotation matrices once per step at the mesh points')
+    param.add_argument('--split_form', action = BooleanOptionalAction, default = False, 
+        help = 'If true, assemble the step invariant part of the bilinear form only once')
+    param.add_argument('--solver_auto', action = BooleanOptionalAction, default = False, 
+        help = 'If true, the fastest linear solver is selected during the first time steps')
+    param.add_argument('--solver_cache', type = lambda v: None if v.lower()=='none' else v, 
+        default = None, help = 'Json file which caches linear solver choices across simulations')
+    param.add_argument('--quad_form', type = lambda v: None if v.lower()=='none' else int(v), 
+        default = None, help = 'Quadrature degree of the weak form, if None it is estimated by UFL')
+    param.add_argument('--quad_output', type = lambda v: None if v.lower()=='none' else int(v), 
+        default = None, help = 'Quadrature degree of projected outputs, if None it is estimated by UFL')
+    param.add_argument('--quad_functional', type = lambda v: None if v.lower()=='none' else int(v), 
+        default = None, help = 'Quadrature degree of assembled functionals, if None it is estimated by UFL')
+    param.add_argument('--profile', action = BooleanOptionalAction, default = False, 
+        help = 'If true, record per step timings of the solver hot-path')
                 
     return param    
 
+def solver_param(param):
+    
+    if not param.solver_auto:
+        return None
+    
+    solver = {}
+    solver['auto'] = True
+    solver['cache'] = param.solver_cache
+    
+    return solver
+
 def pic_param(param):
             
     picard = {} 
@@ -132,6 +195,52 @@ def pic_param(param):
     
     return picard
 
+def retry_param(param):
+    
+    retry = {}
+    retry['budget'] = param.retry_budget
+    retry['max_halvings'] = param.dt_max_halvings
+    
+    return retry
+
+def report_param(param):
+    
+    if param.report_phases is None:
+        return None
+    
+    return Stroboscopic(param.report_phases, param.report_period)
+
+def metrics_param(param):
+    
+    if not (param.metrics or param.metrics_only):
+        return None
+    
+    # By default, only the last undulation period is considered
+    t_start = param.T - 1.0 if param.metrics_t_start is None else param.metrics_t_start
+    
+    return default_metrics(t_start)
+
+def mesh_param(param):
+    
+    if param.mesh_grading is None:
+        return None
+    
+    mesh_grading = {}
+    mesh_grading['type'] = param.mesh_grading
+    mesh_grading['beta'] = param.mesh_beta
+    mesh_grading['ratio'] = param.mesh_ratio
+    
+    return mesh_grading
+
+def quad_param(param):
+    
+    quad_degree = {}
+    quad_degree['form'] = param.quad_form
+    quad_degree['output'] = param.quad_output
+    quad_degree['functional'] = param.quad_functional
+    
+    return quad_degree
+
 def radius_shape_function(
         plot = False):
     '''
@@ -527,6 +636,28 @@ def physical_to_dimless_parameters(param: Namespace):
         # parameters for which key_from_physical was set to True           
         elif getattr(param, f'{key}_from_physical'):
             setattr(param , key, getattr(TDL, key))                
+
+def dimless_parameters(param: dict) -> dict:
+    '''
+    Returns the parameters which determine the simulation, i.e. physical 
+    parameters are converted into dimensionless parameters and removed.
+    Physically different inputs with identical dimensionless parameters 
+    result in identical simulations.    
+    '''
+    param = Namespace(**param)
+    physical_to_dimless_parameters(param)
+    
+    dimless_param = {}
+    
+    for k, v in vars(param).items():
+        if k in PHYSICAL_PARAM_KEYS or k.endswith('from_physical'):
+            continue
+        if isinstance(v, pint.Quantity):
+            assert v.dimensionless, f'{k} must be dimensionless'
+            v = v.to('dimensionless').magnitude
+        dimless_param[k] = v
+            
+    return dimless_param
         
 class ModelParameter():
     '''
@@ -547,6 +678,9 @@ class ModelParameter():
         :param a_c: Shear correction factor
         :param a_T: Torsional shear correction factor
         :param phi: Cross-section radius shape function  
+        
+        Parameters can be given as fenics Constants if they are 
+        used as controls to compute derivatives, see Worm.gradient  
         '''
         # All quantities should be dimensionless
         for k in ModelParameter.attr_keys:
@@ -554,38 +688,56 @@ class ModelParameter():
             if isinstance(v, pint.Quantity):
                 assert v.dimensionless, 'quantity must be dimensionless'
                 v = v.magnitude
-            elif isinstance(v, float):
+            elif isinstance(v, (float, Constant)):
                 pass
             else:
                 assert False, f'{k}={v}'           
             setattr(self, k, v)
 
         self.phi = param.phi
+
+        # If any parameter is a control, material matrices 
+        # are ufl expressions of the controls
+        if any(isinstance(getattr(self, k), Constant) for k in ModelParameter.attr_keys):
+            diag = lambda v: as_matrix(np.diag(v).tolist())
+        else:
+            diag = np.diag
                 
         self.S = 1.0 / (self.a * self.g) * ( 
-            np.diag([self.a_c * self.p, self.a_c * self.p, 1])
+            diag([self.a_c * self.p, self.a_c * self.p, 1])
         )                     
         self.S_tilde = self.b / (self.a * self.g) * ( 
-            np.diag([self.a_c * self.q, self.a_c * self.q, 1])
+            diag([self.a_c * self.q, self.a_c * self.q, 1])
         )  
         self.B  = 1.0 / self.a * ( 
-            np.diag([1, 1, param.a_T * self.p])
+            diag([1, 1, self.a_T * self.p])
         )                          
         self.B_tilde = self.b / self.a * (
-            np.diag([1, 1, param.a_T * self.q])
+            diag([1, 1, self.a_T * self.q])
         )  
 
         return
+    
+    @staticmethod
+    def _to_constant(v):
+        '''
+        Converts parameter to fenics Constant unless it is 
+        already a ufl expression, e.g. a control
+        '''
+        if isinstance(v, Expr):
+            return v
+        
+        return Constant(v)
         
     def to_fenics(self):
                      
-        C = Constant(self.C)
-        D = Constant(self.D)
-        Y = Constant(self.Y)
-        S = Constant(self.S)
-        S_tilde = Constant(self.S_tilde)
-        B = Constant(self.B)
-        B_tilde = Constant(self.B_tilde)
+        C = ModelParameter._to_constant(self.C)
+        D = ModelParameter._to_constant(self.D)
+        Y = ModelParameter._to_constant(self.Y)
+        S = ModelParameter._to_constant(self.S)
+        S_tilde = ModelParameter._to_constant(self.S_tilde)
+        B = ModelParameter._to_constant(self.B)
+        B_tilde = ModelParameter._to_constant(self.B_tilde)
                 
         if self.phi is not None:
             if self.phi == 'c_elegans':            
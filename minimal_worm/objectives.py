@@ -0,0 +1,69 @@
+# Third-party imports
+from fenics import *
+
+try:
+    from fenics_adjoint import *
+except ModuleNotFoundError:
+    # This optional import is only needed if derivatives are being taken.
+    pass
+
+class Objective():
+    '''
+    Objective functionals for Worm.gradient. 
+    
+    Every objective is a callable which is evaluated after each time 
+    step and returns the contribution of the time step to the objective.
+    Objectives are stateful and should be created for every tape.
+    '''
+    
+    @staticmethod
+    def time_average(key: str, t_start: float = 0.0):
+        '''
+        Time average of a scalar output, e.g. mechanical muscle 
+        power 'W_dot' or curvature error 'k_norm', over [t_start, T]  
+        
+        :param key: scalar output in FRAME_KEYS
+        :param t_start: crop time points t < t_start
+        '''
+        
+        def objective(worm):
+            
+            if worm._t < t_start:
+                return 0.0
+            
+            T = worm.n * worm.dt 
+            
+            return getattr(worm, f'_{key}') * worm.dt / (T - t_start)
+        
+        return objective
+
+    @staticmethod
+    def mean_swimming_speed(t_start: float = 0.0):
+        '''
+        Average swimming speed, i.e. distance travelled by the 
+        centreline centre of mass in [t_start, T] divided by T - t_start
+
+        :param t_start: crop time points t < t_start
+        '''
+        
+        state = {}
+        
+        def objective(worm):
+            
+            if worm._t < t_start:
+                return 0.0
+
+            r_com = [assemble(worm._r[j] * worm.dx_functional) for j in range(3)]   
+            
+            if 'r_com_0' not in state:                
+                state['r_com_0'] = r_com
+                state['t_0'] = worm._t
+                        
+            if worm.i < worm.n - 1:                
+                return 0.0
+            
+            dr = [r - r_0 for r, r_0 in zip(r_com, state['r_com_0'])]            
+            
+            return (dr[0]**2 + dr[1]**2 + dr[2]**2)**0.5 / (worm._t - state['t_0'])
+        
+        return objective
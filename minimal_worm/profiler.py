@@ -0,0 +1,85 @@
+# Built-in imports
+from contextlib import contextmanager
+from typing import Dict
+import time
+
+# Third-party imports
+import numpy as np
+
+class StepProfiler():
+    '''
+    Records wall-clock times of the hot-path sections of Worm.solve,
+    e.g. control update, assembly, linear solve, frame assembly, etc.,
+    for every simulation time step.
+
+    If the profiler is switched off, all methods are no-ops.
+    '''
+
+    def __init__(self, on: bool = False):
+        '''
+        :param on: If true, timings are recorded
+        '''
+
+        self.on = on
+        # Recorded timings of previous steps
+        self.steps = []
+        # Timings of the current step
+        self._step = {}
+
+    @contextmanager
+    def __call__(self, key: str):
+        '''
+        Context manager which adds the time spent inside the
+        with block to the timing of the given key
+
+        :param key: section name
+        '''
+        if not self.on:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._step[key] = self._step.get(key, 0.0) + time.perf_counter() - start
+
+    def count(self, key: str, n: int = 1):
+        '''
+        Adds n to the counter of the given key, e.g. number of
+        Picard iterations
+        '''
+        if self.on:
+            self._step[key] = self._step.get(key, 0) + n
+
+    def end_step(self):
+        '''
+        Closes the current time step
+        '''
+        if self.on:
+            self.steps.append(self._step)
+            self._step = {}
+
+    def to_dict(self) -> Dict:
+        '''
+        Returns per step timings and their aggregates
+
+        :return profile (dict):
+            profile['step'][key]: array with timings/counts for every time step
+            profile['total'][key]: sum over all time steps
+            profile['mean'][key]: average over all time steps
+        '''
+        # Include unfinished step, e.g. if simulation failed
+        steps = self.steps + [self._step] if self._step else self.steps
+
+        keys = sorted({k for step in steps for k in step.keys()})
+
+        profile = {'step': {}, 'total': {}, 'mean': {}}
+
+        for k in keys:
+            v_arr = np.array([step.get(k, 0.0) for step in steps])
+            profile['step'][k] = v_arr
+            profile['total'][k] = v_arr.sum()
+            profile['mean'][k] = v_arr.mean()
+
+        return profile
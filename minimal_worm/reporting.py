@@ -0,0 +1,127 @@
+# Built-in imports
+from typing import List, Optional
+from abc import ABC, abstractmethod
+
+# Third-party imports
+import numpy as np
+
+# Local imports
+from minimal_worm.util import nodal_curvature
+
+class ReportPolicy(ABC):
+    '''
+    Decides at every reported time step which frame keys are assembled.
+
+    Policies are called by Worm.update_solution after the uniform reporting
+    conditions, i.e. dt_report and t_report_start, have been checked.
+    Frames with the full set of output keys make up the returned frame
+    sequence, frames with any other key set are returned as FS.reduced.
+    '''
+
+    def reset(self, worm):
+        '''
+        Resets the internal state at the start of a simulation
+        '''
+        pass
+
+    @abstractmethod
+    def __call__(self, worm) -> Optional[List[str]]:
+        '''
+        :param worm (minimal_worm.Worm): worm after the current step has been solved
+        :return FK: keys to be assembled, None if no frame is reported
+        '''
+        pass
+
+class Stroboscopic(ReportPolicy):
+    '''
+    Reports k frames at equally spaced phases per control period, i.e.
+    the first time step at or after t = j * period / k.
+    '''
+
+    def __init__(self, k: int, period: float = 1.0):
+        '''
+        :param k: number of phases per period
+        :param period: control period in units of the simulation time
+        '''
+        self.k = k
+        self.period = period
+
+    def reset(self, worm):
+
+        self.j = None
+
+    def __call__(self, worm):
+
+        # Allow for round-off errors in the accumulated time
+        j = int(np.floor((worm._t + 0.5 * worm.dt) * self.k / self.period))
+
+        if self.j is not None and j == self.j:
+            return None
+
+        self.j = j
+
+        return worm.FK
+
+class ZeroCrossing(ReportPolicy):
+    '''
+    Reports frames when the curvature changes sign at any of the selected
+    body points. The curvature k = A * theta' is evaluated from the nodal
+    Euler angles, i.e. no outputs need to be projected.
+    '''
+
+    def __init__(self, s_arr: List[float], component: int = 0):
+        '''
+        :param s_arr: body coordinates of the selected points
+        :param component: curvature component
+        '''
+        self.s_arr = np.array(s_arr)
+        self.component = component
+
+    def reset(self, worm):
+
+        self.idx_arr = np.abs(worm.s_arr[:, None] - self.s_arr[None, :]).argmin(axis = 0)
+        self.sign_arr = None
+
+    def curvature(self, worm) -> np.ndarray:
+        '''
+        Curvature component at the selected body points
+        '''
+        theta = worm._theta.compute_vertex_values().reshape(3, -1)
+
+        return nodal_curvature(theta, worm.s_arr)[self.component, self.idx_arr]
+
+    def __call__(self, worm):
+
+        sign_arr = np.sign(self.curvature(worm))
+
+        crossed = self.sign_arr is not None and np.any(sign_arr * self.sign_arr < 0)
+
+        self.sign_arr = sign_arr
+
+        return worm.FK if crossed else None
+
+class PeriodicFull(ReportPolicy):
+    '''
+    Reports full frames every m-th control period and reduced frames,
+    e.g. scalar energy rates, otherwise
+    '''
+
+    def __init__(self, m: int, FK_reduced: List[str], period: float = 1.0):
+        '''
+        :param m: full frames are reported during every m-th period
+        :param FK_reduced: keys reported in all other periods
+        :param period: control period in units of the simulation time
+        '''
+        self.m = m
+        self.FK_reduced = FK_reduced
+        self.period = period
+
+    def __call__(self, worm):
+
+        # Time of the current step is in (j * period, (j+1) * period]
+        j = int(np.ceil((worm._t - 0.5 * worm.dt) / self.period)) - 1
+
+        if j % self.m == 0:
+            return worm.FK
+
+        return self.FK_reduced
@@ -0,0 +1,437 @@
+# Built-in imports
+from typing import Dict, List, Optional, Callable
+from argparse import Namespace
+from copy import copy
+
+# Third-party imports
+import numpy as np
+import h5py
+import ufl
+from scipy.sparse import csr_matrix
+from fenics import *
+
+# Local imports
+from minimal_worm.worm import Worm
+from minimal_worm.util import v2f
+from minimal_worm.frame import FrameSequence
+from minimal_worm.model_parameters import ModelParameter, physical_to_dimless_parameters
+
+class POD():
+    '''
+    Proper orthogonal decomposition of centreline and Euler angle snapshots
+    and discrete empirical interpolation (DEIM)
+    '''
+
+    @staticmethod
+    def snapshots(r: np.ndarray, theta: np.ndarray, s: Optional[np.ndarray] = None):
+        '''
+        Stacks centreline coordinates relative to the centre of mass and
+        Euler angles into snapshot matrices
+
+        :param r (... x 3 x N): centreline coordinates
+        :param theta (... x 3 x N): Euler angles
+        :param s (N): body coordinates of the mesh points, uniform if None
+        :return X_r (3N x n_snapshots): centreline snapshots
+        :return X_theta (3N x n_snapshots): Euler angle snapshots
+        '''
+        N = r.shape[-1]
+
+        if s is None:
+            s = np.linspace(0, 1, N)
+
+        r = r.reshape(-1, 3, N)
+        theta = theta.reshape(-1, 3, N)
+
+        # Centre of mass
+        r_com = np.trapz(r, x = s, axis = -1)
+
+        X_r = (r - r_com[..., None]).reshape(len(r), -1).T
+        X_theta = theta.reshape(len(theta), -1).T
+
+        return X_r, X_theta
+
+    @staticmethod
+    def snapshots_from_h5(h5: h5py.File, t_step: int = 1):
+        '''
+        Snapshot matrices from pooled sweep file, see Saver.save_data. Only
+        simulations which succeeded are used.
+
+        :param h5: HDF5 file with datasets FS/r and FS/theta
+        :param t_step: use every t_step-th time point
+        '''
+        idx_arr = np.where(h5['exit_status'][:] == 0)[0]
+
+        r = h5['FS']['r'][idx_arr, ::t_step]
+        theta = h5['FS']['theta'][idx_arr, ::t_step]
+        s = h5['s'][:] if 's' in h5 else None
+
+        return POD.snapshots(r, theta, s)
+
+    @staticmethod
+    def basis(X: np.ndarray, tol: float = 1e-6, n_max: Optional[int] = None):
+        '''
+        POD modes which capture all but the fraction tol of the snapshot energy
+
+        :param X (n x n_snapshots): snapshot matrix
+        :param tol: relative energy which is discarded
+        :param n_max: maximum number of modes
+        :return U (n x k): POD modes
+        :return sigma: singular values
+        '''
+        U, sigma, _ = np.linalg.svd(X, full_matrices = False)
+
+        energy = np.cumsum(sigma**2) / max(np.sum(sigma**2), 1e-16)
+        k = min(int(np.searchsorted(energy, 1 - tol)) + 1, len(sigma))
+
+        if n_max is not None:
+            k = min(k, n_max)
+
+        return U[:, :k], sigma
+
+    @staticmethod
+    def projection_error(X: np.ndarray, U: np.ndarray):
+        '''
+        Relative error of the orthogonal projection of the snapshots onto
+        the span of the orthonormal modes U
+        '''
+        return np.linalg.norm(X - U @ (U.T @ X)) / np.linalg.norm(X)
+
+    @staticmethod
+    def deim(U: np.ndarray):
+        '''
+        Greedy selection of DEIM interpolation indices
+
+        :param U (n x k): orthonormal modes
+        :return idx_arr (k): interpolation indices
+        '''
+        idx_arr = [int(np.abs(U[:, 0]).argmax())]
+
+        for j in range(1, U.shape[1]):
+            c = np.linalg.solve(U[idx_arr, :j], U[idx_arr, j])
+            res = U[:, j] - U[:, :j] @ c
+            idx_arr.append(int(np.abs(res).argmax()))
+
+        return np.array(idx_arr)
+
+class ReducedWorm(Worm):
+    '''
+    POD-Galerkin reduced-order model of the worm.
+
+    The state u = (r, theta) is approximated in the span of the columns of
+    the reduced basis V, which is composed of rigid translations, POD modes
+    of the centreline relative to the centre of mass and POD modes of the
+    Euler angles. Every time step, the linear system A(u_h) u = b of the full
+    model is projected onto the reduced basis, i.e. V^T A V a = V^T b and u = V a.
+
+    During training, A and b are assembled in every time step and their
+    snapshots are recorded. The nonlinear dependence of A and b on the lagged
+    solution, e.g. through the rotation matrices Q and A, is then approximated
+    by (matrix) discrete empirical interpolation. Online, only the sampled
+    matrix and vector entries are assembled on the few elements which
+    contribute to them, and the reduced system is combined from precomputed
+    projections of the DEIM modes.
+    '''
+
+    def __init__(self,
+            N: int,
+            dt: float,
+            Phi_r: np.ndarray,
+            Phi_theta: np.ndarray,
+            **kwargs):
+        '''
+        :param N: Number of mesh points
+        :param dt: Time step
+        :param Phi_r (3N x k_r): POD modes of the centreline relative to the
+            centre of mass, see POD.snapshots
+        :param Phi_theta (3N x k_theta): POD modes of the Euler angles
+        :param kwargs: see Worm
+        '''
+        super().__init__(N, dt, **kwargs)
+
+        assert self.fe['degree'] == 1, 'Reduced-order model requires P1 elements'
+        assert not self.planar, 'Reduced-order model is only implemented for the full model'
+        assert not self.split_form, 'Reduced-order model does not support split forms'
+
+        # Keyword arguments of the full model used for validation
+        self.worm_kwargs = kwargs
+
+        self.V_rom = self._reduced_basis(Phi_r, Phi_theta)
+
+        # Operator snapshots are recorded during training
+        self.record = False
+        self.snapshot_step = 1
+        self.A_snapshots, self.b_snapshots = [], []
+        self.A_pattern = None
+
+        self.deim = None
+
+    def _reduced_basis(self, Phi_r: np.ndarray, Phi_theta: np.ndarray) -> np.ndarray:
+        '''
+        Maps POD modes from mesh point values to dofs of W and
+        orthonormalises them
+
+        :return V (n_dofs x k): reduced basis
+        '''
+        N = self.N
+
+        # Rigid translations
+        T = np.zeros((3, N, 3))
+        for i in range(3):
+            T[i, :, i] = 1.0
+
+        Phi_r = np.hstack([T.reshape(3 * N, 3), Phi_r])
+
+        fa = FunctionAssigner(self.W, [self.V3, self.V3])
+        zero = Function(self.V3)
+
+        cols = []
+
+        for j, Phi in enumerate([Phi_r, Phi_theta]):
+            for phi in Phi.T:
+                f = v2f(phi.reshape(3, N), fs = self.V3)
+                u = Function(self.W)
+                fa.assign(u, [f, zero] if j == 0 else [zero, f])
+                cols.append(u.vector().get_local())
+
+        # Drop linearly dependent modes, e.g. translations
+        # which are already contained in the POD modes
+        U, sigma, _ = np.linalg.svd(np.array(cols).T, full_matrices = False)
+
+        return U[:, sigma > 1e-10 * sigma[0]]
+
+    def initialise(self, *args, **kwargs):
+        '''
+        See Worm.initialise. If the DEIM approximation has been fitted, the
+        weak form is restricted to the elements which contribute to the
+        sampled matrix and vector entries.
+        '''
+        super().initialise(*args, **kwargs)
+
+        if self.deim is not None:
+            markers = MeshFunction('size_t', self.mesh, self.mesh.topology().dim(), 0)
+            markers.array()[self.deim['cells']] = 1
+
+            self.F_op_s = ReducedWorm._restrict(self.F_op, markers)
+            self.L_s = ReducedWorm._restrict(self.L, markers)
+
+        return
+
+    @staticmethod
+    def _restrict(form: ufl.Form, markers: MeshFunction) -> ufl.Form:
+        '''
+        Restricts all integrals of the given form to the marked cells
+        '''
+        return ufl.Form([itg.reconstruct(subdomain_id = 1, subdomain_data = markers)
+            for itg in form.integrals()])
+
+    @staticmethod
+    def _to_csr(A: Matrix) -> csr_matrix:
+
+        indptr, indices, data = as_backend_type(A).mat().getValuesCSR()
+
+        return csr_matrix((data, indices, indptr), shape = (A.size(0), A.size(1)))
+
+    def _solve_linear(self, u: Function):
+        '''
+        Solves the linear system projected onto the reduced basis
+        '''
+        V = self.V_rom
+
+        if self.deim is None:
+            with self.profiler('assemble'):
+                A = ReducedWorm._to_csr(assemble(self.F_op))
+                b = assemble(self.L).get_local()
+
+            if self.record and self.i % self.snapshot_step == 0:
+                self.A_pattern = (A.indptr, A.indices, A.shape)
+                self.A_snapshots.append(A.data.copy())
+                self.b_snapshots.append(b)
+
+            with self.profiler('project'):
+                A_r = V.T @ (A @ V)
+                b_r = V.T @ b
+        else:
+            with self.profiler('assemble'):
+                A_s = as_backend_type(assemble(self.F_op_s)).mat()
+                b_s = assemble(self.L_s).get_local()
+
+            with self.profiler('project'):
+                a = np.array([A_s.getValue(i, j)
+                    for i, j in zip(self.deim['rows'], self.deim['cols'])])
+                c = self.deim['M_A'] @ a
+                A_r = np.tensordot(c, self.deim['A_r'], axes = 1)
+                b_r = self.deim['G_b'] @ b_s[self.deim['P_b']]
+
+        with self.profiler('solve'):
+            u.vector().set_local(V @ np.linalg.solve(A_r, b_r))
+            u.vector().apply('insert')
+
+        return
+
+    def train(self,
+            T: float,
+            param_arr: List[Namespace],
+            create_CS: Callable,
+            snapshot_step: int = 1,
+            tol: float = 1e-8,
+            n_max: Optional[int] = None):
+        '''
+        Runs Galerkin simulations for the training parameters, records
+        snapshots of A and b and fits the DEIM approximation
+
+        :param T: simulation time
+        :param param_arr: training parameters
+        :param create_CS: returns control sequence for given parameter,
+            e.g. UndulationExperiment.stw_control_sequence
+        :param snapshot_step: record operators every snapshot_step-th time step
+        :param tol: relative energy of the operator snapshots which is discarded
+        :param n_max: maximum number of DEIM modes
+        '''
+        self.deim = None
+        self.A_snapshots, self.b_snapshots = [], []
+        self.snapshot_step = snapshot_step
+
+        self.record = True
+
+        for param in param_arr:
+            param = copy(param)
+            physical_to_dimless_parameters(param)
+
+            _, _, e, _ = self.solve(T, ModelParameter(param), create_CS(param), FK = [])
+            assert e is None, f'Training simulation failed: {e}'
+
+        self.record = False
+
+        self.fit_deim(tol, n_max)
+
+        return
+
+    def fit_deim(self, tol: float = 1e-8, n_max: Optional[int] = None):
+        '''
+        Fits DEIM approximation of A and b to the recorded snapshots
+        '''
+        assert len(self.A_snapshots) > 0, 'No operator snapshots have been recorded'
+
+        V = self.V_rom
+        indptr, indices, shape = self.A_pattern
+
+        U_A, _ = POD.basis(np.array(self.A_snapshots).T, tol, n_max)
+        U_b, _ = POD.basis(np.array(self.b_snapshots).T, tol, n_max)
+
+        P_A = POD.deim(U_A)
+        P_b = POD.deim(U_b)
+
+        deim = {}
+        # Rows and columns of the sampled matrix entries
+        deim['rows'] = np.repeat(np.arange(shape[0]), np.diff(indptr))[P_A].tolist()
+        deim['cols'] = indices[P_A].tolist()
+        deim['M_A'] = np.linalg.inv(U_A[P_A, :])
+        # Projected DEIM modes of A
+        deim['A_r'] = np.array([V.T @ (csr_matrix((U_A[:, j], indices, indptr),
+            shape = shape) @ V) for j in range(U_A.shape[1])])
+
+        deim['P_b'] = P_b
+        deim['G_b'] = V.T @ U_b @ np.linalg.inv(U_b[P_b, :])
+
+        # Elements which contribute to the sampled entries
+        dofmap = self.W.dofmap()
+        cell_dofs = [set(dofmap.cell_dofs(c)) for c in range(self.mesh.num_cells())]
+
+        cells = set()
+        for i, j in zip(deim['rows'], deim['cols']):
+            cells.update(c for c, d in enumerate(cell_dofs) if i in d and j in d)
+        for i in P_b:
+            cells.update(c for c, d in enumerate(cell_dofs) if i in d)
+
+        deim['cells'] = np.array(sorted(cells))
+
+        self.deim = deim
+
+        # Snapshots are no longer needed
+        self.A_snapshots, self.b_snapshots = [], []
+
+        self._print(f'DEIM: {len(P_A)} matrix and {len(P_b)} vector entries on '
+            f'{len(cells)}/{self.mesh.num_cells()} elements')
+
+        return
+
+    @staticmethod
+    def error(FS: FrameSequence, FS_rom: FrameSequence) -> Dict:
+        '''
+        Relative errors of the reduced-order model with respect to the
+        full simulation
+
+        :param FS: frame sequence of the full simulation
+        :param FS_rom: frame sequence of the reduced-order model
+        '''
+        err = {}
+
+        for k in ['r', 'theta']:
+            v, v_rom = getattr(FS, k), getattr(FS_rom, k)
+            err[k] = np.linalg.norm(v_rom - v) / np.linalg.norm(v)
+
+        return err
+
+    def validate(self,
+            T: float,
+            param_arr: List[Namespace],
+            create_CS: Callable,
+            FK: Optional[List[str]] = None) -> List[Dict]:
+        '''
+        Compares the reduced-order model to held-out full simulations
+
+        :param T: simulation time
+        :param param_arr: held-out parameters
+        :param create_CS: returns control sequence for given parameter
+        :param FK: output keys, must include r and theta
+        :return err_arr: relative errors and speed-up for every parameter
+        '''
+        if FK is None:
+            FK = ['t', 'r', 'theta']
+
+        worm = Worm(self.N, self.dt, **self.worm_kwargs)
+
+        err_arr = []
+
+        for param in param_arr:
+            param = copy(param)
+            physical_to_dimless_parameters(param)
+            MP = ModelParameter(param)
+
+            FS, _, e, sim_t = worm.solve(T, MP, create_CS(param), FK = FK)
+            assert e is None, f'Full simulation failed: {e}'
+
+            FS_rom, _, e, sim_t_rom = self.solve(T, MP, create_CS(param), FK = FK)
+            assert e is None, f'Reduced-order simulation failed: {e}'
+
+            err = ReducedWorm.error(FS, FS_rom)
+            # Best approximation error of the reduced basis
+            X_r, X_theta = POD.snapshots(FS.r, FS.theta, FS.s)
+            Phi_r, Phi_theta = self._vertex_basis()
+            err['r_proj'] = POD.projection_error(X_r, Phi_r)
+            err['theta_proj'] = POD.projection_error(X_theta, Phi_theta)
+            err['speed_up'] = sim_t / sim_t_rom
+
+            err_arr.append(err)
+
+        return err_arr
+
+    def _vertex_basis(self):
+        '''
+        Orthonormal centreline and Euler angle modes at the mesh points
+        spanned by the reduced basis
+        '''
+        u = Function(self.W)
+        Phi_r, Phi_theta = [], []
+
+        for v in self.V_rom.T:
+            u.vector().set_local(v)
+            u.vector().apply('insert')
+            r, theta = u.split(deepcopy = True)
+            Phi_r.append(r.compute_vertex_values().reshape(3, self.N).flatten())
+            Phi_theta.append(theta.compute_vertex_values().reshape(3, self.N).flatten())
+
+        Phi_r, Phi_theta = [POD.basis(np.array(Phi).T, 1e-12)[0]
+            for Phi in [Phi_r, Phi_theta]]
+
+        return Phi_r, Phi_theta
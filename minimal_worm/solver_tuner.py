@@ -0,0 +1,244 @@
+# Built-in imports
+from typing import Dict, Optional
+from pathlib import Path
+import json
+import os
+import time
+
+# Third-party imports
+import numpy as np
+from fenics import *
+
+# Relative tolerance of Krylov solvers
+KRYLOV_RTOL = 1e-6
+
+def linear_solve(A: Matrix, x: GenericVector, b: GenericVector, solver: Dict,
+        x0: Optional[GenericVector] = None):
+    '''
+    Solves linear system A*x = b with the given linear solver
+
+    :param A: system matrix
+    :param x: solution vector
+    :param b: right-hand side
+    :param solver: dictionary with keys 'linear_solver', 'preconditioner' 
+        and optionally 'rtol'. The linear solver can be any dolfin LU or 
+        Krylov method or 'banded'. Krylov methods stop at the relative 
+        tolerance rtol, defaults to KRYLOV_RTOL.
+    :param x0: Initial guess for Krylov methods
+    '''
+    method = solver.get('linear_solver', 'default')
+    pc = solver.get('preconditioner', 'default')
+
+    if method == 'banded':
+        _solve_banded(A, x, b)
+    elif not has_lu_solver_method(method) and has_krylov_solver_method(method):
+        krylov_solver = KrylovSolver(method, pc)
+        krylov_solver.parameters['relative_tolerance'] = solver.get('rtol', KRYLOV_RTOL)
+        if x0 is not None:
+            x.set_local(x0.get_local())
+            x.apply('insert')
+            krylov_solver.parameters['nonzero_initial_guess'] = True
+        krylov_solver.solve(A, x, b)
+    else:
+        solve(A, x, b, method, pc)
+
+    return
+
+def _solve_banded(A: Matrix, x: GenericVector, b: GenericVector):
+    '''
+    Solves linear system with scipy's banded LU solver. For the 1d
+    mesh, the bandwidth of the system matrix is small if dofs are
+    reordered, which is dolfin's default in serial.
+    '''
+    from scipy.linalg import solve_banded
+    from scipy.sparse import csr_matrix
+
+    indptr, indices, data = as_backend_type(A).mat().getValuesCSR()
+    M = csr_matrix((data, indices, indptr)).tocoo()
+
+    # Number of lower and upper diagonals
+    l = max(int((M.row - M.col).max()), 0)
+    u = max(int((M.col - M.row).max()), 0)
+
+    ab = np.zeros((l + u + 1, M.shape[1]))
+    ab[u + M.row - M.col, M.col] = M.data
+
+    x.set_local(solve_banded((l, u), ab, b.get_local()))
+    x.apply('insert')
+
+    return
+
+class SolverTuner():
+    '''
+    Selects the fastest linear solver which meets a residual tolerance.
+
+    During the first n_steps solves, every available candidate solves the
+    same linear system and its wall time is recorded. Afterwards, the fastest
+    candidate is chosen and cached per problem signature, e.g.
+    N, finite element and order of the finite backwards difference, so that
+    later runs of a sweep can skip the tuning.
+
+    Krylov candidates are tuned and later run at the same relative 
+    tolerance rtol, i.e. they are accepted if their residual meets it.
+    '''
+
+    candidates = [
+        {'linear_solver': 'umfpack', 'preconditioner': 'default'},
+        {'linear_solver': 'mumps', 'preconditioner': 'default'},
+        {'linear_solver': 'superlu', 'preconditioner': 'default'},
+        {'linear_solver': 'gmres', 'preconditioner': 'ilu'},
+        {'linear_solver': 'banded', 'preconditioner': 'default'},
+    ]
+
+    # Choices of the current process
+    cache = {}
+
+    def __init__(self,
+            signature: str,
+            cache_path: Optional[Path] = None,
+            n_steps: int = 3,
+            rtol: float = KRYLOV_RTOL):
+        '''
+        :param signature: problem signature used as cache key
+        :param cache_path: json file which caches choices across processes
+        :param n_steps: number of solves used for tuning
+        :param rtol: relative residual tolerance
+        '''
+
+        self.signature = signature
+        self.cache_path = None if cache_path is None else Path(cache_path)
+        self.n_steps = n_steps
+        self.rtol = rtol
+
+        self.choice = SolverTuner._load(self.signature, self.cache_path)
+
+        self.candidates = [{**c, 'rtol': rtol} for c in SolverTuner.candidates
+            if SolverTuner.is_available(c)]
+
+        # Accumulated wall times and maximum residuals per candidate
+        self.times = np.zeros(len(self.candidates))
+        self.residuals = np.zeros(len(self.candidates))
+        self.i = 0
+
+    @property
+    def done(self):
+
+        return self.choice is not None
+
+    @staticmethod
+    def is_available(solver: Dict):
+        '''
+        Checks if linear solver is available in the current build
+        '''
+        method = solver['linear_solver']
+
+        if method == 'banded':
+            return has_petsc4py()
+        if has_lu_solver_method(method):
+            return True
+
+        return (has_krylov_solver_method(method)
+            and has_krylov_solver_preconditioner(solver['preconditioner']))
+
+    @staticmethod
+    def residual(A: Matrix, x: GenericVector, b: GenericVector):
+        '''
+        Relative residual |A*x - b| / |b|
+        '''
+        r = b.copy()
+        A.mult(x, r)
+        r.axpy(-1.0, b)
+
+        return r.norm('l2') / max(b.norm('l2'), 1e-16)
+
+    def solve(self, A: Matrix, x: GenericVector, b: GenericVector,
+            x0: Optional[GenericVector] = None):
+        '''
+        Solves linear system with every candidate and records wall times.
+        The solution of the most accurate candidate is assigned to x.
+        '''
+
+        best_res = np.inf
+
+        for j, solver in enumerate(self.candidates):
+
+            x_j = x.copy()
+
+            start = time.perf_counter()
+            try:
+                linear_solve(A, x_j, b, solver, x0)
+                res = SolverTuner.residual(A, x_j, b)
+            except Exception:
+                res = np.inf
+
+            self.times[j] += time.perf_counter() - start
+            self.residuals[j] = max(self.residuals[j], res)
+
+            if res < best_res:
+                best_res = res
+                x.set_local(x_j.get_local())
+                x.apply('insert')
+
+        self.i += 1
+
+        if self.i == self.n_steps:
+            self._choose()
+
+        return
+
+    def _choose(self):
+        '''
+        Chooses fastest candidate which meets the tolerance
+        '''
+
+        idx_arr = np.where(self.residuals < self.rtol)[0]
+
+        if len(idx_arr) == 0:
+            # Fall back to most accurate candidate
+            idx = self.residuals.argmin()
+        else:
+            idx = idx_arr[self.times[idx_arr].argmin()]
+
+        self.choice = self.candidates[idx]
+
+        SolverTuner._save(self.signature, self.choice, self.cache_path)
+
+        return
+
+    @staticmethod
+    def _load(signature: str, cache_path: Optional[Path]):
+
+        if signature in SolverTuner.cache:
+            return SolverTuner.cache[signature]
+
+        if cache_path is None or not cache_path.exists():
+            return None
+
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+
+        return cache.get(signature)
+
+    @staticmethod
+    def _save(signature: str, choice: Dict, cache_path: Optional[Path]):
+
+        SolverTuner.cache[signature] = choice
+
+        if cache_path is None:
+            return
+
+        cache = {}
+        if cache_path.exists():
+            with open(cache_path, 'r') as f:
+                cache = json.load(f)
+
+        cache[signature] = choice
+
+        # Write to temporary file first, parallel workers might
+        # access the cache at the same time
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent = 4)
+        os.replace(tmp_path, cache_path)
+
+        return
@@ -1,11 +1,112 @@
 # Built-in imports
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from ufl.tensors import ListTensor
 
 # Third-party imports
 import numpy as np
 from fenics import *
 
+def graded_mesh_nodes(
+    N: int, 
+    grading: Union[Dict, np.ndarray, None] = None
+) -> np.ndarray:
+    """
+    Returns the body coordinates of N mesh points in [0, 1]. 
+    
+    If grading is None, mesh points are uniformly spaced. Mesh points 
+    can be clustered at the head and tale by setting grading to
+    
+    - {'type': 'tanh', 'beta': beta}: tanh stretching, the larger beta, the 
+      finer the mesh at the ends 
+    - {'type': 'geometric', 'ratio': q}: element sizes grow by factor q 
+      from both ends towards the body centre
+    
+    or to a user-supplied array of N monotonically increasing mesh points.
+    """
+    
+    if grading is None:
+        return np.linspace(0, 1, N)
+
+    if isinstance(grading, np.ndarray):
+        s_arr = grading.astype(float)
+        assert s_arr.shape == (N,), f'Expected {N} mesh points, got {s_arr.shape}'
+    elif grading['type'] == 'tanh':
+        beta = grading['beta']
+        assert beta > 0, 'tanh grading parameter beta must be positive'
+        xi_arr = np.linspace(-1, 1, N)
+        s_arr = 0.5 * (1 + np.tanh(beta * xi_arr) / np.tanh(beta))
+    elif grading['type'] == 'geometric':
+        q = grading['ratio']
+        assert q > 0, 'geometric grading ratio must be positive'
+        i_arr = np.arange(N-1)
+        h_arr = q**np.minimum(i_arr, N - 2 - i_arr)
+        s_arr = np.concatenate(([0], np.cumsum(h_arr))) / h_arr.sum()
+    else:
+        assert False, f"Unknown mesh grading {grading['type']}"
+    
+    # Ensure that the end points are exact
+    s_arr[0], s_arr[-1] = 0.0, 1.0
+    
+    assert np.all(np.diff(s_arr) > 0), 'Mesh points must be strictly increasing'
+    
+    return s_arr
+
+def euler_rotation_arrays(theta: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Evaluates rotation matrix Q, matrix A and the partial derivatives of A 
+    with respect to the Euler angles alpha and beta at given nodes, see 
+    Worm.Q, Worm.A and Worm.A_t. 
+    
+    :param theta (3 x N): Euler angles
+    :return rot (dict): arrays of shape (N x 3 x 3) 
+    """
+    alpha, beta, gamma = theta
+    
+    ca, sa = np.cos(alpha), np.sin(alpha)
+    cb, sb = np.cos(beta), np.sin(beta)
+    cg, sg = np.cos(gamma), np.sin(gamma)
+    
+    zero, one = np.zeros_like(alpha), np.ones_like(alpha)
+    
+    def stack(M):
+        return np.stack([np.stack(row, axis = -1) for row in M], axis = -2)  
+    
+    R_x = stack([[one, zero, zero], [zero, cg, -sg], [zero, sg, cg]])
+    R_y = stack([[cb, zero, sb], [zero, one, zero], [-sb, zero, cb]])
+    R_z = stack([[ca, -sa, zero], [sa, ca, zero], [zero, zero, one]])
+    
+    rot = {}
+    rot['Q'] = R_z @ R_y @ R_x
+    rot['A'] = stack([
+        [zero, sa, -ca * cb],
+        [zero, -ca, -sa * cb],
+        [-one, zero, sb]])
+    # Coefficients of alpha_t and beta_t in A_t
+    rot['A_alpha'] = stack([
+        [zero, ca, sa * cb],
+        [zero, sa, -ca * cb],
+        [zero, zero, zero]])
+    rot['A_beta'] = stack([
+        [zero, zero, -ca * sb],
+        [zero, zero, sa * sb],
+        [zero, zero, cb]])
+        
+    return rot
+
+def nodal_curvature(theta: np.ndarray, s_arr: np.ndarray) -> np.ndarray:
+    """
+    Generalized curvature vector k = A * theta' evaluated from nodal Euler 
+    angles, the derivative is approximated by finite differences 
+    
+    :param theta (3 x N): Euler angles at the mesh points
+    :param s_arr (N): body coordinates of the mesh points
+    :return k (3 x N): curvature vector 
+    """
+    theta_s = np.gradient(theta, s_arr, axis = 1)
+    A = euler_rotation_arrays(theta)['A']
+    
+    return np.einsum('nij,jn->in', A, theta_s)
+
 def f2n(
     var: Union[Function, List[Function], ListTensor], 
     W: Optional[FunctionSpace] = None,
@@ -6,8 +6,10 @@ Created on 12 May 2022
 
 
 #Built-in imports
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Optional, Tuple, List, Callable
 from types import SimpleNamespace
+from argparse import Namespace
+from copy import copy
 import time
 
 
@@ -16,10 +18,14 @@ import numpy as np
 from fenics import *
 
 # Local imports
-from minimal_worm.util import v2f, f2n
+from minimal_worm.util import v2f, f2n, graded_mesh_nodes, euler_rotation_arrays
 from minimal_worm.frame import FRAME_KEYS, Frame, FrameSequence
+from minimal_worm.profiler import StepProfiler
+from minimal_worm.reporting import ReportPolicy
+from minimal_worm.metrics import Metric
+from minimal_worm.solver_tuner import SolverTuner, linear_solve
 
-from minimal_worm.model_parameters import ModelParameter
+from minimal_worm.model_parameters import ModelParameter, physical_to_dimless_parameters
 
 try:
     from fenics_adjoint import *
@@ -27,6 +33,12 @@ except ModuleNotFoundError:
     # This optional import is only needed if derivatives are being taken.
     pass
 
+try:
+    from checkpoint_schedules import Revolve
+except ModuleNotFoundError:
+    # This optional import is only needed if derivatives are being taken.
+    pass
+
 # Set Fenics LogLevel to Error to
 # avoid logging to mess with progressbar
 from dolfin import set_log_level, LogLevel
@@ -61,32 +73,102 @@ class Worm:
             dt: float,             
             fe = {'type': 'Lagrange', 'degree': 1},            
             fdo = 2,
-            quiet= False):
+            quiet= False,
+            mesh_grading = None,
+            planar = False,
+            lumped = False,
+            quad_degree = None,
+            nodal_rotation = False,
+            split_form = False):
         '''
         
-        :param N *():
+        :param N *(): Number of mesh points
         :param dt:
-        :param fe:
+        :param fe: Finite element type and degree. For degree > 1, outputs are 
+            interpolated to the report points, see Worm.initialise
         :param fdo:
         :param quiet:
+        :param mesh_grading: If None, mesh is uniform. Otherwise, mesh points are
+            clustered at the head and tale, see util.graded_mesh_nodes        
+        :param planar: If true, the centreline is confined to the yz-plane and 
+            only y, z and the Euler angle gamma are solved for
+        :param lumped: If true, fluid drag and torque coupling terms are 
+            assembled with vertex quadrature dxL
+        :param quad_degree: Quadrature degree for the weak form 'form', projected 
+            outputs 'output' and assembled functionals 'functional'. If None, 
+            the degree is estimated by UFL.
+        :param nodal_rotation: If true, the lagged rotation matrices Q and A are 
+            evaluated once per step at the mesh points and interpolated 
+            by tensor-valued P1 functions 
+        :param split_form: If true, the part of the bilinear form which does not 
+            depend on the lagged solution is assembled only once per simulation. 
+            In the full model, only the isotropic part of the fluid drag is 
+            step-invariant, the S_tilde and B_tilde terms are rotated by the 
+            lagged Q and A.         
         '''
         
         self.N = N
         self.dt = dt
+        # Time step used in the weak form, which is reduced  
+        # temporarily if a time step is rejected
+        self.dt_c = Constant(dt)
         self.fdo = fdo
 
         self.fe = fe
         
         self.quiet = quiet
+        
+        self.planar = planar
+        
+        self.lumped = lumped
+        
+        assert not (planar and nodal_rotation), ('Nodal rotation matrices are '
+            'only implemented for the full model')
+        self.nodal_rotation = nodal_rotation
+        
+        self.split_form = split_form
+        
+        # Body coordinates of the mesh points
+        self.s_arr = graded_mesh_nodes(N, mesh_grading)
 
         self._init_function_space()
+        self._init_quadrature(quad_degree)
         
+    def _init_quadrature(self, quad_degree: Optional[Dict] = None):
+        '''
+        Initialises integration measures and form compiler parameters 
+        for the given quadrature degree policy
+        '''
+        
+        self.quad_degree = {'form': None, 'output': None, 'functional': None}
+        
+        if quad_degree is not None:
+            assert all(k in self.quad_degree for k in quad_degree), ( 
+                f'quad_degree keys must be in {list(self.quad_degree.keys())}')
+            self.quad_degree.update(quad_degree)
+
+        # Measures for the weak form and assembled functionals
+        self.dx_form, self.dx_functional = [
+            dx if d is None else dx(metadata = {'quadrature_degree': d}) 
+            for d in [self.quad_degree['form'], self.quad_degree['functional']]
+        ]
+        
+        # Form compiler parameters for projected outputs
+        d = self.quad_degree['output']
+        self.fcp_output = None if d is None else {'quadrature_degree': d}
+        
+        return
+    
     def _init_function_space(self):
         '''
         Initialise finite element function spaces
         '''
         # mesh
         self.mesh = UnitIntervalMesh(self.N - 1)
+        # Vertices of the unit interval mesh are ordered 
+        # by their coordinate, i.e. we can move them to 
+        # the (possibly non-uniform) mesh points
+        self.mesh.coordinates()[:, 0] = self.s_arr
 
         # Finite elements for 1 dimensional spatial coordinate s        
         P1 = FiniteElement(self.fe['type'], self.mesh.ufl_cell(), self.fe['degree'])
@@ -102,6 +184,26 @@ class Worm:
         # Trial function space for 6 component vector-valued function composed of r and theta
         self.W = FunctionSpace(self.mesh, MixedElement(P1_3, P1_3))
         
+        if self.planar:
+            # Trial function space of the planar model composed of y, z and gamma 
+            self.W_planar = FunctionSpace(self.mesh, P1_3)
+            # Assign planar to full state and vice versa
+            self.fa_V3 = FunctionAssigner(self.V3, [self.V, self.V, self.V])
+            self.fa_W = FunctionAssigner(self.W, [self.V3, self.V3])
+            self.fa_W_planar = FunctionAssigner(self.W_planar, [self.V, self.V, self.V])
+            self.zero = Function(self.V)
+        
+        if self.fe['degree'] > 1:
+            # Vertex values given as numpy arrays are interpolated from 
+            # piecewise linear functions
+            P1_3_vertex = MixedElement([FiniteElement('Lagrange', self.mesh.ufl_cell(), 1)] * 3)
+            self.V3_vertex = FunctionSpace(self.mesh, P1_3_vertex)
+        
+        if self.nodal_rotation:
+            assert self.fe['degree'] == 1, 'Nodal rotation matrices require P1 elements'
+            # Function space for 3x3 matrix-valued functions of s
+            self.T33 = TensorFunctionSpace(self.mesh, self.fe['type'], 1, shape = (3, 3))
+            self.v2d_T33 = vertex_to_dof_map(self.T33)
         
         # Define function space for outputs
         self.output_func_spaces = {            
@@ -143,12 +245,26 @@ class Worm:
 
         # If Numpy frame is given, assign array values to fenics functions
         else:
-            v2f(F0.r, r0, self.V3)
-            v2f(F0.theta, theta0, self.V3)
+            self._vertex_values_to_function(F0.r, r0)
+            self._vertex_values_to_function(F0.theta, theta0)
 
         self._init_state_history(r0, theta0)
 
         return
+
+    def _vertex_values_to_function(self, v_arr: np.ndarray, v: Function):
+        '''
+        Assigns values at the mesh points to function v
+        
+        :param v_arr (3 x N): values at mesh points
+        :param v: function in V3
+        '''
+        if self.fe['degree'] == 1:
+            v2f(v_arr, v)
+        else:
+            v.interpolate(v2f(v_arr, fs = self.V3_vertex))
+
+        return
   
     def _init_state_history(self, r0, theta0):
         '''
@@ -224,7 +340,7 @@ class Worm:
             else:
                 z_t += c * z_old_arr[s]
 
-        z_t = z_t / self.dt**n
+        z_t = z_t / self.dt_c**n
 
         return z_t
 
@@ -247,6 +363,9 @@ class Worm:
         return r_t, theta_t
 
     def _init_form(self):
+        
+        if self.planar:
+            return self._init_planar_form()
                     
         u = TrialFunction(self.W)
         phi = TestFunction(self.W)
@@ -260,9 +379,18 @@ class Worm:
         
         r_t, theta_t = self._init_first_time_derivatives(r, theta)
         
-        A_h = Worm.A(theta_h)
-        A_h_t = Worm.A_t(theta_h, theta_t) #alpha_t, beta_t)
-        Q_h = Worm.Q(theta_h)
+        if self.nodal_rotation:
+            # Nodal rotation matrices are updated at every step, 
+            # see _update_nodal_rotation
+            self.rot_h = {k: Function(self.T33) for k in ['Q', 'A', 'A_alpha', 'A_beta']}            
+            A_h = self.rot_h['A']
+            A_h_t = Worm.A_t_nodal(self.rot_h, theta_t)
+            Q_h = self.rot_h['Q']
+        else:
+            A_h = Worm.A(theta_h)
+            A_h_t = Worm.A_t(theta_h, theta_t) #alpha_t, beta_t)
+            Q_h = Worm.Q(theta_h)
+        
         T_h = Worm.T(r_h)
             
         # length-element
@@ -288,22 +416,224 @@ class Worm:
                 
         # external fluid drag torque
         l_F = self.l_F(Q_h, w)
-        # external fluid drag force
-        f_F = self.f_F(Q_h, r_t)
+        # Measure for the drag and torque coupling terms
+        dx_l = dxL if self.lumped else self.dx_form
+
+        if self.split_form:
+            # Isotropic part of the fluid drag force does not 
+            # depend on the lagged solution 
+            d3_h = Q_h.T * e3
+            f_F = -(1 - self.C) * outer(d3_h, d3_h) * r_t
+            equation_0 = - self.C * dot(r_t, phi_r) * dx_l  
+        else:        
+            # external fluid drag force
+            f_F = self.f_F(Q_h, r_t)
+            equation_0 = None
+                
         # linear balance
-        eq1 = dot(f_F, phi_r) * dx - dot(N, grad(phi_r)) * dx
+        eq1 = dot(f_F, phi_r) * dx_l - dot(N, grad(phi_r)) * self.dx_form
         # angular balance
         eq2 = (
-            dot(l_F, phi_theta) * dx
-            + dot(T_h * N, phi_theta) * dx
-            - dot(M, grad(phi_theta)) * dx
+            dot(l_F, phi_theta) * dx_l
+            + dot(T_h * N, phi_theta) * dx_l
+            - dot(M, grad(phi_theta)) * self.dx_form
         )
                 
         equation = eq1 + eq2
                 
-        self.F_op, self.L = lhs(equation), rhs(equation)
+        self._init_operators(equation, equation_0)
                                 
         return
+    
+    def _init_operators(self, equation: Form, equation_0: Optional[Form] = None):
+        '''
+        Initialises bilinear form F_op and linear form L. If equation_0 is 
+        given, its bilinear form F_op_0 does not depend on the lagged solution 
+        and is assembled only once, see _solve_linear.  
+        
+        :param equation: weak form which depends on the lagged solution
+        :param equation_0: weak form which does not depend on the lagged solution
+        '''
+        
+        if equation_0 is None:
+            self.F_op, self.L = lhs(equation), rhs(equation)
+            self.F_op_0 = None
+        else:
+            self.F_op, self.F_op_0 = lhs(equation), lhs(equation_0)
+            self.L = rhs(equation + equation_0)
+        
+        return
+
+    def _init_planar_form(self):
+        '''
+        Weak form of the planar model. The centreline is confined to the yz-plane 
+        and the body frame rotates around the plane normal d1 = e1. For Euler 
+        angles alpha = beta = 0, the equations of motion reduce to the linear 
+        balance in y and z and the angular balance around e1.          
+        '''
+        
+        u = TrialFunction(self.W_planar)
+        phi = TestFunction(self.W_planar)
+        
+        y, z, gamma = split(u)
+        phi_y, phi_z, phi_gamma = split(phi)
+        
+        r = as_vector((y, z))
+        phi_r = as_vector((phi_y, phi_z))
+        
+        self.u_h = Function(self.W_planar)
+        
+        y_h, z_h, gamma_h = split(self.u_h)
+        r_h = as_vector((y_h, z_h))
+        
+        # Planar components of the full state history
+        r_old_arr = [as_vector((split(u)[0][1], split(u)[0][2])) for u in self.u_old_arr]
+        gamma_old_arr = [split(u)[1][2] for u in self.u_old_arr]
+        
+        r_t = self._finite_backwards_difference(1, self.fdo, r, r_old_arr)
+        gamma_t = self._finite_backwards_difference(1, self.fdo, gamma, gamma_old_arr)
+        
+        Q_h = Worm.Q_planar(gamma_h)
+        
+        # Body frame vector d3 and in-plane normal in the yz-plane 
+        e3_p = as_vector((0, 1))        
+        J = as_matrix([[0, -1], [1, 0]])
+        
+        # Angular velocity and curvature have only a d1 component 
+        w = - gamma_t
+        k = - grad(gamma)
+        k_t = - grad(gamma_t)
+        
+        # Shear/stretch vector and its time derivative in the body frame 
+        sig = Q_h * grad(r) - e3_p
+        sig_t = Q_h * grad(r_t) - w * J * Q_h * grad(r_h)
+
+        # Material parameter and preferred strains in the yz-plane
+        S = as_matrix([[self.S[1, 1], self.S[1, 2]], [self.S[2, 1], self.S[2, 2]]])
+        S_tilde = as_matrix([[self.S_tilde[1, 1], self.S_tilde[1, 2]], 
+            [self.S_tilde[2, 1], self.S_tilde[2, 2]]])
+        sig0 = as_vector((self.sig0[1], self.sig0[2]))
+                                                        
+        # internal force
+        N = Q_h.T * (S * (sig - sig0) + S_tilde * sig_t)
+        # internal torque
+        M = self.B[0, 0] * (k - self.k0[0]) + self.B_tilde[0, 0] * k_t
+        
+        # external fluid drag force
+        d3 = Q_h.T * e3_p
+        d3d3 = outer(d3, d3)        
+        # external fluid drag torque
+        l_F = - self.D * self.Y * w
+        # Tangent cross internal force
+        T_h_N = grad(y_h) * N[1] - grad(z_h) * N[0] 
+
+        # Measure for the drag and torque coupling terms
+        dx_l = dxL if self.lumped else self.dx_form
+        
+        # Isotropic fluid drag force, fluid drag torque and internal 
+        # torque do not depend on the lagged solution  
+        f_F_0 = - self.C * r_t
+        f_F = -(1 - self.C) * d3d3 * r_t
+                
+        equation_0 = (
+            dot(f_F_0, phi_r) * dx_l
+            + l_F * phi_gamma * dx_l
+            - M * grad(phi_gamma) * self.dx_form
+        )
+        equation = (
+            dot(f_F, phi_r) * dx_l 
+            - dot(N, grad(phi_r)) * self.dx_form
+            + T_h_N * phi_gamma * dx_l
+        )
+        
+        if not self.split_form:
+            equation, equation_0 = equation + equation_0, None
+        
+        self._init_operators(equation, equation_0)
+        
+        return
+
+    def _planar_to_full(self, u_planar: Function) -> Function:
+        '''
+        Embeds planar state (y, z, gamma) into full state (r, theta)
+        '''
+        
+        y, z, gamma = u_planar.split(deepcopy=True)
+        
+        r, theta = Function(self.V3), Function(self.V3)         
+        self.fa_V3.assign(r, [self.zero, y, z])
+        self.fa_V3.assign(theta, [self.zero, self.zero, gamma])
+        
+        u = Function(self.W)
+        self.fa_W.assign(u, [r, theta])
+        
+        return u
+
+    def _assign_lagged(self, u: Function):
+        '''
+        Assign full state u to lagged solution u_h
+        '''
+        
+        if not self.planar:
+            self.u_h.assign(u)
+            self._update_nodal_rotation()
+            return
+        
+        r, theta = u.split(deepcopy=True)
+        _, y, z = r.split(deepcopy=True)
+        _, _, gamma = theta.split(deepcopy=True)
+        
+        self.fa_W_planar.assign(self.u_h, [y, z, gamma])
+        
+        return
+    
+    def _nodal_rotation(self, theta: Function, rot: Optional[Dict] = None) -> Dict:
+        '''
+        Evaluates Q, A and the partial derivatives of A with respect 
+        to alpha and beta at the mesh points and assigns them to 
+        tensor-valued functions
+        
+        :param theta: Euler angles
+        :param rot: dictionary with functions to assign to, if None, 
+            new functions are created 
+        '''
+        
+        theta_arr = theta.compute_vertex_values(self.mesh).reshape(3, self.N)
+        
+        if rot is None:
+            rot = {k: Function(self.T33) for k in ['Q', 'A', 'A_alpha', 'A_beta']}
+        
+        for k, M_arr in euler_rotation_arrays(theta_arr).items():
+            vals = np.zeros(9 * self.N)
+            vals[self.v2d_T33] = M_arr.reshape(-1)             
+            rot[k].vector().set_local(vals)
+            rot[k].vector().apply('insert')
+        
+        return rot
+
+    def _update_nodal_rotation(self):
+        '''
+        Updates nodal rotation matrices for the lagged solution u_h
+        '''
+        if not self.nodal_rotation:
+            return
+
+        with self.profiler('nodal_rotation'):        
+            _, theta_h = self.u_h.split(deepcopy=True)
+            self._nodal_rotation(theta_h, self.rot_h)
+
+        return
+    
+    def _split_state(self, u: Function):
+        '''
+        Returns centreline coordinates and Euler angles of given 
+        full or planar state 
+        '''
+        if self.planar and u.function_space() == self.W_planar:
+            y, z, gamma = split(u)
+            return as_vector((0, y, z)), as_vector((0, 0, gamma))
+        
+        return split(u)
 
     def include_boundary(self):
         
@@ -342,18 +672,66 @@ class Worm:
         logger = None, 
         dt_report: Optional[float] = None,
         N_report: Optional[int] = None,
+        profile: bool = False,
+        retry: Optional[Dict] = None,
+        s_report: Optional[np.ndarray] = None,
+        t_report_start: Optional[float] = None,
+        report_policy: Optional[ReportPolicy] = None,
+        metrics: Optional[List[Metric]] = None,
     ):
         """
         Initialise worm object for given model parameters, control
         sequence (optional) and initial frame (optional).
+        
+        Outputs are reported at every N_report-th mesh point. If s_report 
+        is given or if the finite element degree is larger than one, outputs 
+        are interpolated to the report points by piecewise linear functions. 
+        Frames are only assembled for times t >= t_report_start. The report 
+        policy decides which of the remaining frames are assembled, see 
+        minimal_worm.reporting. 
+        
+        Metrics are accumulated over all time steps, see minimal_worm.metrics, 
+        and returned as FS.metrics.
+        
+        If retry is not None, failed time steps are repeated with reduced 
+        time step, see Worm._retry_step. 
         """
         
         self.cache = {}
         
+        # Records timings of the solver hot-path if profile is true
+        self.profiler = StepProfiler(profile)
+        
+        # Objective functional which is accumulated over time steps, 
+        # see Worm.reduced_functional 
+        self.objective = None
+        
+        # Picard iteration is off by default
+        self.picard = {'on': False} if picard is None else picard
+        
+        # Linear solver of this simulation
+        self.solver = dict(Worm.solver)
+        self.tuner = None
+        # True while the forward model is recorded by fenics_adjoint, 
+        # see Worm.reduced_functional 
+        self.recording = False
+        
         if solver is not None:
-            Worm.solver.update(solver)        
+            if solver.get('auto', False):
+                # Linear solver is chosen during the first few time steps 
+                self.tuner = SolverTuner(self._solver_signature(), 
+                    solver.get('cache'), solver.get('n_tune', 3))
+                if self.tuner.done:
+                    self.solver = self.tuner.choice
+            else:
+                Worm.solver.update(solver)
+                self.solver.update(solver)
         
-        self.picard = picard
+        # Rejected time steps are retried at most budget times per simulation
+        self.retry = {'budget': 0, 'max_halvings': 4}
+        if retry is not None:
+            self.retry.update(retry)
+        self.n_rejected = 0
         
         if pbar is not None:
             pbar.total = self.n
@@ -374,6 +752,10 @@ class Worm:
                 self.t_step = round(dt_report/self.dt)
         else:
             self.t_step = None
+        
+        self.t_report_start = t_report_start
+        self.report_policy = report_policy
+        self.metrics = metrics
             
         if N_report is not None:
             if N_report == self.N:
@@ -385,6 +767,22 @@ class Worm:
                 self.s_step = round(self.N/N_report) 
         else: 
             self.s_step = None
+            
+        # Body coordinates of reported mesh points  
+        if self.s_step is not None:
+            self.s_report = self.s_arr[::self.s_step]
+        else:
+            self.s_report = self.s_arr
+        
+        if s_report is not None:
+            assert N_report is None, 'Either specify N_report or s_report'
+            self.s_report = np.asarray(s_report, dtype = float)
+            self.s_step = None
+                        
+        if s_report is not None or self.fe['degree'] > 1:
+            self.V3_report = self._report_function_space(self.s_report)
+        else:
+            self.V3_report = None
         
         if F0 is not None:
             self._t = F0.t
@@ -422,8 +820,20 @@ class Worm:
             assert False, ("Preferred shear/stretch CS['sig0'] must be one of" 
                 "[Fenics.Expression, Fenics.Constant, np.ndarray]")
                     
+        if self.report_policy is not None:
+            self.report_policy.reset(self)
+                    
         self._assign_initial_values(F0)
         self._init_form()
+        
+        if self.metrics is not None:
+            for metric in self.metrics:
+                metric.reset(self)
+        
+        # Step invariant part of the bilinear form
+        if self.F_op_0 is not None:
+            with self.profiler('assemble_0'):
+                self.A_0 = assemble(self.F_op_0)
 
         return
 
@@ -438,11 +848,21 @@ class Worm:
         pbar=None, 
         logger=None, 
         dt_report=None, 
-        N_report=None
+        N_report=None,
+        profile=False,
+        retry=None,
+        s_report=None,
+        t_report_start=None,
+        report_policy=None,
+        metrics=None
     ) -> Tuple[FrameSequence, Optional[Exception]]:
         
         """
         Run the forward model for T seconds.
+        
+        If profile is true, per step timings of the solver hot-path 
+        are returned as FS.profile. The number of rejected time steps 
+        is returned as FS.n_rejected. 
         """
 
         start_time = time.time()
@@ -453,7 +873,8 @@ class Worm:
             FK = FRAME_KEYS
         
         self.initialise(
-            MP, CS, FK, F0, solver, picard, pbar, logger, dt_report, N_report
+            MP, CS, FK, F0, solver, picard, pbar, logger, dt_report, N_report, profile, 
+            retry, s_report, t_report_start, report_policy, metrics
         )
 
         self._print(f'Solve forward' 
@@ -481,17 +902,152 @@ class Worm:
                     
                 if pbar is not None:
                     pbar.update(1)
+                
+                self.profiler.end_step()
 
         except Exception as e:
             CS = {k: np.array([C[k] for C in Cs]) for k in CONTROL_KEYS}
-            return FrameSequence(FS), CS, e
+            sim_time = time.time() - start_time
+            return self._frame_sequence(FS), SimpleNamespace(**CS), e, sim_time
 
         CS = {k: np.array([C[k] for C in Cs]) for k in CONTROL_KEYS}
         
         end_time = time.time()
         sim_time = end_time - start_time  
 
-        return FrameSequence(FS), SimpleNamespace(**CS), None, sim_time 
+        return self._frame_sequence(FS), SimpleNamespace(**CS), None, sim_time 
+    
+    def reduced_functional(self,
+        T: float,
+        param: Namespace,
+        create_CS: Callable,
+        objective: Callable,
+        controls: List[str],
+        solver: Dict = None,
+        n_checkpoints: Optional[int] = None,
+    ):
+        '''
+        Records the forward model on a pyadjoint tape and returns the 
+        objective as a reduced functional of the given controls. 
+        
+        The tape uses revolve checkpointing, i.e. only n_checkpoints 
+        states are stored and the remaining states are recomputed during 
+        the adjoint solve. By default, n_checkpoints = sqrt(n) which 
+        bounds the memory by O(sqrt(n)) states.
+                
+        :param T: simulation time
+        :param param: model and control parameter
+        :param create_CS: returns control sequence for given parameter,
+            e.g. UndulationExperiment.stw_control_sequence  
+        :param objective: callable which is evaluated after every time step 
+            and returns the contribution of the time step to the objective, 
+            see minimal_worm.objectives
+        :param controls: parameter names, e.g. ['a', 'b', 'lam', 'A']
+        :param solver: linear solver 
+        :param n_checkpoints: number of checkpoints
+        :return Jhat (pyadjoint.ReducedFunctional): reduced functional         
+        '''
+        assert 'Revolve' in globals(), ('Derivatives require fenics_adjoint ' 
+            'and checkpoint_schedules to be installed')
+        assert not self.nodal_rotation, ('Nodal rotation matrices are set by '
+            'vector().set_local which is not recorded by fenics_adjoint')
+        assert not self.split_form, ('Matrix updates of the split form are ' 
+            'not recorded by fenics_adjoint')
+        
+        self.n = int(T / self.dt) 
+        
+        if n_checkpoints is None:
+            n_checkpoints = max(int(np.ceil(np.sqrt(self.n))), 1)
+        
+        tape = Tape()
+        set_working_tape(tape)
+        tape.enable_checkpointing(Revolve(self.n, n_checkpoints))
+
+        # Replace control parameters by fenics Constants
+        param = copy(param)
+        physical_to_dimless_parameters(param)
+        
+        m = {}
+        
+        for k in controls:
+            m[k] = Constant(getattr(param, k))
+            setattr(param, k, m[k])
+        
+        MP = ModelParameter(param)
+        CS = create_CS(param)
+                    
+        self.initialise(MP, CS, [], solver = solver, picard = {'on': False})
+        
+        self.objective = objective
+        self.J = 0.0
+        self.recording = True
+        
+        self._print(f'Record tape (t={self._t:.{self.sd}f}..{self._t + T:.{self.sd}f}) ' 
+            f'/ n_steps={self.n} / n_checkpoints={n_checkpoints}')
+                                                
+        for self.i in tape.timestepper(iter(range(self.n))):
+            self.update_solution(CS)
+            
+        self.objective = None
+        self.recording = False
+            
+        return ReducedFunctional(self.J, [Control(c) for c in m.values()])
+
+    def gradient(self,
+        T: float,
+        param: Namespace,
+        create_CS: Callable,
+        objective: Callable,
+        controls: List[str],
+        solver: Dict = None,
+        n_checkpoints: Optional[int] = None,
+    ) -> Tuple[float, Dict]:
+        '''
+        Computes the objective and its gradient with respect to the 
+        given model or control parameters using the adjoint method.
+        
+        See Worm.reduced_functional for parameter description.
+        
+        :return J: objective 
+        :return dJ: dictionary with derivatives of J with respect to the controls  
+        '''
+        
+        Jhat = self.reduced_functional(T, param, create_CS, objective, controls, 
+            solver, n_checkpoints)
+        
+        dJ = Jhat.derivative()
+                
+        return float(Jhat.functional), {k: float(dJ_k) for k, dJ_k in zip(controls, dJ)}
+        
+    def _frame_sequence(self, FS: List[Frame]) -> FrameSequence:
+        '''
+        Converts list of frames into FrameSequence and attaches body 
+        coordinates of the reported mesh points and solver profile. 
+        
+        Frames which are reduced by the report policy are returned 
+        as separate FrameSequence FS.reduced        
+        '''
+        reduced = [F for F in FS if set(vars(F)) != set(self.FK)]
+        
+        FS = FrameSequence([F for F in FS if set(vars(F)) == set(self.FK)])
+        
+        if len(reduced) > 0:
+            FS.reduced = FrameSequence(reduced)
+        
+        if self.metrics is not None:
+            FS.metrics = {}
+            for metric in self.metrics:
+                FS.metrics.update(metric.result())
+        
+        # Body coordinates of the reported mesh points
+        FS.s = self.s_report
+        # Number of rejected time steps
+        FS.n_rejected = self.n_rejected
+        
+        if self.profiler.on:
+            FS.profile = self.profiler.to_dict()
+        
+        return FS
         
     def _update_control(self, CS): 
         '''
@@ -507,67 +1063,294 @@ class Worm:
         # self.k0 is a Fenics.Function and we  
         # assign row i to self.k0        
         elif isinstance(CS['k0'], np.ndarray):
-            v2f(self.k0, CS['k0'][self.i, :])                        
+            self._vertex_values_to_function(CS['k0'][self.i, :], self.k0)
         
         if isinstance(CS['sig0'], np.ndarray):                                        
-            v2f(self.sig0, CS['sig0'][self.i, :])                
+            self._vertex_values_to_function(CS['sig0'][self.i, :], self.sig0)
             
         return
 
     def update_solution(self, CS) -> Optional[Frame]:
-        '''        
+        '''
         Solve time step and save solution to Frame
         '''
-        
+
         self._t += self.dt
 
-        self._update_control(CS)
-        self.u_h.assign(self.u_old_arr[-1])
+        try:
+            u = self._step(CS)
+        except (AssertionError, RuntimeError) as e:
+            u = self._retry_step(CS, e)
 
-        
-        if self.picard['on']:
-            u = self.picard_iteration()
-        else:        
-            u = Function(self.W)            
-            solve(self.F_op == self.L, u, solver_parameters=Worm.solver)
-        
-        assert not np.isnan(u.vector().get_local()).any(), (
-            f'Solution at t={self._t:.{self.D}f} contains nans!')
-        
-        self._r, self._theta = u.split(deepcopy=True)
+        with self.profiler('split'):
+            self._r, self._theta = u.split(deepcopy=True)
 
         # Frame and outputs need to be assembled before u_old_arr
-        # is updated for derivatives to use correct data points        
-        if self.t_step is not None and not (self.i + 1) % self.t_step == 0:
-            F = None            
+        # is updated for derivatives to use correct data points
+        FK = self._report_keys()
+        
+        if FK is None:
+            F = None
             C = None
         else:
-            F = self._assemble_frame()
-            C = self._assemble_controls()
-                                                                    
-        # update past solution cache                
-        for n, u_n in enumerate(self.u_old_arr[:-1]):
-            u_n.assign(self.u_old_arr[n + 1])
+            F = self._assemble_frame(FK)
+            # Controls are only reported alongside full frames
+            if FK == self.FK:
+                with self.profiler('report_controls'):
+                    C = self._assemble_controls()
+            else:
+                C = None
+
+        # Cached outputs are outdated if no frame was assembled
+        if F is None:
+            self.cache.clear()
+
+        if self.objective is not None:
+            self.J += self.objective(self)
         
-        self.u_old_arr[-1].assign(u)
+        if self.metrics is not None:
+            with self.profiler('metrics'):
+                for metric in self.metrics:
+                    metric.update(self)
+
+        self._update_history(u)
 
         return F, C
 
+    def _is_reported(self) -> bool:
+        '''
+        Checks if frame is reported at the current time step
+        '''
+        if not self.FK:
+            return False
+        
+        if self.t_step is not None and not (self.i + 1) % self.t_step == 0:
+            return False
+        
+        # Allow for round-off errors in the accumulated time
+        if self.t_report_start is not None and self._t < self.t_report_start - 0.5 * self.dt:
+            return False
+        
+        return True
+
+    def _report_keys(self) -> Optional[List[str]]:
+        '''
+        Returns output keys reported at the current time step
+        '''
+        if not self._is_reported():
+            return None
+        
+        if self.report_policy is None:
+            return self.FK
+        
+        return self.report_policy(self)
+
+    def _step(self, CS) -> Function:
+        '''
+        Solves for the state at the current time self._t from the
+        state history and returns it as a function in W
+        '''
+
+        with self.profiler('control'):
+            self._update_control(CS)
+
+        self._assign_lagged(self.u_old_arr[-1])
+
+        if self.picard['on']:
+            u = self.picard_iteration()
+        else:
+            u = Function(self.u_h.function_space())
+            self._solve_linear(u)
+
+        with self.profiler('nan_check'):
+            assert not np.isnan(u.vector().get_local()).any(), (
+                f'Solution at t={self._t:.{self.sd}f} contains nans!')
+
+        if self.planar:
+            u = self._planar_to_full(u)
+
+        return u
+
+    def _update_history(self, u: Function):
+        '''
+        Shifts state history and appends current state
+        '''
+        with self.profiler('history'):
+            for n, u_n in enumerate(self.u_old_arr[:-1]):
+                u_n.assign(self.u_old_arr[n + 1])
+
+            self.u_old_arr[-1].assign(u)
+
+        return
+
+    def _retry_step(self, CS, e: Exception) -> Function:
+        '''
+        Retries failed time step with time step dt/2**k for k = 1, 2, ...
+        until the sub-steps succeed. The sub-steps end on the original
+        time grid, i.e. reported time points are unchanged.
+
+        The state history, which is used by the finite backwards difference,
+        is interpolated to the reduced time step. After the retry, the
+        original history is restored.
+
+        :param CS: control sequence
+        :param e: exception raised by the failed time step
+        '''
+        # The history is interpolated by vector().axpy, which 
+        # is not recorded by fenics_adjoint
+        if self.recording:
+            raise e
+
+        t_end = self._t
+        t0 = self._t - self.dt
+
+        # Backup of the state history on the original time grid
+        u_old_arr = [u.copy(deepcopy=True) for u in self.u_old_arr]
+
+        k = 0
+
+        try:
+            while True:
+                # Only steps which are actually retried count as rejected
+                if self.n_rejected >= self.retry['budget'] or k >= self.retry['max_halvings']:
+                    raise e
+
+                self.n_rejected += 1
+                k += 1
+
+                self._print(f'Time step rejected at t={t_end:.{self.sd}f}: {e}. '
+                    f'Retry with dt={self.dt / 2**k}')
+                self.profiler.count('rejected')
+
+                try:
+                    u = self._sub_steps(CS, u_old_arr, t0, k)
+                    break
+                except (AssertionError, RuntimeError) as e_k:
+                    e = e_k
+        finally:
+            # Restore original history and time step
+            for u_n, u_old_n in zip(self.u_old_arr, u_old_arr):
+                u_n.assign(u_old_n)
+            self._set_time_step(self.dt)
+            self._t = t_end
+
+        return u
+
+    def _sub_steps(self,
+            CS,
+            u_old_arr: List[Function],
+            t0: float,
+            k: int) -> Function:
+        '''
+        Solves 2**k sub-steps of size dt/2**k starting at t0
+
+        :param CS: control sequence
+        :param u_old_arr: state history on the original time grid
+        :param t0: time of the last accepted state
+        :param k: number of halvings
+        '''
+        h = self.dt / 2**k
+
+        self._interpolate_history(u_old_arr, h)
+        self._set_time_step(h)
+
+        for m in range(1, 2**k + 1):
+            self._t = t0 + m * h
+            u = self._step(CS)
+            self._update_history(u)
+
+        return u
+
+    def _interpolate_history(self, u_old_arr: List[Function], h: float):
+        '''
+        Interpolates state history from time step dt to time step h
+        using Lagrange polynomials through the past states
+
+        :param u_old_arr: state history on the original time grid
+        :param h: new time step
+        '''
+
+        # Time points relative to the last accepted state
+        tau_arr = - self.dt * np.arange(self.fdo - 1, -1, -1)
+        sigma_arr = - h * np.arange(self.fdo - 1, -1, -1)
+
+        for u_n, sigma in zip(self.u_old_arr, sigma_arr):
+
+            u_n.vector().zero()
+
+            for i, u_old_i in enumerate(u_old_arr):
+                w = np.prod([(sigma - tau_arr[j]) / (tau_arr[i] - tau_arr[j])
+                    for j in range(self.fdo) if j != i])
+                u_n.vector().axpy(float(w), u_old_i.vector())
+
+        return
+
+    def _set_time_step(self, dt: float):
+        '''
+        Sets time step used in the weak form
+        '''
+        self.dt_c.assign(dt)
+
+        # Step invariant part of the bilinear form depends on dt
+        if self.F_op_0 is not None:
+            with self.profiler('assemble_0'):
+                self.A_0 = assemble(self.F_op_0)
+
+        return
+
+    def _solve_linear(self, u: Function):
+        '''
+        Assembles and solves the linear system for the current 
+        lagged solution u_h
+        '''
+        with self.profiler('assemble'):
+            A = assemble(self.F_op)
+            b = assemble(self.L)
+            
+            if self.F_op_0 is not None:
+                A.axpy(1.0, self.A_0, True)
+        
+        with self.profiler('solve'):
+            if self.recording:
+                # Solves of the tuner, Krylov solvers with initial guess and the 
+                # banded solver are not recorded by fenics_adjoint
+                method = self.solver.get('linear_solver', 'default')
+                pc = self.solver.get('preconditioner', 'default')
+                if method == 'banded':
+                    method, pc = 'default', 'default'
+                solve(A, u.vector(), b, method, pc)
+            elif self.tuner is not None and not self.tuner.done:
+                self.tuner.solve(A, u.vector(), b, self.u_h.vector())
+                if self.tuner.done:
+                    self._print(f'Linear solver: {self.tuner.choice}')
+                    self.solver = self.tuner.choice
+            else:
+                linear_solve(A, u.vector(), b, self.solver, self.u_h.vector())
+        
+        return
+
+    def _solver_signature(self) -> str:
+        '''
+        Signature of the linear system used to cache linear solver choices
+        '''
+        return (f"N={self.N}_fe={self.fe['type']}{self.fe['degree']}_" 
+            f"fdo={self.fdo}_planar={self.planar}_lumped={self.lumped}_" 
+            f"nodal_rotation={self.nodal_rotation}_split_form={self.split_form}_"
+            f"picard={self.picard['on']}")
+
     def picard_iteration(self):
 
         """Solve nonlinear system of equations using picard iteration"""
 
         # Trial function
-        u = Function(self.W)
+        u = Function(self.u_h.function_space())
         
         # Solution from previous time step
         u_old = self.u_old_arr[-1]
-        r_old, theta_old = u_old.split()        
-        r_old_arr = r_old.compute_vertex_values(self.mesh).reshape(3, self.N)
-        theta_old_arr = theta_old.compute_vertex_values(self.mesh).reshape(3, self.N) 
+        r_old, theta_old = self._split_state(u_old)        
                 
         # Initial guess        
-        self.u_h.assign(u_old)
+        self._assign_lagged(u_old)
 
         tol = self.picard['tol']
         lr = self.picard['lr'] 
@@ -577,17 +1360,20 @@ class Worm:
         converged = False
                 
         while i < maxiter:            
-            solve(self.F_op == self.L, u, solver_parameters=Worm.solver)
-            r, theta = u.split()
-            r_h, theta_h = self.u_h.split()
+            self._solve_linear(u)
+            self.profiler.count('picard_iter')
             
-            # Error   
-            err_r = assemble(sqrt((r-r_h)**2)*dx)
-            err_theta = assemble(sqrt((theta-theta_h)**2)*dx)
-                        
-            # Normalize by average change per time step            
-            norm_r = assemble(sqrt((r - r_old)**2)*dx)
-            norm_theta = assemble(sqrt((theta - theta_old)**2)*dx)
+            with self.profiler('picard_err'):
+                r, theta = self._split_state(u)
+                r_h, theta_h = self._split_state(self.u_h)
+                
+                # Error   
+                err_r = assemble(sqrt((r-r_h)**2)*self.dx_functional)
+                err_theta = assemble(sqrt((theta-theta_h)**2)*self.dx_functional)
+                            
+                # Normalize by average change per time step            
+                norm_r = assemble(sqrt((r - r_old)**2)*self.dx_functional)
+                norm_theta = assemble(sqrt((theta - theta_old)**2)*self.dx_functional)
             
             rel_err_r  = err_r / max(norm_r, 1.0e-12)
             rel_err_theta  = err_theta / max(norm_theta, 1.0e-12)
@@ -601,41 +1387,79 @@ class Worm:
                 break
 
             self.u_h.assign(lr * u + (1.0 - lr) * self.u_h)
+            self._update_nodal_rotation()
             i += 1
             
         assert converged, 'Picard iteration did not converge'
 
         return u
                                         
-    def _assemble_frame(self):
+    def _assemble_frame(self, FK: Optional[List[str]] = None):
         '''
         Assemble frames
         '''
+        
+        if FK is None:
+            FK = self.FK
                 
         self.cache.clear()
         
         kwargs = {}
     
+        for k in FK:
+            with self.profiler(f'frame_{k}'):
+                kwargs[k] = self._assemble_output(k)
+                                
+        return Frame(**kwargs)
+
+    def _assemble_output(self, k: str):
+        '''
+        Assemble single output variable
+        '''
+            
+        v = getattr(self, f'_{k}')
+        
         # Check if float, Expression or Function        
-        for k in self.FK:
+        if isinstance(v, float):
+            return v
         
-            v = getattr(self, f'_{k}')
-            
-            if isinstance(v, float):
-                kwargs[k] = v
-                continue
-            
-            if isinstance(v, Function):
-                v_arr = f2n(v)
-            else:
-                v_arr = f2n(project(v, self.output_func_spaces[k]))
-                                
+        if not isinstance(v, Function):
+            v = project(v, self.output_func_spaces[k], 
+                form_compiler_parameters = self.fcp_output)
+                                                            
+        return self._to_report(v)
+
+    def _report_function_space(self, s_report: np.ndarray) -> FunctionSpace:
+        '''
+        Piecewise linear function space for 3 component vector-valued 
+        functions on a mesh with vertices at the report points
+        
+        :param s_report: body coordinates of the report points
+        '''
+        assert s_report[0] >= 0 and s_report[-1] <= 1 and np.all(np.diff(s_report) > 0), ( 
+            'Report points must be strictly increasing and in [0, 1]')
+        
+        mesh = UnitIntervalMesh(len(s_report) - 1)
+        mesh.coordinates()[:, 0] = s_report
+        
+        P1 = FiniteElement('Lagrange', mesh.ufl_cell(), 1)
+        
+        return FunctionSpace(mesh, MixedElement([P1] * 3))
+
+    def _to_report(self, v: Function) -> np.ndarray:
+        '''
+        Returns values of function v in V3 at the report points
+        '''
+        if self.V3_report is None:
+            v_arr = f2n(v)
             if self.s_step is not None:
                 v_arr = v_arr[..., ::self.s_step]
-             
-            kwargs[k] = v_arr
-                                
-        return Frame(**kwargs)
+            return v_arr
+            
+        # Allow for round-off errors at the boundaries
+        v.set_allow_extrapolation(True)
+        
+        return f2n(interpolate(v, self.V3_report))
 
     def _assemble_controls(self):
         '''
@@ -647,14 +1471,13 @@ class Worm:
         for k in ['sig0', 'k0']:
             v_pref = getattr(self, k)                          
             if isinstance(v_pref, Expression):
-                v_arr = f2n(project(v_pref, self.V3))
+                v_arr = self._to_report(project(v_pref, self.V3, 
+                    form_compiler_parameters = self.fcp_output))
             elif isinstance(v_pref, Constant):
-                v_arr = np.tile(v_pref.values()[:, None], (1, self.N))
-            elif isinstance(v_pref, np.ndarray):
-                v_arr = v_pref[self.i, :]                                    
-        
-            if self.s_step is not None:
-                v_arr = v_arr[..., ::self.s_step]
+                v_arr = np.tile(v_pref.values()[:, None], (1, len(self.s_report)))
+            # Array controls are assigned to functions in V3            
+            elif isinstance(v_pref, Function):
+                v_arr = self._to_report(v_pref)
             
             C[k] = v_arr
                                     
@@ -691,6 +1514,19 @@ class Worm:
         )        
 
         return R_z * R_y * R_x     
+
+    @staticmethod
+    def Q_planar(gamma):
+        '''
+        Matrix Q rotates lab frame to the body frame for 
+        Euler angles alpha = beta = 0 restricted to the yz-plane        
+        '''
+        
+        return as_matrix(
+            [[cos(gamma), -sin(gamma)], 
+             [sin(gamma), cos(gamma)]]
+        )
+
     @staticmethod
     def A(theta):
         """The matrix A is used to calculate the curvature k and
@@ -734,6 +1570,15 @@ class Worm:
       
         return A_t
 
+    @staticmethod
+    def A_t_nodal(rot, theta_t):
+        '''
+        Time derivative of matrix A from nodal partial derivatives
+        of A with respect to alpha and beta 
+        '''
+        
+        return rot['A_alpha'] * theta_t[0] + rot['A_beta'] * theta_t[1]
+
     @staticmethod
     def T(r):
         '''
@@ -839,6 +1684,18 @@ class Worm:
 #------------------------------------------------------------------------------ 
 # Wrapper functions which cache and return ouput variables of interest 
     
+    @property
+    def _rot(self):
+        '''
+        Nodal rotation matrices of the current solution
+        '''        
+        if 'rot' in self.cache:
+            return self.cache['rot']
+        
+        self.cache['rot'] = self._nodal_rotation(self._theta)
+        
+        return self.cache['rot']
+
     @property
     def _Q(self):
         """Rotation matrix from global to local frames"""
@@ -846,7 +1703,10 @@ class Worm:
         if 'Q' in self.cache:
             return self.cache['Q']
 
-        self.cache['Q'] = Worm.Q(self._theta)
+        if self.nodal_rotation:
+            self.cache['Q'] = self._rot['Q']
+        else:
+            self.cache['Q'] = Worm.Q(self._theta)
 
         return self.cache['Q']
 
@@ -898,7 +1758,10 @@ class Worm:
         if 'A' in self.cache:
             return self.cache['A']
 
-        self.cache['A'] = Worm.A(self._theta)
+        if self.nodal_rotation:
+            self.cache['A'] = self._rot['A']
+        else:
+            self.cache['A'] = Worm.A(self._theta)
 
         return self.cache['A']
 
@@ -921,7 +1784,10 @@ class Worm:
         if 'A_t' in self.cache:
             return self.cache['A_t']
 
-        self.cache['A_t'] = Worm.A_t(self._theta, self._theta_t)
+        if self.nodal_rotation:
+            self.cache['A_t'] = Worm.A_t_nodal(self._rot, self._theta_t)
+        else:
+            self.cache['A_t'] = Worm.A_t(self._theta, self._theta_t)
         
         return self.cache['A_t']
     
@@ -956,7 +1822,7 @@ class Worm:
         '''
         sig_err = self._sig - self.sig0
         
-        return assemble(sqrt(dot(sig_err, sig_err))*dx)        
+        return assemble(sqrt(dot(sig_err, sig_err))*self.dx_functional)        
 
     @property
     def _k_norm(self):
@@ -965,7 +1831,7 @@ class Worm:
         '''        
         k_err = self._k - self.k0
         
-        return assemble(sqrt(dot(k_err, k_err))* dx)        
+        return assemble(sqrt(dot(k_err, k_err))* self.dx_functional)        
 
     @property        
     def _r_t(self):
@@ -1077,7 +1943,8 @@ class Worm:
         if 'f_M' in self.cache:
             return self.cache['f_M']
         
-        self.cache['f_M'] = -grad(project(self.S*self.sig0, self.V3))
+        self.cache['f_M'] = -grad(project(self.S*self.sig0, self.V3, 
+            form_compiler_parameters = self.fcp_output))
         
         return self.cache['f_M']
     
@@ -1087,7 +1954,8 @@ class Worm:
         if 'l_M' in self.cache:
             return self.cache['l_M']
         
-        self.cache['l_M'] = -grad(project(self.B*self.k0, self.V3))
+        self.cache['l_M'] = -grad(project(self.B*self.k0, self.V3, 
+            form_compiler_parameters = self.fcp_output))
         
         return self.cache['l_M']
     
@@ -1125,8 +1993,8 @@ class Worm:
         Calculate elastic energy
         '''
                 
-        V_k = 0.5 * assemble(dot(self._k, self.B * self._k) * dx)
-        V_sig = 0.5 * assemble(dot(self._sig, self.S * self._sig) * dx)
+        V_k = 0.5 * assemble(dot(self._k, self.B * self._k) * self.dx_functional)
+        V_sig = 0.5 * assemble(dot(self._sig, self.S * self._sig) * self.dx_functional)
 
         return V_k + V_sig
 
@@ -1136,8 +2004,8 @@ class Worm:
         Calculate fluid dissipation rate
         '''        
         
-        D_F_dot_f = assemble(dot(self._f_F, self._r_t) * dx)
-        D_F_dot_l = assemble(dot(self._l_F, self._w) * dx)
+        D_F_dot_f = assemble(dot(self._f_F, self._r_t) * self.dx_functional)
+        D_F_dot_l = assemble(dot(self._l_F, self._w) * self.dx_functional)
 
         return D_F_dot_f + D_F_dot_l 
 
@@ -1146,8 +2014,8 @@ class Worm:
         '''
         Calculate internal dissipation rate
         '''
-        D_I_dot_sig = -assemble(dot(self._sig_t, self.S_tilde * self._sig_t) * dx)
-        D_I_dot_k = -assemble(dot(self._k_t, self.B_tilde * self._k_t) * dx)
+        D_I_dot_sig = -assemble(dot(self._sig_t, self.S_tilde * self._sig_t) * self.dx_functional)
+        D_I_dot_k = -assemble(dot(self._k_t, self.B_tilde * self._k_t) * self.dx_functional)
 
         return D_I_dot_sig + D_I_dot_k
 
@@ -1157,8 +2025,8 @@ class Worm:
         Calculate rate of change in potential energy
         '''                
                 
-        V_dot_k = assemble(dot(self._k, self.B * self._k_t) * dx)                        
-        V_dot_sig = assemble(dot(self._sig, self.S * self._sig_t) * dx)
+        V_dot_k = assemble(dot(self._k, self.B * self._k_t) * self.dx_functional)                        
+        V_dot_sig = assemble(dot(self._sig, self.S * self._sig_t) * self.dx_functional)
         
         return V_dot_sig + V_dot_k
     
@@ -1167,7 +2035,7 @@ class Worm:
         '''
         Calculate mechanical muscle power
         '''
-        W_dot_f = assemble(dot(self._f_M, self._Q * self._r_t) * dx)
-        W_dot_l = assemble(dot(self._l_M, self._w) * dx)
+        W_dot_f = assemble(dot(self._f_M, self._Q * self._r_t) * self.dx_functional)
+        W_dot_l = assemble(dot(self._l_M, self._w) * self.dx_functional)
         
         return W_dot_f + W_dot_l 
@@ -25,6 +25,7 @@ from wormlab3d.postures.plot_utils import FrameArtistMLab
 from wormlab3d.trajectories.util import smooth_trajectory
 
 from simple_worm.frame import FrameSequenceNumpy
+from minimal_worm.experiments.pack_store import PackStore
 
 # Off-screen rendering
 mlab.options.offscreen = True
@@ -370,8 +371,7 @@ class WormStudio():
          
         for h, fn in zip(PG.hash_arr, filenames):
             
-            FS_name = h + '.dat'              
-            sim_data = pickle.load(open(str(data_dir / FS_name), 'rb'))                    
+            sim_data = PackStore(data_dir).load(h)                    
 
             WS = WormStudio(sim_data['FS'])                                    
             WS.generate_clip(output_dir / fn, **kwargs)
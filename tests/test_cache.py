@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+import tempfile
+
+import numpy as np
+
+from minimal_worm import FrameSequence
+from minimal_worm.experiments import SimulationCache
+
+def output(param):
+
+	FS = FrameSequence([])
+	FS.t = np.arange(1, 11) * 0.1
+	FS.r = np.random.default_rng(0).random((10, 3, 20))
+
+	return {'FS': FS, 'CS': SimpleNamespace(), 'MP': None, 'param': param,
+		'exit_status': 0, 'sim_t': 1.0}
+
+def test_key():
+	'''
+	Test if the key does not depend on numeric types, round-off errors,
+	the order of the frame keys and parameters which do not affect the result
+	'''
+	param = {'a': 1, 'b': 0.1, 'N': 100, 'profile': False}
+
+	key = SimulationCache.key(param, ['r', 't'], code_version = '')
+
+	assert key == SimulationCache.key({'a': 1.0, 'b': 0.1 + 1e-17, 'N': 100, 'profile': True},
+		['t', 'r'], code_version = '')
+	assert key != SimulationCache.key({**param, 'b': 0.2}, ['r', 't'], code_version = '')
+	assert key != SimulationCache.key(param, ['r'], code_version = '')
+	assert key != SimulationCache.key(param, ['r', 't'], code_version = 'v1')
+
+	print('Passed test: Cache key')
+
+	return
+
+def test_eviction():
+	'''
+	Test if least recently used unpinned entries are evicted first
+	'''
+	with tempfile.TemporaryDirectory() as cache_dir:
+
+		cache = SimulationCache(cache_dir)
+
+		for key in ['a', 'b', 'c']:
+			cache.put(key, output({'key': key}))
+
+		size = {key: e['size'] for key, e in cache.catalog.items()}
+
+		cache.pin('a')
+		cache.get('b')
+
+		# Reload catalog from logs
+		cache = SimulationCache(cache_dir, max_bytes = size['a'] + size['b'], policy = 'lru')
+
+		assert cache.evict() == ['c']
+		assert cache.has('a') and cache.has('b') and not cache.has('c')
+
+		cache.max_bytes = size['a']
+
+		assert cache.evict() == ['b']
+		assert np.array_equal(cache.get('a')['FS'].r, output({})['FS'].r)
+
+	print('Passed test: Cache eviction')
+
+	return
+
+if __name__ == '__main__':
+
+	test_key()
+	test_eviction()
@@ -0,0 +1,61 @@
+import numpy as np
+
+from minimal_worm import ModelParameter
+from minimal_worm.linear_response import LinearResponse
+from minimal_worm.experiments.undulation import UndulationExperiment
+
+def test_stiff_limit():
+	'''
+	Test if curvature follows the preferred curvature without lag
+	if the elastic and viscous time scales are small 	
+	'''	
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+
+	param.A = 0.1
+	param.a = 1e-6
+	param.b = 1e-6
+	
+	LR = LinearResponse(250)
+	MP = ModelParameter(param)	
+	k0_hat = LinearResponse.stw_curvature_amplitude(param, LR.s_arr)
+	
+	sol = LR.solve(MP, k0_hat)
+	obs = LinearResponse.observables(MP, sol)
+
+	s_idx_arr = np.logical_and(0.1 <= LR.s_arr, LR.s_arr <= 0.9)
+	
+	assert np.allclose(sol['k'][s_idx_arr], k0_hat[s_idx_arr], atol = 1e-4)
+	assert np.isclose(obs['A_avg'], param.A, rtol = 1e-3)
+	assert np.abs(obs['lag_avg']) < 1e-3
+	assert obs['U'] > 0
+	assert obs['D_F'] < 0 and obs['D_I'] < 0
+
+	print('Passed test: Stiff limit')
+
+def test_quadratic_scaling():
+	'''
+	Test if swimming speed and energies scale quadratically 
+	and curvature amplitude linearly with the control amplitude 	
+	'''	
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+
+	LR = LinearResponse(250)
+	
+	obs_arr = []
+	
+	for A in [0.1, 0.2]:
+		param.A = A
+		obs_arr.append(LR.simulate(param))
+
+	assert np.isclose(obs_arr[1]['U'], 4 * obs_arr[0]['U'])
+	assert np.isclose(obs_arr[1]['W'], 4 * obs_arr[0]['W'])
+	assert np.isclose(obs_arr[1]['A_avg'], 2 * obs_arr[0]['A_avg'])
+	
+	print('Passed test: Quadratic scaling')
+	
+if __name__ == '__main__':
+	
+	test_stiff_limit()
+	test_quadratic_scaling()
@@ -0,0 +1,50 @@
+import tempfile
+
+from minimal_worm.experiments import Manifest
+
+def test_manifest():
+	'''
+	Test if the most recent event is used for every task, if incomplete
+	lines are skipped and if the summary counts tasks per status
+	'''
+	with tempfile.TemporaryDirectory() as sim_dir:
+
+		manifest = Manifest(sim_dir)
+
+		for h in ['a', 'b', 'c']:
+			manifest.start(h, T = 5.0)
+
+		manifest.finish('a', 0, sim_t = 10.0, T = 5.0, t_end = 5.0)
+		manifest.finish('b', 1, sim_t = 2.0, T = 5.0, t_end = 1.3)
+
+		# Worker killed while writing
+		log_path = next(manifest.sim_dir.glob('manifest_*.log'))
+		with open(log_path, 'a') as f:
+			f.write('{"hash": "c", "status": "do')
+
+		manifest = Manifest(sim_dir)
+
+		assert manifest.status('a') == Manifest.DONE
+		assert manifest.status('b') == Manifest.FAILED
+		assert manifest.status('c') == Manifest.RUNNING
+		assert manifest.status('d') is None
+
+		assert manifest.is_finished('b') and not manifest.is_finished('c')
+		assert manifest.records['b']['t_end'] == 1.3
+		assert manifest.records['a']['started'] is not None
+
+		summary = manifest.summary(['a', 'b', 'c', 'd'])
+
+		assert summary[Manifest.DONE] == 1
+		assert summary[Manifest.FAILED] == 1
+		assert summary[Manifest.RUNNING] == 1
+		assert summary['missing'] == 1
+		assert summary['sim_t_total'] == 12.0
+
+	print('Passed test: Manifest')
+
+	return
+
+if __name__ == '__main__':
+
+	test_manifest()
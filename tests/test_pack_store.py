@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+import tempfile
+import pickle
+
+import numpy as np
+
+from minimal_worm import FrameSequence
+from minimal_worm.experiments import PackStore
+
+def random_output(rng, exit_status):
+
+	FS = FrameSequence([])
+	FS.t = np.arange(1, 11) * 0.1
+	FS.r = rng.random((10, 3, 20))
+	FS.s = np.linspace(0, 1, 20)
+	FS.metrics = {'U': rng.random()}
+	FS.reduced = FrameSequence([])
+	FS.reduced.t = np.arange(1, 4) * 0.1
+
+	CS = SimpleNamespace(k0 = rng.random((10, 3, 20)))
+
+	return FS, CS, {'T': 1.0, 'exit_status': exit_status}
+
+def test_pack_store():
+	'''
+	Test if arrays and attributes are restored from the pack store,
+	if the most recent record is used and if legacy pickle files are read
+	'''
+	rng = np.random.default_rng(0)
+
+	with tempfile.TemporaryDirectory() as sim_dir:
+
+		store = PackStore(sim_dir)
+
+		outputs = {}
+
+		for h, exit_status in zip(['a', 'b', 'a'], [1, 0, 0]):
+			outputs[h] = random_output(rng, exit_status)
+			FS, CS, param = outputs[h]
+			store.append(h, FS, CS, None, param, exit_status, sim_t = 1.0)
+
+		# Legacy sweep with one pickle file per simulation
+		FS, CS, param = outputs['c'] = random_output(rng, 1)
+
+		with open(f'{sim_dir}/c.dat', 'wb') as f:
+			pickle.dump({'param': param, 'MP': None, 'exit_status': 1,
+				'sim_t': 1.0, 'FS': FS, 'CS': CS}, f)
+
+		store = PackStore(sim_dir)
+
+		assert PackStore.exists(sim_dir)
+		assert store.has('a') and store.has('c') and not store.has('d')
+
+		for h, (FS, CS, param) in outputs.items():
+
+			assert store.exit_status(h) == param['exit_status']
+			assert np.isclose(store.t_end(h), FS.t[-1])
+
+			data = store.load(h)
+
+			assert data['param'] == param
+			assert np.array_equal(data['FS'].r, FS.r)
+			assert np.array_equal(data['FS'].s, FS.s)
+			assert np.array_equal(data['FS'].reduced.t, FS.reduced.t)
+			assert np.array_equal(data['CS'].k0, CS.k0)
+			assert data['FS'].metrics == FS.metrics
+
+		# Only requested arrays are mapped
+		data = store.load('a', FS_keys = [], CS_keys = [])
+
+		assert not hasattr(data['FS'], 'r') and hasattr(data['FS'], 't')
+
+	print('Passed test: Pack store')
+
+	return
+
+def test_alias():
+	'''
+	Test if an alias refers to the arrays of its source without copying them
+	and if it keeps its own parameter dictionary
+	'''
+	rng = np.random.default_rng(0)
+
+	with tempfile.TemporaryDirectory() as sim_dir:
+
+		store = PackStore(sim_dir)
+
+		FS, CS, param = random_output(rng, 0)
+		store.append('a', FS, CS, None, param, 0, sim_t = 1.0)
+
+		size = sum(f.stat().st_size for f in store.sim_dir.glob('pack_*.bin'))
+
+		param_b = {**param, 'T': 2.0}
+
+		store.alias('b', 'a', param_b)
+
+		store = PackStore(sim_dir)
+
+		assert store.exit_status('b') == 0
+		assert np.array_equal(store.load('b')['FS'].r, FS.r)
+		# Only the parameter dictionary of the alias is saved
+		assert store.load('b')['param'] == param_b
+		assert store.load('a')['param'] == param
+		# Arrays are not copied
+		assert size + FS.r.nbytes > sum(f.stat().st_size for f in store.sim_dir.glob('pack_*.bin'))
+
+	print('Passed test: Pack store alias')
+
+	return
+
+if __name__ == '__main__':
+
+	test_pack_store()
+	test_alias()
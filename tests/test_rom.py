@@ -0,0 +1,88 @@
+from copy import copy
+
+import numpy as np
+
+from minimal_worm import Worm, ModelParameter
+from minimal_worm.rom import POD, ReducedWorm
+from minimal_worm.experiments.undulation import UndulationExperiment
+
+def test_deim():
+	'''
+	Test if DEIM interpolation is exact for vectors in the span of the modes
+	'''
+	rng = np.random.default_rng(0)
+	X = rng.random((200, 5)) @ rng.random((5, 40))
+
+	U, _ = POD.basis(X, tol = 1e-12)
+
+	assert U.shape[1] == 5
+	assert POD.projection_error(X, U) < 1e-12
+
+	idx_arr = POD.deim(U)
+
+	for x in X.T:
+		x_deim = U @ np.linalg.solve(U[idx_arr, :], x[idx_arr])
+		assert np.allclose(x, x_deim)
+
+	print('Passed test: DEIM')
+
+	return
+
+def test_reduced_worm():
+	'''
+	Test if the reduced-order model trained on two wavelengths
+	reproduces the full simulation for a wavelength in between
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])
+
+	param.dt = 0.01
+	param.N = 100
+	param.T = 1.0
+
+	param_arr = []
+
+	for lam in [0.9, 1.1]:
+		param_lam = copy(param)
+		param_lam.lam = lam
+		param_arr.append(param_lam)
+
+	# POD modes from full simulations
+	worm = Worm(param.N, param.dt, quiet = True)
+
+	r_arr, theta_arr = [], []
+
+	for param_lam in param_arr:
+		CS = UndulationExperiment.stw_control_sequence(param_lam)
+		FS, _, e, _ = worm.solve(param.T, ModelParameter(param_lam), CS, FK = ['r', 'theta'])
+		assert e is None
+		r_arr.append(FS.r)
+		theta_arr.append(FS.theta)
+
+	X_r, X_theta = POD.snapshots(np.array(r_arr), np.array(theta_arr), FS.s)
+
+	Phi_r, _ = POD.basis(X_r, tol = 1e-8)
+	Phi_theta, _ = POD.basis(X_theta, tol = 1e-8)
+
+	rom = ReducedWorm(param.N, param.dt, Phi_r, Phi_theta, quiet = True)
+	rom.train(param.T, param_arr, UndulationExperiment.stw_control_sequence)
+
+	assert rom.deim is not None
+
+	# Held-out parameter
+	param_test = copy(param)
+	param_test.lam = 1.0
+
+	err = rom.validate(param.T, [param_test], UndulationExperiment.stw_control_sequence)[0]
+
+	assert err['r'] < 1e-2
+	assert err['theta'] < 5e-2
+
+	print('Passed test: Reduced worm')
+
+	return
+
+if __name__ == '__main__':
+
+	test_deim()
+	test_reduced_worm()
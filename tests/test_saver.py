@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from pathlib import Path
+import tempfile
+
+import numpy as np
+
+from minimal_worm import FrameSequence
+from minimal_worm.experiments import PackStore, Saver
+from minimal_worm.experiments.undulation import UndulationExperiment
+from parameter_scan import ParameterGrid
+
+def test_save_data():
+	'''
+	Test if parallel batched pooling writes rows in grid order
+	and pads the missing time steps of failed runs with nans. 
+	Runs without saved results, e.g. of killed workers, are 
+	saved as failed
+	'''
+	param = UndulationExperiment.parameter_parser().parse_args([])
+
+	lam_param = {'v_min': 0.5, 'v_max': 2.0, 'N': 5,
+		'step': None, 'round': 4, 'log': False}
+
+	PG = ParameterGrid(vars(param), {'lam': lam_param})
+
+	n, N = 10, 20
+
+	# Failed run which reported only the first n_fail frames
+	i_fail, n_fail = 3, 4
+	# Run without saved results
+	i_killed = 1
+
+	with tempfile.TemporaryDirectory() as tmp_dir:
+
+		sim_dir = Path(tmp_dir) / 'simulations'
+		store = PackStore(sim_dir)
+
+		for i, h in enumerate(PG.hash_arr):
+
+			if i == i_killed:
+				continue
+
+			n_i = n_fail if i == i_fail else n
+
+			FS = FrameSequence([])
+			FS.t = 0.1 * np.arange(1, n_i + 1)
+			FS.s = np.linspace(0, 1, N)
+			# Rows are identified by their values
+			FS.r = np.full((n_i, 3, N), float(i))
+
+			store.append(h, FS, SimpleNamespace(), None, PG.param_arr[i],
+				exit_status = int(i == i_fail), sim_t = float(i))
+
+		h5 = Saver.save_data(Path(tmp_dir) / 'sweep.h5', PG, sim_dir, ['t', 'r'], None,
+			N_worker = 2, batch_size = 2)
+
+		r = h5['FS']['r'][:]
+
+		assert r.shape == (len(PG), n, 3, N)
+
+		for i in range(len(PG)):
+			assert h5['exit_status'][i] == (i in [i_fail, i_killed])
+			if i == i_killed:
+				assert np.isnan(h5['sim_t'][i])
+				assert np.all(np.isnan(r[i]))
+				continue
+			assert h5['sim_t'][i] == i
+			if i == i_fail:
+				assert np.allclose(r[i, :n_fail], i)
+				assert np.all(np.isnan(r[i, n_fail:]))
+				assert np.all(np.isnan(h5['FS']['t'][i, n_fail:]))
+			else:
+				assert np.allclose(r[i], i)
+
+		h5.close()
+
+	print('Passed test: Save data')
+
+	return
+
+if __name__ == '__main__':
+
+	test_save_data()
@@ -0,0 +1,71 @@
+import tempfile
+import os
+
+import numpy as np
+
+from minimal_worm.experiments import CostModel, CostScheduler
+from minimal_worm.experiments.undulation import UndulationExperiment
+
+def _task(_input, pbar, logger, task_number, crash_hash):
+	'''
+	Kills its worker for crash_hash
+	'''
+	if _input[1] == crash_hash:
+		os._exit(1)
+
+	return
+
+def test_cost_model():
+	'''
+	Test if the weights are refined towards observed times and if
+	longest-first dispatch does not increase the makespan
+	'''
+	param = vars(UndulationExperiment.parameter_parser().parse_args([]))
+
+	cost_model = CostModel()
+
+	sim_t = 10.0 * cost_model.predict(param)
+
+	for _ in range(20):
+		cost_model.observe(param, sim_t)
+
+	assert np.abs(np.log(cost_model.predict(param) / sim_t)) < 0.1
+
+	# Finish times of the two workers are 4+2+2 and 3+3+2
+	cost_arr = [4, 3, 3, 2, 2, 2]
+
+	assert CostModel.makespan(cost_arr, 2) == 8
+	assert CostModel.makespan(cost_arr[::-1], 2) == 9
+	assert CostModel.makespan(cost_arr, 6) == 4
+
+	print('Passed test: Cost model')
+
+	return
+
+def test_crash():
+	'''
+	Test if the task of a killed worker is reported as failed
+	and passed to on_crash
+	'''
+	param = vars(UndulationExperiment.parameter_parser().parse_args([]))
+
+	tasks = [(param, h) for h in ['a', 'b', 'c', 'd']]
+	crashed = []
+
+	with tempfile.TemporaryDirectory() as log_dir:
+
+		report = CostScheduler(2, on_crash = crashed.append).run(tasks, _task, log_dir, 'b')
+
+	assert sorted(report.keys()) == ['a', 'b', 'c', 'd']
+	assert crashed == ['b']
+	assert report['b']['exception'] is not None
+	assert all(report[h]['exception'] is None for h in ['a', 'c', 'd'])
+
+	print('Passed test: Crashed worker')
+
+	return
+
+if __name__ == '__main__':
+
+	test_cost_model()
+	test_crash()
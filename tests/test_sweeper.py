@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from minimal_worm.experiments import Sweeper
+from minimal_worm.experiments.undulation import UndulationExperiment
+
+def test_shard():
+	'''
+	Test if shards are disjoint and cover the grid, if duplicates belong
+	to the shard of their source and if the partition does not depend
+	on the grid order
+	'''
+	param = vars(UndulationExperiment.parameter_parser().parse_args([]))
+
+	param_arr, hash_arr = [], []
+
+	for N in [50, 100, 200]:
+		for dt in [0.01, 0.005, 0.001]:
+			for i in range(4):
+				param_arr.append({**param, 'N': N, 'dt': dt})
+				hash_arr.append(f'{N}_{dt}_{i}')
+
+	PG = SimpleNamespace(param_arr = param_arr, hash_arr = hash_arr)
+	PG_reversed = SimpleNamespace(param_arr = param_arr[::-1], hash_arr = hash_arr[::-1])
+
+	# Grid points with the same N and dt are duplicates of the first one
+	duplicates = {h: h[:-1] + '0' for h in hash_arr if not h.endswith('_0')}
+
+	n = 4
+
+	shards = [Sweeper.shard(PG, (i, n), duplicates) for i in range(n)]
+
+	for i in range(n):
+		for j in range(i + 1, n):
+			assert shards[i].isdisjoint(shards[j])
+
+	assert set().union(*shards) == set(hash_arr)
+
+	for h, h_src in duplicates.items():
+		assert any(h in shard and h_src in shard for shard in shards)
+
+	assert [Sweeper.shard(PG_reversed, (i, n), duplicates) for i in range(n)] == shards
+
+	assert Sweeper.parse_shard('3/4') == (3, 4)
+
+	print('Passed test: Shard')
+
+	return
+
+if __name__ == '__main__':
+
+	test_shard()
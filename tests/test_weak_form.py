@@ -490,6 +490,43 @@ def test_worm_vs_weak_form():
 
     return
 
+def test_lumped_vs_weak_form():
+    '''
+    Compares lumped Worm against the consistent weak form and checks 
+    that the power balance is preserved
+    '''
+    parser = UndulationExperiment.parameter_parser()
+    param = parser.parse_args([])            
+    param.N = 250
+    param.dt = 1e-2
+    param.T = 2.0
+    
+    MP = ModelParameter(param)
+                        
+    CS = UndulationExperiment.stw_control_sequence(param)
+
+    r_mat, theta_mat, _, _ = solve_weak_form(param, CS)
+    
+    worm = Worm(param.N, param.dt, lumped = True)    
+    
+    FS = worm.solve(param.T, MP, CS, 
+        FK = ['t', 'r', 'theta', 'V_dot', 'D_I_dot', 'D_F_dot', 'W_dot'])[0]
+
+    assert np.allclose(r_mat, FS.r, atol = 1e-2)
+    assert np.allclose(theta_mat, FS.theta, atol = 1e-2)
+    
+    # Power balance
+    W_dot = FS.W_dot[FS.t >= 1.0]
+    err = FS.V_dot - FS.D_I_dot - FS.D_F_dot - FS.W_dot
+    err = err[FS.t >= 1.0]
+    
+    assert np.abs(err).max() < 1e-2 * np.abs(W_dot).max()
+
+    print('Passed test. Lumped Worm and consistent weak form yield same centreline'
+          'coordinates and Euler angles')
+
+    return
+
 if __name__ == '__main__':
     
     #test_zero_control()
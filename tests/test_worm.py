@@ -1,12 +1,22 @@
 import numpy as np
 from fenics import *
 from ufl import atan_2
+from copy import copy
+from types import SimpleNamespace
+from pathlib import Path
+import tempfile
+import pickle
 
 
 from minimal_worm.util import f2n
 from minimal_worm import Worm
-from minimal_worm import ModelParameter
+from minimal_worm import ModelParameter, Objective
+from minimal_worm.reporting import Stroboscopic, PeriodicFull
+from minimal_worm.metrics import default_metrics
+from minimal_worm.frame import POWER_KEYS
+from minimal_worm.experiments import PostProcessor, Saver
 from minimal_worm.experiments.undulation import UndulationExperiment
+from parameter_scan import ParameterGrid
 
 
 def test_finite_backwards_difference():
@@ -163,6 +173,444 @@ def test_power_balance():
 	
 	return
 	
+def test_graded_mesh():
+	'''
+	Test if the mesh points of graded meshes are clustered at 
+	the head and tale and if the default initial configuration
+	is assigned on the graded mesh	
+	'''
+	
+	N = 100
+	
+	for grading in [{'type': 'tanh', 'beta': 2.0}, {'type': 'geometric', 'ratio': 1.05}]:
+	
+		worm = Worm(N, 0.01, mesh_grading = grading)
+		s_arr = worm.mesh.coordinates()[:, 0]
+		
+		assert np.allclose(s_arr, worm.s_arr)
+		assert np.isclose(s_arr[0], 0.0) and np.isclose(s_arr[-1], 1.0)
+		
+		# Elements at the ends must be smaller than in the centre
+		ds_arr = np.diff(s_arr)
+		assert ds_arr[0] < ds_arr[N // 2] and ds_arr[-1] < ds_arr[N // 2]
+		
+		worm._assign_initial_values()
+		r, theta = worm.u_old_arr[0].split(deepcopy = True)
+		
+		assert np.allclose(f2n(r)[2, :], s_arr)
+		assert np.allclose(f2n(theta), 0.0)
+
+	print('Passed test: Graded mesh')
+
+	return
+
+def test_planar():
+	'''
+	Test if the planar model and the full model yield the same 
+	solution for a control sequence which confines the centreline 
+	to the yz-plane
+	'''
+	
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 100
+	param.T = 1.0
+	
+	FK = ['r', 'theta']
+	
+	FS_arr = []
+	
+	for planar in [False, True]:
+	
+		MP = ModelParameter(param)	
+		CS = UndulationExperiment.stw_control_sequence(param)	
+	
+		worm = Worm(param.N, param.dt, planar = planar)
+		FS = worm.solve(param.T, MP, CS, FK = FK)[0]
+		FS_arr.append(FS)
+
+	FS, FS_planar = FS_arr
+
+	assert np.allclose(FS_planar.r[:, 0, :], 0.0)
+	assert np.allclose(FS_planar.theta[:, :2, :], 0.0)
+	assert np.allclose(FS.r, FS_planar.r, atol = 1e-6)
+	assert np.allclose(FS.theta, FS_planar.theta, atol = 1e-6)
+
+	print('Passed test: Planar model')
+
+	return
+
+def test_gradient():
+	'''
+	Test if adjoint gradient of the mean muscle power agrees 
+	with central finite differences 
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 50
+	param.T = 0.5
+		
+	controls = ['a', 'A']
+	
+	worm = Worm(param.N, param.dt, quiet = True)
+	
+	J, dJ = worm.gradient(param.T, param, UndulationExperiment.stw_control_sequence, 
+		Objective.time_average('W_dot'), controls, n_checkpoints = 5)
+	
+	for k in controls:
+	
+		h = 1e-4 * getattr(param, k)		
+		J_arr = []
+		
+		for v in [getattr(param, k) - h, getattr(param, k) + h]: 
+			param_h = copy(param)
+			setattr(param_h, k, v)
+			J_arr.append(worm.reduced_functional(param.T, param_h, 
+				UndulationExperiment.stw_control_sequence, 
+				Objective.time_average('W_dot'), controls).functional)
+
+		dJ_fd = (J_arr[1] - J_arr[0]) / (2 * h) 
+		
+		assert np.isclose(dJ[k], dJ_fd, rtol = 1e-3), f'{k}: {dJ[k]} != {dJ_fd}'
+
+	# Linear solves must be recorded if the solver tuner is enabled
+	J_auto, dJ_auto = worm.gradient(param.T, param, UndulationExperiment.stw_control_sequence,
+		Objective.time_average('W_dot'), controls, solver = {'auto': True}, n_checkpoints = 5)
+
+	assert np.isclose(J_auto, J, rtol = 1e-6)
+
+	for k in controls:
+		assert np.isclose(dJ_auto[k], dJ[k], rtol = 1e-6), f'{k}: {dJ_auto[k]} != {dJ[k]}'
+
+	print('Passed test: Gradient')
+
+	return
+
+def test_nodal_rotation():
+	'''
+	Test if nodal rotation matrices agree with the rotation 
+	matrices evaluated at the quadrature points
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 250
+	param.T = 1.0
+	
+	FK = ['r', 'theta', 'd1', 'd2', 'd3', 'k']
+	
+	FS_arr = []
+	
+	for nodal_rotation in [False, True]:
+	
+		MP = ModelParameter(param)	
+		CS = UndulationExperiment.stw_control_sequence(param)	
+	
+		worm = Worm(param.N, param.dt, nodal_rotation = nodal_rotation)
+		FS_arr.append(worm.solve(param.T, MP, CS, FK = FK)[0])
+
+	FS, FS_nodal = FS_arr
+
+	for k in FK:
+		assert np.allclose(getattr(FS, k), getattr(FS_nodal, k), atol = 1e-3), k 
+
+	print('Passed test: Nodal rotation')
+
+	return
+
+def test_split_form():
+	'''
+	Test if splitting the bilinear form into a step invariant and 
+	a lagged part yields the same solution
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 100
+	param.T = 1.0
+	
+	FK = ['r', 'theta']
+	
+	for planar in [False, True]:
+	
+		FS_arr = []
+	
+		for split_form in [False, True]:
+		
+			MP = ModelParameter(param)	
+			CS = UndulationExperiment.stw_control_sequence(param)	
+		
+			worm = Worm(param.N, param.dt, planar = planar, split_form = split_form)
+			FS_arr.append(worm.solve(param.T, MP, CS, FK = FK)[0])
+
+		FS, FS_split = FS_arr
+
+		assert np.allclose(FS.r, FS_split.r)
+		assert np.allclose(FS.theta, FS_split.theta)
+
+	print('Passed test: Split form')
+
+	return
+
+def test_retry_step():
+	'''
+	Test if a failed time step is retried with reduced time step 
+	and if the simulation fails once the retry budget is exhausted
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 100
+	param.T = 1.0
+	
+	FK = ['t', 'r', 'theta']
+
+	class FailingWorm(Worm):
+		'''
+		Rejects the first attempt of the time step i_fail
+		'''	
+		i_fail = 50
+			
+		def _step(self, CS):
+			if self.i == self.i_fail and self.n_rejected == 0:
+				raise AssertionError('Rejected')
+			return super()._step(CS)
+	
+	MP = ModelParameter(param)	
+
+	worm = Worm(param.N, param.dt)
+	FS, _, e, _ = worm.solve(param.T, MP, 
+		UndulationExperiment.stw_control_sequence(param), FK = FK)
+
+	assert e is None
+	assert FS.n_rejected == 0
+
+	worm = FailingWorm(param.N, param.dt)
+	FS_retry, _, e, _ = worm.solve(param.T, MP, 
+		UndulationExperiment.stw_control_sequence(param), FK = FK, 
+		retry = {'budget': 1})
+
+	assert e is None
+	assert FS_retry.n_rejected == 1
+	assert np.allclose(FS.t, FS_retry.t)
+	assert np.allclose(FS.r, FS_retry.r, atol = 1e-3)
+	assert np.allclose(FS.theta, FS_retry.theta, atol = 1e-3)
+
+	# Without retry budget, the simulation fails
+	worm = FailingWorm(param.N, param.dt)
+	FS_fail, _, e, _ = worm.solve(param.T, MP, 
+		UndulationExperiment.stw_control_sequence(param), FK = FK)
+
+	assert isinstance(e, AssertionError)
+	# Last reported frame is the last accepted time step
+	assert np.isclose(FS_fail.t[-1], FailingWorm.i_fail * param.dt)
+	assert FS_fail.n_rejected == 0
+
+	print('Passed test: Retry step')
+
+	return
+
+def test_higher_order_elements():
+	'''
+	Test if P2 elements are more accurate than P1 elements with 
+	the same number of degrees of freedom and if outputs are 
+	reported at the requested report points
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.T = 1.0
+	
+	FK = ['r', 'k']
+	
+	# Report points
+	s_report = np.linspace(0, 1, 51)
+	
+	MP = ModelParameter(param)	
+	
+	FS_arr = []
+	
+	# Reference, P1 with 101 and P2 with 51 mesh points have the same number of dofs 
+	for N, degree in [(401, 1), (101, 1), (51, 2)]:
+
+		CS = UndulationExperiment.stw_control_sequence(param)	
+		worm = Worm(N, param.dt, fe = {'type': 'Lagrange', 'degree': degree})
+		FS, _, e, _ = worm.solve(param.T, MP, CS, FK = FK, s_report = s_report)
+		
+		assert e is None
+		assert np.allclose(FS.s, s_report)
+		assert FS.r.shape[-1] == len(s_report)
+		assert FS.k.shape[-1] == len(s_report)
+		
+		FS_arr.append(FS)
+
+	FS_ref, FS_P1, FS_P2 = FS_arr
+	
+	# Only consider body centre, projected curvature is 
+	# inaccurate at the boundaries	
+	idx_arr = np.logical_and(s_report >= 0.1, s_report <= 0.9)
+	
+	err_P1 = np.abs(FS_P1.k - FS_ref.k)[..., idx_arr].max()
+	err_P2 = np.abs(FS_P2.k - FS_ref.k)[..., idx_arr].max()
+	
+	assert err_P2 < err_P1
+
+	print('Passed test: Higher order elements')
+
+	return
+
+def test_report_start():
+	'''
+	Test if frames before t_report_start are not reported
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 100
+	param.T = 1.0
+	
+	FK = ['t', 'r', 'theta']
+	t_report_start = 0.5
+	
+	MP = ModelParameter(param)	
+	
+	FS_arr = []
+	
+	for t0 in [None, t_report_start]:	
+		CS = UndulationExperiment.stw_control_sequence(param)	
+		worm = Worm(param.N, param.dt)
+		FS_arr.append(worm.solve(param.T, MP, CS, FK = FK, 
+			dt_report = 0.02, t_report_start = t0)[0])
+	
+	FS, FS_crop = FS_arr
+	
+	idx_arr = FS.t >= t_report_start - 0.5 * param.dt
+	
+	assert np.allclose(FS.t[idx_arr], FS_crop.t)
+	assert np.allclose(FS.r[idx_arr], FS_crop.r)
+	assert np.allclose(FS.theta[idx_arr], FS_crop.theta)
+
+	print('Passed test: Report start')
+
+	return
+
+def test_report_policy():
+	'''
+	Test stroboscopic reporting and reduced frames
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 100
+	param.T = 2.0
+	
+	FK = ['t', 'r', 'theta']
+	
+	MP = ModelParameter(param)	
+
+	CS = UndulationExperiment.stw_control_sequence(param)	
+	worm = Worm(param.N, param.dt)
+	FS = worm.solve(param.T, MP, CS, FK = FK, report_policy = Stroboscopic(4))[0]
+	
+	t_arr = np.concatenate([[param.dt], 0.25 * np.arange(1, 9)])
+	
+	assert np.allclose(FS.t, t_arr)
+	assert FS.r.shape[0] == len(t_arr)
+
+	CS = UndulationExperiment.stw_control_sequence(param)	
+	worm = Worm(param.N, param.dt)
+	FS = worm.solve(param.T, MP, CS, FK = FK, 
+		report_policy = PeriodicFull(2, ['t', 'W_dot']))[0]
+
+	assert np.all(FS.t <= 1.0 + 0.5 * param.dt)
+	assert len(FS.t) + len(FS.reduced.t) == round(param.T / param.dt) 
+	assert np.all(FS.reduced.t > 1.0)
+	assert not hasattr(FS.reduced, 'r')
+		
+	print('Passed test: Report policy')
+
+	return
+
+def test_metrics():
+	'''
+	Test if accumulated metrics agree with post-processed frames
+	'''
+	parser = UndulationExperiment.parameter_parser()
+	param = parser.parse_args([])			
+	
+	param.dt = 0.01
+	param.N = 100
+	param.T = 2.0
+	
+	t_start = 1.0
+	
+	FK = ['t', 'r'] + POWER_KEYS
+	
+	MP = ModelParameter(param)	
+	CS = UndulationExperiment.stw_control_sequence(param)	
+	
+	worm = Worm(param.N, param.dt)
+	FS = worm.solve(param.T, MP, CS, FK = FK, metrics = default_metrics(t_start))[0]
+	
+	idx_arr = FS.t >= t_start - 0.5 * param.dt 
+	
+	U = PostProcessor.comp_mean_swimming_speed(FS.r[idx_arr], FS.t[idx_arr])[0]
+	
+	assert np.isclose(FS.metrics['U'], U)
+	
+	for key in POWER_KEYS:
+		E = np.trapz(getattr(FS, key)[idx_arr], dx = param.dt)
+		assert np.isclose(FS.metrics[key[:-len('_dot')]], E), key
+	
+	assert FS.metrics['A_avg'] > 0
+	
+	# Metrics only
+	CS = UndulationExperiment.stw_control_sequence(param)	
+	FS_metrics = worm.solve(param.T, MP, CS, FK = [], metrics = default_metrics(t_start))[0]
+
+	assert not hasattr(FS_metrics, 'r')
+	assert len(FS_metrics) == 0
+	
+	for k, v in FS.metrics.items():
+		assert np.isclose(FS_metrics.metrics[k], v), k
+
+	# Frame keys without outputs are skipped when metrics-only simulations are saved  
+	lam_param = {'v_min': 1.0, 'v_max': 2.0, 'N': 2, 
+		'step': None, 'round': 4, 'log': False}
+		
+	PG = ParameterGrid(vars(param), {'lam': lam_param})
+	
+	with tempfile.TemporaryDirectory() as sim_dir:
+		
+		for h in PG.hash_arr:
+			with open(Path(sim_dir) / (h + '.dat'), 'wb') as f:
+				pickle.dump({'FS': FS_metrics, 'CS': SimpleNamespace(), 
+					'exit_status': 0, 'sim_t': 0.0}, f)
+			
+		h5 = Saver.save_data(Path(sim_dir) / 'sweep.h5', PG, Path(sim_dir), 
+			['t', 'r', 'theta'], None)
+		
+		assert len(h5['FS'].keys()) == 0 
+		
+		for k, v in FS.metrics.items():
+			assert np.allclose(h5['metrics'][k][:], v), k
+		
+		h5.close()
+
+	print('Passed test: Metrics')
+
+	return
+	
 if __name__ == '__main__':
 
 	#test_finite_backwards_difference()